@@ -0,0 +1,20 @@
+"""Moteur de watermarking CestMonImage, utilisable sans interface graphique."""
+from .batch import BatchResult, get_unique_filename, list_images, process_image, run_batch, run_watch
+from .engine import WatermarkJob, create_overlay, render_watermark
+from .fonts import get_available_fonts, get_font_path
+from .metadata import ImageMetadata
+
+__all__ = [
+    "BatchResult",
+    "ImageMetadata",
+    "WatermarkJob",
+    "create_overlay",
+    "get_available_fonts",
+    "get_font_path",
+    "get_unique_filename",
+    "list_images",
+    "process_image",
+    "render_watermark",
+    "run_batch",
+    "run_watch",
+]
@@ -0,0 +1,6 @@
+"""Permet ``python -m cestmonimage``."""
+import sys
+
+from .cli import main
+
+sys.exit(main())
@@ -0,0 +1,751 @@
+"""Traitement par lot : liste des fichiers, nommage des sorties et sauvegarde."""
+import io
+import os
+import signal
+import sys
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+
+from .decode import MAX_SOURCE_PIXELS, load_image, max_size_box, read_source
+from .encoders import JpegSource, OutputEncoding, get_encoder
+from .engine import WatermarkJob, configure_overlay_cache, render_watermark
+from .fonts import load_font
+from .manifest import BatchManifest, content_hash, params_hash
+from .metadata import ImageMetadata, build_exif_bytes, load_source_exif
+from .naming import OutputNameAllocator, format_output_name, last_output_index, reservation_path
+from .pipeline import PIPELINE_READ_AHEAD, IOPipeline, write_atomic
+from .scan import is_source_file, iter_images
+from .schedule import ADMISSION_LOOKAHEAD, AdmissionQueue, default_memory_budget, estimate_footprint
+from .template import expand_job
+from .timing import profile_batch, record_stages, stage, start_worker_profile
+from .watch import WATCH_SETTLE_SECONDS, StableFiles, open_watcher
+
+JPEG_EXTENSIONS = ('.jpg', '.jpeg')
+WINDOWS_MAX_WORKERS = 61  # Limite de ProcessPoolExecutor sous Windows
+MAX_IN_FLIGHT_PER_WORKER = 2  # Images soumises d'avance par processus
+WATCH_IDLE_SECONDS = 1.0  # Attente maximale d'un événement en mode surveillance (arrêt réactif)
+WATCH_RESULT_SECONDS = 0.02  # Intervalle de relève des images terminées en mode surveillance
+
+
+def is_jpeg_file(filename: str) -> bool:
+    """Vérifie si le fichier est un JPEG (d'après son extension)."""
+    return filename.lower().endswith(JPEG_EXTENSIONS)
+
+
+def embeds_exif(image_path: str, encoding: OutputEncoding | None) -> bool:
+    """True si la sortie de cette source reçoit les métadonnées EXIF du watermark.
+
+    Seules les sources JPEG ont un EXIF repris et enrichi, et seulement si
+    le format de sortie peut l'embarquer (pas GIF ni BMP).
+    """
+    return is_jpeg_file(image_path) and get_encoder(encoding or OutputEncoding(), image_path).supports_exif
+
+
+def list_images(folder: str, output_basename: str, recursive: bool = False,
+                include=(), exclude=()) -> list[str]:
+    """Liste les images d'un dossier, en excluant les sorties déjà générées.
+
+    Les images sont triées par nom : la numérotation des sorties est la même
+    d'un lancement à l'autre (nécessaire à la reprise d'un lot). Voir
+    :func:`.scan.iter_images` pour les filtres et le listage progressif.
+
+    Args:
+        folder: Dossier source
+        output_basename: Préfixe des fichiers de sortie à ignorer
+        recursive: Parcourt aussi les sous-dossiers
+        include: Motifs glob à retenir
+        exclude: Motifs glob à ignorer
+
+    Returns:
+        Chemins complets des images à traiter
+    """
+    return list(iter_images(folder, output_basename, recursive, include, exclude))
+
+
+def get_unique_filename(folder: str, basename: str, index: int, extension: str = ".jpg") -> str:
+    """Génère un nom de fichier unique avec numéro incrémenté.
+
+    Args:
+        folder: Dossier de destination
+        basename: Nom de base (ex: "image")
+        index: Numéro de l'image (1, 2, 3...)
+        extension: Extension du fichier
+
+    Returns:
+        Chemin complet vers un fichier qui n'existe pas encore
+
+    Note:
+        Un ``os.path.exists`` par essai : pour un lot, préférer
+        :class:`.naming.OutputNameAllocator`, qui liste le dossier une seule fois.
+    """
+    # Format: basename_001.jpg
+    filepath = os.path.join(folder, format_output_name(basename, index, 0, extension))
+
+    # Si le fichier existe (ou est réservé par un lot en cours), ajouter un suffixe
+    suffix = 1
+    while os.path.exists(filepath) or os.path.exists(reservation_path(filepath)):
+        filepath = os.path.join(folder, format_output_name(basename, index, suffix, extension))
+        suffix += 1
+
+    return filepath
+
+
+def process_image(image_path: str, output_folder: str, output_basename: str, index: int,
+                  job: WatermarkJob, metadata: ImageMetadata, max_size: int | None = None,
+                  output_path: str | None = None, encoding: OutputEncoding | None = None) -> str:
+    """Watermarke une image et la sauvegarde (en JPEG par défaut).
+
+    Les JPEG conservent leur EXIF d'origine, enrichi des métadonnées du
+    watermark (si le format de sortie accepte l'EXIF). En cas d'échec de la
+    sauvegarde avec EXIF, l'image est sauvegardée sans métadonnées (mode de
+    secours).
+
+    Args:
+        image_path: Image source
+        output_folder: Dossier de destination
+        output_basename: Nom de base des fichiers de sortie
+        index: Numéro de l'image dans le lot (à partir de 1)
+        job: Paramètres du watermark
+        metadata: Métadonnées EXIF saisies par l'utilisateur
+        max_size: Plus grand côté de la sortie en pixels (None = taille d'origine) ;
+            l'image est alors décodée directement à résolution réduite
+        output_path: Fichier de sortie déjà réservé (voir :class:`.naming.OutputNameAllocator`) ;
+            par défaut, un nom libre est cherché dans ``output_folder``
+        encoding: Format et préréglage de sortie (par défaut JPEG qualité 95)
+
+    Returns:
+        Chemin du fichier écrit
+    """
+    return _process_image(image_path, output_folder, output_basename, index, job, metadata,
+                          max_size, output_path, encoding)[0]
+
+
+def _process_image(image_path, output_folder, output_basename, index, job, metadata,
+                   max_size, output_path=None, encoding=None) -> tuple[str, str, dict[str, float]]:
+    """Variante de :func:`process_image` qui renvoie aussi l'empreinte de la source
+    et la durée de chaque étape (voir :mod:`.timing`)."""
+    with record_stages() as stage_times:
+        output_path, source_hash = _watermark_and_save(image_path, output_folder, output_basename,
+                                                       index, job, metadata, max_size,
+                                                       output_path, encoding)
+    return output_path, source_hash, stage_times
+
+
+def _render_source(data: bytes, image_path: str, index: int, job: WatermarkJob, max_size,
+                   file_date: bool = True, max_pixels: int | None = MAX_SOURCE_PIXELS):
+    """Décode une source déjà lue et y applique le watermark.
+
+    Args:
+        file_date: Date du fichier pour {date} si l'EXIF n'en a pas
+        max_pixels: Taille maximale de la source (None : limite de Pillow)
+
+    Returns:
+        Couple (image watermarkée, job avec le texte propre à cette image)
+    """
+    with stage("decode"):
+        img = load_image(io.BytesIO(data), max_size_box(max_size), max_pixels)
+    # Variables du texte ({filename}, {date}...) remplacées pour cette image
+    with stage("exif"):
+        job = expand_job(job, image_path, index, data, file_date)
+    # L'image décodée n'appartient qu'à ce traitement : le watermark est fusionné en place
+    return render_watermark(img, job, in_place=True), job
+
+
+def _source_encoder(data: bytes, image_path: str, encoding: OutputEncoding | None):
+    """Encodeur de sortie d'une source et ses options d'enregistrement."""
+    encoder = get_encoder(encoding or OutputEncoding(), image_path)
+    jpeg_source = None
+    if encoding is not None and encoding.preset is not None and is_jpeg_file(image_path):
+        jpeg_source = JpegSource.from_buffer(data)
+    return encoder, encoder.options(encoding.preset if encoding else None, jpeg_source)
+
+
+def _encode_image(data: bytes, image_path: str, index: int, job: WatermarkJob, metadata: ImageMetadata,
+                  max_size, output_path: str, encoding: OutputEncoding | None, verbose: bool = True,
+                  file_date: bool = True, max_pixels: int | None = MAX_SOURCE_PIXELS) -> bytes:
+    """Watermarke une source déjà lue et encode la sortie en mémoire.
+
+    Les JPEG conservent leur EXIF d'origine, enrichi des métadonnées du
+    watermark ; si l'encodage avec EXIF échoue, l'image est encodée sans
+    métadonnées (mode de secours).
+
+    Args:
+        output_path: Fichier de sortie prévu (champ EXIF DocumentName)
+        verbose: Affiche le bilan de l'image (✓, ℹ, ⚠)
+        file_date: Date du fichier pour {date} si l'EXIF n'en a pas
+        max_pixels: Taille maximale de la source (None : limite de Pillow)
+    """
+    filename = os.path.basename(image_path)
+    log = print if verbose else (lambda message: None)
+    img, job = _render_source(data, image_path, index, job, max_size, file_date, max_pixels)
+    encoder, options = _source_encoder(data, image_path, encoding)
+    output = io.BytesIO()
+    try:
+        with stage("convert"):
+            img = encoder.prepare(img)
+
+        if embeds_exif(filename, encoding):
+            with stage("exif"):
+                exif_bytes = build_exif_bytes(job, metadata, output_path, load_source_exif(data))
+            with stage("encode"):
+                img.save(output, encoder.pil_format, exif=exif_bytes, **options)
+            log(f"✓ Image {filename}: Sauvegardée avec métadonnées EXIF (copyright, signature, date)")
+        elif encoder.name == "jpeg":
+            # Pour les autres formats, convertir en JPEG sans métadonnées EXIF
+            with stage("encode"):
+                img.save(output, encoder.pil_format, **options)
+            log(f"ℹ Image {filename}: Convertie en JPEG (sans métadonnées EXIF)")
+        else:
+            with stage("encode"):
+                img.save(output, encoder.pil_format, **options)
+            log(f"ℹ Image {filename}: Sauvegardée en {encoder.pil_format} (sans métadonnées EXIF)")
+
+    except Exception as e:
+        log(f"⚠ Erreur lors du traitement de l'image {filename}: {str(e)}")
+        try:
+            # Tentative de sauvegarde sans métadonnées
+            output = io.BytesIO()
+            with stage("encode"):
+                img.save(output, encoder.pil_format, **options)
+            log(f"⚠ Image {filename}: Sauvegardée sans métadonnées (mode de secours)")
+        except Exception as save_error:
+            log(f"❌ Erreur lors de la sauvegarde de secours de {filename}: {str(save_error)}")
+            raise
+
+    return output.getvalue()
+
+
+def _render_output(data: bytes, image_path: str, index: int, job: WatermarkJob, metadata: ImageMetadata,
+                   max_size, output_path: str, encoding) -> tuple[bytes, str, dict[str, float]]:
+    """Rendu d'une source déjà lue, sans écriture (voir :func:`_run_batch_sequential`).
+
+    Returns:
+        Triplet (sortie encodée, empreinte de la source, durée de chaque étape)
+    """
+    with record_stages() as stage_times:
+        body = _encode_image(data, image_path, index, job, metadata, max_size, output_path, encoding)
+        source_hash = content_hash(data)
+    return body, source_hash, stage_times
+
+
+def watermark_bytes(data: bytes, filename: str, job: WatermarkJob, metadata: ImageMetadata,
+                    index: int = 1, max_size: int | None = None,
+                    encoding: OutputEncoding | None = None,
+                    max_pixels: int | None = None) -> tuple[bytes, str, dict[str, float]]:
+    """Watermarke une image reçue en mémoire (service HTTP, voir :mod:`.service`).
+
+    Même rendu et mêmes métadonnées que :func:`process_image`, sans fichier :
+    ``filename`` sert à choisir le format en mode ``"keep"``, aux variables
+    du texte et au champ EXIF DocumentName. Seul son dernier élément est
+    gardé, et il n'est jamais cherché sur le disque (pas de date du fichier
+    pour ``{date}``). La source est limitée à ``max_pixels`` (par défaut, la
+    limite de Pillow), pas aux panoramas du traitement par lot.
+
+    Returns:
+        Triplet (image encodée, format Pillow, durée de chaque étape)
+    """
+    filename = os.path.basename(filename.replace("\\", "/"))
+    encoder = get_encoder(encoding or OutputEncoding(), filename)
+    output_name = os.path.splitext(filename)[0] + encoder.extension
+    with record_stages() as stage_times:
+        body = _encode_image(data, filename, index, job, metadata, max_size, output_name, encoding,
+                             verbose=False, file_date=False, max_pixels=max_pixels)
+    return body, encoder.pil_format, stage_times
+
+
+def _watermark_and_save(image_path, output_folder, output_basename, index, job, metadata,
+                        max_size, output_path, encoding) -> tuple[str, str]:
+    # Une seule lecture du fichier : pixels et EXIF sont décodés depuis le même tampon
+    with stage("read"):
+        data = read_source(image_path)
+    output_path = output_path or get_unique_filename(output_folder, output_basename, index,
+                                                     _output_extension(encoding, image_path))
+    body = _encode_image(data, image_path, index, job, metadata, max_size, output_path, encoding)
+    with stage("write"):
+        write_atomic(output_path, body)
+    return output_path, content_hash(data)
+
+
+def default_workers() -> int:
+    """Nombre de processus par défaut : un par cœur disponible."""
+    workers = os.cpu_count() or 1
+    if sys.platform == 'win32':
+        workers = min(workers, WINDOWS_MAX_WORKERS)
+    return workers
+
+
+def _init_worker(overlay_cache_bytes: int | None, profile_dir: str | None = None):
+    """Initialise un processus du pool (limite du cache de calques, profilage)."""
+    if overlay_cache_bytes is not None:
+        configure_overlay_cache(max_bytes=overlay_cache_bytes)
+    if profile_dir is not None:
+        start_worker_profile(profile_dir)
+
+
+@dataclass
+class BatchResult:
+    """Bilan d'un traitement par lot.
+
+    Attributes:
+        outputs: Fichiers écrits, dans l'ordre des sources
+        errors: Couples (source, message) des images en échec
+        cancelled: True si le lot a été interrompu avant la fin
+        skipped: Images déjà traitées par un lancement précédent (sorties reprises)
+        total: Nombre de sources parcourues
+        timings: Couples (source, durée de chaque étape en secondes) des images
+            traitées, dans l'ordre des sources (voir :mod:`.timing`)
+        pipeline: Profondeur des files de lecture et d'écriture et attentes
+            du rendu (voir :meth:`.pipeline.IOPipeline.stats`) ; vide si le
+            lot est réparti sur plusieurs processus
+    """
+    outputs: list[str] = field(default_factory=list)
+    errors: list[tuple[str, str]] = field(default_factory=list)
+    cancelled: bool = False
+    skipped: int = 0
+    total: int = 0
+    timings: list[tuple[str, dict[str, float]]] = field(default_factory=list)
+    pipeline: dict = field(default_factory=dict)
+
+
+def _output_extension(encoding: OutputEncoding | None, image_path: str) -> str:
+    """Extension du fichier de sortie d'une source."""
+    return get_encoder(encoding or OutputEncoding(), image_path).extension
+
+
+def _source_stat(image_path: str) -> os.stat_result | None:
+    """Taille et date de la source, relevées avant son traitement (None si illisible)."""
+    try:
+        return os.stat(image_path)
+    except OSError:
+        return None
+
+
+def _open_manifest(output_folder, output_basename, job, metadata, max_size, encoding) -> BatchManifest:
+    """Manifeste de reprise du dossier de sortie pour ces paramètres."""
+    # Le JPEG par défaut garde l'empreinte des lots lancés avant le choix du format
+    manifest_encoding = None if encoding in (None, OutputEncoding()) else encoding
+    return BatchManifest(output_folder, params_hash(job, metadata, output_basename, max_size,
+                                                    manifest_encoding))
+
+
+def run_batch(image_files: list[str], output_folder: str, output_basename: str,
+              job: WatermarkJob, metadata: ImageMetadata, progress_callback=None,
+              workers: int = 1, overlay_cache_bytes: int | None = None,
+              cancel_event=None, max_size: int | None = None, resume: bool = True,
+              encoding: OutputEncoding | None = None, memory_budget: int | None = None,
+              profile: bool = False) -> BatchResult:
+    """Watermarke une liste d'images ; une image en échec n'arrête pas le lot.
+
+    Le numéro de sortie de chaque image (``image_001.jpg``...) est fixé par
+    sa position dans ``image_files``, quel que soit l'ordre de fin des
+    processus. ``image_files`` peut être un itérateur (voir
+    :func:`.scan.iter_images`) : le lot démarre alors avant la fin du listage.
+
+    Avec ``resume``, chaque image terminée est notée dans le manifeste du
+    dossier de sortie (voir :mod:`.manifest`) : relancer le même lot avec les
+    mêmes paramètres ne retraite que les images manquantes ou modifiées.
+
+    En parallèle, les images sont lancées selon un budget mémoire (voir
+    :mod:`.schedule`) : les plus grosses d'abord, et autant de petites que
+    le budget le permet.
+
+    Args:
+        image_files: Images sources (liste ou itérable), dans l'ordre de numérotation
+        output_folder: Dossier de destination
+        output_basename: Nom de base des fichiers de sortie
+        job: Paramètres du watermark
+        metadata: Métadonnées EXIF saisies par l'utilisateur
+        progress_callback: Appelée après chaque image avec (terminées, total, filename) ;
+            ``total`` vaut None si ``image_files`` n'a pas de longueur
+        workers: Nombre de processus (1 = traitement dans le processus courant)
+        overlay_cache_bytes: Limite du cache de calques de chaque processus
+        cancel_event: ``threading.Event`` ; s'il est levé, le lot s'arrête
+            entre deux images (les images en cours sont terminées)
+        max_size: Plus grand côté des sorties en pixels (None = taille d'origine)
+        resume: Reprend un lot interrompu en sautant les images déjà traitées
+        encoding: Format et préréglage de sortie (par défaut JPEG qualité 95)
+        memory_budget: Mémoire des images traitées en même temps, en octets (None = une
+            part de la mémoire disponible, 0 = pas de limite autre que ``workers``)
+        profile: Profile le lot avec cProfile (processus du pool compris) ; le
+            profil est écrit dans ``output_folder`` (voir :func:`.timing.profile_batch`)
+
+    Returns:
+        Bilan du traitement
+    """
+    manifest = _open_manifest(output_folder, output_basename, job, metadata, max_size,
+                              encoding) if resume else None
+    total = len(image_files) if hasattr(image_files, '__len__') else None
+    try:
+        with profile_batch(output_folder) if profile else nullcontext() as profile_dir:
+            if workers > 1 and (total is None or total > 1):
+                if memory_budget is None:
+                    memory_budget = default_memory_budget()
+                return _run_batch_parallel(image_files, total, output_folder, output_basename, job,
+                                           metadata, progress_callback, workers, overlay_cache_bytes,
+                                           cancel_event, max_size, manifest, encoding,
+                                           memory_budget or None, profile_dir)
+            return _run_batch_sequential(image_files, total, output_folder, output_basename, job,
+                                         metadata, progress_callback, overlay_cache_bytes,
+                                         cancel_event, max_size, manifest, encoding)
+    finally:
+        if manifest is not None:
+            manifest.close()
+
+
+def _reclaim_outputs(allocator: OutputNameAllocator, output_basename: str, manifest: BatchManifest):
+    """Reprise : libère les noms laissés par un lancement interrompu (voir
+    :meth:`.naming.OutputNameAllocator.reclaim`)."""
+    reclaimed = allocator.reclaim(output_basename, manifest.outputs())
+    if reclaimed:
+        print(f"♻ {len(reclaimed)} sortie(s) inachevée(s) d'un lancement interrompu reprise(s)")
+
+
+def _add_io_times(stage_times: dict[str, float], **times: float):
+    """Ajoute aux durées d'une image les entrées/sorties faites hors de son rendu."""
+    for name, seconds in times.items():
+        stage_times[name] = stage_times.get(name, 0.0) + seconds
+        stage_times["total"] += seconds
+
+
+def _run_batch_sequential(image_files, total, output_folder, output_basename, job, metadata,
+                          progress_callback, overlay_cache_bytes, cancel_event,
+                          max_size, manifest, encoding) -> BatchResult:
+    """Variante de :func:`run_batch` dans le processus courant.
+
+    Le rendu est fait dans ce thread ; pendant ce temps, les sources
+    suivantes sont lues et les sorties précédentes écrites par les threads
+    de :class:`.pipeline.IOPipeline`.
+    """
+    if overlay_cache_bytes is not None:
+        configure_overlay_cache(max_bytes=overlay_cache_bytes)
+    result = BatchResult()
+    allocator = OutputNameAllocator(output_folder)
+    if manifest is not None:
+        _reclaim_outputs(allocator, output_basename, manifest)
+    sources = enumerate(image_files)
+    exhausted = False
+    outputs = {}
+    errors = {}
+    timings = {}
+    reads = deque()  # (index, source, stat, lecture)
+    writes = deque()  # (index, source, stat, sortie, empreinte, durées, écriture)
+    done = 0
+
+    def progress(filename):
+        nonlocal done
+        done += 1
+        if progress_callback:
+            progress_callback(done, total, filename)
+
+    def fail(index, image_path, reserved_path, error):
+        print(f"❌ Erreur lors du traitement de {os.path.basename(image_path)}: {str(error)}")
+        errors[index] = (image_path, str(error))
+        if reserved_path is not None:
+            allocator.release(reserved_path)
+
+    def finish_writes(block: bool):
+        # Un seul thread d'écriture : les écritures se terminent dans l'ordre
+        while writes and (block or writes[0][-1].done()):
+            index, image_path, stat, output_path, source_hash, stage_times, future = writes.popleft()
+            try:
+                _add_io_times(stage_times, write=future.result())
+                outputs[index] = output_path
+                timings[index] = (image_path, stage_times)
+                if stat is not None:
+                    manifest.record(image_path, stat, source_hash, output_path)
+                allocator.release(output_path)
+            except Exception as e:
+                fail(index, image_path, output_path, e)
+            progress(os.path.basename(image_path))
+
+    with IOPipeline() as pipeline:
+        while True:
+            if cancel_event is not None and cancel_event.is_set() and (reads or not exhausted):
+                result.cancelled = True
+                break
+            while not exhausted and len(reads) < PIPELINE_READ_AHEAD:
+                try:
+                    index, image_path = next(sources)
+                except StopIteration:
+                    exhausted = True
+                    break
+                result.total += 1
+                stat = _source_stat(image_path) if manifest is not None else None
+                previous_output = manifest.lookup(image_path, stat) if stat is not None else None
+                if previous_output is not None:
+                    outputs[index] = previous_output
+                    result.skipped += 1
+                    progress(os.path.basename(image_path))
+                    continue
+                reads.append((index, image_path, stat, pipeline.read(image_path)))
+            finish_writes(block=False)
+            if not reads:
+                break
+
+            pipeline.sample_read_ahead(sum(read[-1].done() for read in reads))
+            index, image_path, stat, future = reads.popleft()
+            reserved_path = None
+            try:
+                data, read_time = pipeline.wait_read(future)
+                # Nom réservé au rendu (il figure dans l'EXIF), pas dès la lecture anticipée
+                reserved_path = allocator.allocate(output_basename, index + 1,
+                                                   _output_extension(encoding, image_path))
+                body, source_hash, stage_times = _render_output(
+                    data, image_path, index + 1, job, metadata, max_size, reserved_path, encoding)
+                _add_io_times(stage_times, read=read_time)
+            except Exception as e:
+                fail(index, image_path, reserved_path, e)
+                progress(os.path.basename(image_path))
+                continue
+            del data
+            writes.append((index, image_path, stat, reserved_path, source_hash, stage_times,
+                           pipeline.write(reserved_path, body)))
+
+        # Annulation : les sources lues d'avance ne sont pas traitées (ni parcourues)
+        for *_, future in reads:
+            future.cancel()
+            result.total -= 1
+        finish_writes(block=True)
+        result.pipeline = pipeline.stats()
+
+    result.outputs = [outputs[index] for index in sorted(outputs)]
+    result.errors = [errors[index] for index in sorted(errors)]
+    result.timings = [timings[index] for index in sorted(timings)]
+    return result
+
+
+def _run_batch_parallel(image_files, total, output_folder, output_basename, job, metadata,
+                        progress_callback, workers, overlay_cache_bytes, cancel_event,
+                        max_size, manifest, encoding, memory_budget=None,
+                        profile_dir=None) -> BatchResult:
+    """Variante de :func:`run_batch` répartie sur un pool de processus.
+
+    Les sources sont lues par fenêtres de ADMISSION_LOOKAHEAD images, dont
+    l'empreinte mémoire est estimée d'après l'en-tête ; une
+    :class:`.schedule.AdmissionQueue` choisit ensuite les images à lancer
+    (les plus grosses d'abord, dans ``memory_budget``). Au plus
+    ``workers * MAX_IN_FLIGHT_PER_WORKER`` images sont soumises à la fois :
+    une annulation n'attend que les images déjà lancées.
+
+    Chaque processus lit sa source et écrit sa sortie lui-même : plusieurs
+    images en cours suffisent à recouvrir les entrées/sorties, sans faire
+    transiter les images par le processus principal.
+    """
+    if total is not None:
+        workers = min(workers, total)
+    sources = enumerate(image_files)
+    exhausted = False
+    outputs = {}
+    errors = {}
+    timings = {}
+    cancelled = False
+    skipped = 0
+    seen = 0
+    done = 0
+    pending = {}
+    queue = AdmissionQueue(memory_budget)
+    allocator = OutputNameAllocator(output_folder)
+    if manifest is not None:
+        _reclaim_outputs(allocator, output_basename, manifest)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(overlay_cache_bytes, profile_dir)) as executor:
+        while pending or queue or not exhausted:
+            if cancel_event is not None and cancel_event.is_set() and (queue or not exhausted):
+                cancelled = True
+                exhausted = True
+                # Images lues mais pas encore lancées : non parcourues
+                seen -= len(queue.clear())
+            while not exhausted and len(queue) < ADMISSION_LOOKAHEAD:
+                try:
+                    index, image_path = next(sources)
+                except StopIteration:
+                    exhausted = True
+                    break
+                seen += 1
+                stat = _source_stat(image_path) if manifest is not None else None
+                previous_output = manifest.lookup(image_path, stat) if stat is not None else None
+                if previous_output is not None:
+                    outputs[index] = previous_output
+                    skipped += 1
+                    done += 1
+                    if progress_callback:
+                        progress_callback(done, total, os.path.basename(image_path))
+                else:
+                    queue.push((index, image_path, stat), estimate_footprint(image_path, job, max_size))
+
+            while len(pending) < workers * MAX_IN_FLIGHT_PER_WORKER:
+                admitted = queue.pop()
+                if admitted is None:
+                    break
+                (index, image_path, stat), footprint = admitted
+                # Noms attribués par le processus principal : pas de collision entre processus.
+                # Réservé à la soumission : le processus en a besoin pour l'EXIF (DocumentName)
+                reserved_path = allocator.allocate(output_basename, index + 1,
+                                                   _output_extension(encoding, image_path))
+                future = executor.submit(_process_image, image_path, output_folder,
+                                         output_basename, index + 1, job, metadata, max_size,
+                                         reserved_path, encoding)
+                pending[future] = (index, image_path, stat, reserved_path, footprint)
+            if not pending:
+                continue
+
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                index, image_path, stat, reserved_path, footprint = pending.pop(future)
+                queue.release(footprint)
+                filename = os.path.basename(image_path)
+                try:
+                    output_path, source_hash, stage_times = future.result()
+                    outputs[index] = output_path
+                    timings[index] = (image_path, stage_times)
+                    if stat is not None:
+                        manifest.record(image_path, stat, source_hash, output_path)
+                except Exception as e:
+                    print(f"❌ Erreur lors du traitement de {filename}: {str(e)}")
+                    errors[index] = (image_path, str(e))
+                allocator.release(reserved_path)
+                done += 1
+                if progress_callback:
+                    progress_callback(done, total, filename)
+
+    return BatchResult(outputs=[outputs[index] for index in sorted(outputs)],
+                       errors=[errors[index] for index in sorted(errors)],
+                       cancelled=cancelled, skipped=skipped, total=seen,
+                       timings=[timings[index] for index in sorted(timings)])
+
+
+def init_resident_worker(overlay_cache_bytes: int | None, font_name: str, is_bold: bool):
+    """Initialise un processus qui reste lancé (surveillance, service HTTP).
+
+    Ctrl+C n'interrompt que le processus principal, qui laisse finir les
+    images en cours ; la police est chargée d'avance pour que la première
+    image reçue ne paie pas la recherche des polices.
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _init_worker(overlay_cache_bytes)
+    load_font(font_name, is_bold, 12)
+
+
+def run_watch(folder: str, output_folder: str, output_basename: str, job: WatermarkJob,
+              metadata: ImageMetadata, progress_callback=None, workers: int = 1,
+              overlay_cache_bytes: int | None = None, cancel_event=None, max_size: int | None = None,
+              encoding: OutputEncoding | None = None, memory_budget: int | None = None,
+              recursive: bool = False, include=(), exclude=(), settle: float = WATCH_SETTLE_SECONDS,
+              polling: bool = False, resume: bool = True) -> BatchResult:
+    """Surveille un dossier et watermarke chaque image dès que sa copie est terminée.
+
+    Les images déjà présentes et pas encore traitées (d'après le manifeste,
+    voir :mod:`.manifest` ; toutes sans ``resume``) passent en premier ; chaque image déposée ensuite
+    est traitée quand sa taille et sa date n'ont plus changé depuis
+    ``settle`` secondes (voir :mod:`.watch`). Le pool de processus reste
+    ouvert, polices et calques en cache, jusqu'à l'arrêt. La numérotation
+    des sorties reprend après le plus grand numéro déjà présent.
+
+    Les paramètres communs ont le même sens que pour :func:`run_batch`.
+
+    Args:
+        folder: Dossier surveillé
+        recursive: Surveille aussi les sous-dossiers
+        include: Motifs glob des fichiers à retenir (voir :func:`.scan.iter_images`)
+        exclude: Motifs glob des fichiers et dossiers à ignorer
+        settle: Délai sans changement avant de traiter une image, en secondes
+        polling: Relit le dossier à intervalle régulier même si inotify est disponible
+        resume: Saute les images déjà traitées d'après le manifeste, et y note
+            chaque image terminée
+        cancel_event: ``threading.Event`` qui arrête la surveillance ; les
+            images en cours sont terminées
+
+    Returns:
+        Bilan depuis le lancement ; la durée entre la détection de chaque
+        image et la fin de son écriture est notée ``latency`` dans ``timings``
+    """
+    if memory_budget is None:
+        memory_budget = default_memory_budget()
+    result = BatchResult()
+    stable = StableFiles(settle)
+    queue = AdmissionQueue(memory_budget or None)
+    allocator = OutputNameAllocator(output_folder)
+    queued = set()
+    pending = {}
+
+    def finish(future):
+        image_path, stat, arrival, reserved_path, footprint = pending.pop(future)
+        queued.discard(image_path)
+        queue.release(footprint)
+        filename = os.path.basename(image_path)
+        try:
+            output_path, source_hash, stage_times = future.result()
+            stage_times["latency"] = time.monotonic() - arrival
+            result.outputs.append(output_path)
+            result.timings.append((image_path, stage_times))
+            if manifest is not None:
+                manifest.record(image_path, stat, source_hash, output_path)
+        except Exception as e:
+            print(f"❌ Erreur lors du traitement de {filename}: {str(e)}")
+            result.errors.append((image_path, str(e)))
+        allocator.release(reserved_path)
+        if progress_callback:
+            progress_callback(len(result.outputs) + len(result.errors), None, filename)
+
+    with (_open_manifest(output_folder, output_basename, job, metadata, max_size, encoding)
+          if resume else nullcontext() as manifest,
+          open_watcher(folder, output_basename, recursive, include, exclude, polling) as watcher,
+          ProcessPoolExecutor(max_workers=workers, initializer=init_resident_worker,
+                              initargs=(overlay_cache_bytes, job.font_name, job.is_bold)) as executor):
+        if manifest is not None:
+            _reclaim_outputs(allocator, output_basename, manifest)
+        next_index = last_output_index(output_folder, output_basename) + 1
+        # Démarre tous les processus maintenant plutôt qu'à la première image
+        for _ in range(workers):
+            executor.submit(time.sleep, 0)
+        # Images déposées pendant que la surveillance était arrêtée
+        for image_path in iter_images(folder, output_basename, recursive, include, exclude):
+            stable.add(image_path)
+        print(f"👀 Surveillance de {folder} ({watcher.name}) : Ctrl+C pour arrêter")
+
+        while cancel_event is None or not cancel_event.is_set():
+            timeout = WATCH_IDLE_SECONDS
+            next_check = stable.next_check()
+            if next_check is not None:
+                timeout = min(timeout, next_check - time.monotonic())
+            if pending:
+                timeout = min(timeout, WATCH_RESULT_SECONDS)
+            for path in watcher.wait(timeout):
+                if is_source_file(os.path.relpath(path, folder).replace(os.sep, '/'),
+                                  output_basename, include, exclude):
+                    stable.add(path)
+
+            for image_path, stat, arrival in stable.pop_ready():
+                if image_path in queued:
+                    # Modifiée pendant son traitement : revue une fois celui-ci terminé
+                    stable.add(image_path, arrival)
+                    continue
+                if manifest is not None and manifest.lookup(image_path, stat) is not None:
+                    continue
+                result.total += 1
+                queued.add(image_path)
+                queue.push((image_path, stat, arrival), estimate_footprint(image_path, job, max_size))
+
+            while len(pending) < workers * MAX_IN_FLIGHT_PER_WORKER:
+                admitted = queue.pop()
+                if admitted is None:
+                    break
+                (image_path, stat, arrival), footprint = admitted
+                reserved_path = allocator.allocate(output_basename, next_index,
+                                                   _output_extension(encoding, image_path))
+                future = executor.submit(_process_image, image_path, output_folder, output_basename,
+                                         next_index, job, metadata, max_size, reserved_path, encoding)
+                next_index += 1
+                pending[future] = (image_path, stat, arrival, reserved_path, footprint)
+
+            for future in [future for future in pending if future.done()]:
+                finish(future)
+
+        # Arrêt : les images en cours sont terminées, celles en attente abandonnées
+        result.cancelled = True
+        for future in wait(list(pending)).done:
+            finish(future)
+    return result
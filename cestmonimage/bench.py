@@ -0,0 +1,346 @@
+"""Banc d'essai du traitement par lot : corpus synthétiques, configurations, rapport JSON.
+
+Chaque mesure traite un petit corpus d'images générées (taille, format,
+mode, avec ou sans EXIF) avec une configuration de watermark, par le même
+chemin que l'interface (:func:`.batch.run_batch`), dans un processus neuf :
+le pic mémoire mesuré est celui de ce seul cas. Le rapport JSON permet de
+comparer deux versions (``--compare``).
+
+Exemple::
+
+    python -m cestmonimage.bench --quick -o avant.json
+    python -m cestmonimage.bench --quick -o apres.json --compare avant.json
+"""
+import argparse
+import contextlib
+import fnmatch
+import io
+import itertools
+import json
+import multiprocessing
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import datetime
+
+import piexif
+import PIL
+from PIL import Image
+
+from .batch import run_batch
+from .engine import WatermarkJob
+from .metadata import APP_VERSION, ImageMetadata
+from .timing import summarize_timings
+from .utils import get_cache_dir, get_peak_rss, percentile
+
+SIZES_MP = (2, 12, 24, 50)
+CORPUS_MODES = {"jpeg": ("RGB", "L"), "png": ("RGB", "RGBA", "P", "L")}
+ASPECT_RATIO = 3 / 2  # Format des images générées (capteur 24x36)
+CORNERS = ("top-left", "top-right", "bottom-left", "bottom-right")
+WATERMARK_COUNTS = (1, 5, 10)
+MOSAIC_SPACINGS = (1.5, 2.5, 4.0)
+BOLD_FONT = "Juice ITC"  # Police sans Bold : le gras est simulé (faux gras)
+REFERENCE_CORPUS = (12, "jpeg", "RGB", True)
+REFERENCE_CONFIG = "bottom-right-1"
+DEFAULT_TOLERANCE = 0.10  # Hausse de la latence médiane signalée comme régression
+
+
+@dataclass(frozen=True)
+class Corpus:
+    """Jeu d'images synthétiques identiques d'une exécution à l'autre."""
+    megapixels: int
+    format: str
+    mode: str
+    exif: bool
+
+    @property
+    def name(self) -> str:
+        return f"{self.megapixels}mp-{self.format}-{self.mode}{'-exif' if self.exif else ''}"
+
+    @property
+    def size(self) -> tuple[int, int]:
+        height = round((self.megapixels * 1_000_000 / ASPECT_RATIO) ** 0.5)
+        return round(height * ASPECT_RATIO), height
+
+
+def all_corpora(sizes=SIZES_MP, formats=tuple(CORPUS_MODES)) -> list[Corpus]:
+    """Corpus de toutes les combinaisons (EXIF seulement pour le JPEG, comme le lot)."""
+    corpora = []
+    for megapixels in sizes:
+        for image_format in formats:
+            for mode in CORPUS_MODES[image_format]:
+                for exif in ((False, True) if image_format == "jpeg" else (False,)):
+                    corpora.append(Corpus(megapixels, image_format, mode, exif))
+    return corpora
+
+
+def all_configs() -> dict[str, WatermarkJob]:
+    """Configurations de watermark mesurées, par nom."""
+    base = WatermarkJob(text="© Banc d'essai CestMonImage", font_name=BOLD_FONT)
+    configs = {}
+    for position in CORNERS:
+        for count in WATERMARK_COUNTS:
+            configs[f"{position}-{count}"] = WatermarkJob(
+                **{**asdict(base), "position": position, "num_watermarks": count})
+    for spacing in MOSAIC_SPACINGS:
+        configs[f"mosaic-{spacing}"] = WatermarkJob(
+            **{**asdict(base), "is_mosaic": True, "mosaic_spacing_h": spacing,
+               "mosaic_spacing_v": spacing})
+    # Texte différent pour chaque image (variables, voir .template)
+    configs["template"] = WatermarkJob(**{**asdict(base), "text": "© {filename} {date} #{index:03d}"})
+    configs["mosaic-template"] = WatermarkJob(**{**asdict(configs["template"]), "is_mosaic": True,
+                                                 "mosaic_spacing_h": 1.5, "mosaic_spacing_v": 1.5})
+    # Chaque configuration aussi en faux gras
+    for name, job in list(configs.items()):
+        configs[f"{name}-bold"] = WatermarkJob(**{**asdict(job), "is_bold": True})
+    return configs
+
+
+def _synthetic_image(corpus: Corpus, seed: int) -> Image.Image:
+    """Image déterministe : fractale et dégradés, plus un grain qui résiste à la compression."""
+    width, height = corpus.size
+    rng = random.Random(f"{corpus.megapixels}-{seed}")
+    fractal = Image.effect_mandelbrot((1024, 683), (-2.2 + seed * 0.05, -1.2, 1.0, 1.2), 64)
+    base = fractal.resize((width, height), Image.Resampling.BICUBIC)
+    # Grain à mi-résolution (pas de motif répété que le PNG compresserait)
+    grain_size = (max(1, width // 2), max(1, height // 2))
+    grain = Image.frombytes('L', grain_size, rng.randbytes(grain_size[0] * grain_size[1]))
+    grain = grain.resize((width, height), Image.Resampling.BILINEAR)
+    red = Image.blend(base, grain, 0.35)
+    green = Image.linear_gradient('L').resize((width, height))
+    blue = Image.blend(Image.radial_gradient('L').resize((width, height)), grain, 0.2)
+    img = Image.merge('RGB', (red, green, blue))
+    if corpus.mode == "RGBA":
+        img.putalpha(Image.radial_gradient('L').resize((width, height)).point(lambda v: 255 - v // 2))
+    elif corpus.mode == "P":
+        img = img.quantize(256)
+    elif corpus.mode == "L":
+        img = img.convert('L')
+    return img
+
+
+def _camera_exif(img: Image.Image) -> bytes:
+    """EXIF d'appareil photo plausible (marque, date, vignette)."""
+    thumbnail = io.BytesIO()
+    img.convert('RGB').resize((160, 107)).save(thumbnail, "JPEG", quality=75)
+    return piexif.dump({
+        "0th": {piexif.ImageIFD.Make: b"CestMonImage", piexif.ImageIFD.Model: b"Banc d'essai",
+                piexif.ImageIFD.Artist: b"Photographe"},
+        "Exif": {piexif.ExifIFD.DateTimeOriginal: b"2024:06:01 12:00:00",
+                 piexif.ExifIFD.ExposureTime: (1, 250), piexif.ExifIFD.FNumber: (56, 10)},
+        "GPS": {}, "1st": {}, "thumbnail": thumbnail.getvalue(),
+    })
+
+
+def prepare_corpora(corpora, count: int, corpus_dir: str) -> dict[Corpus, list[str]]:
+    """Génère les corpus manquants, hors du processus principal.
+
+    Sous Linux, un processus lancé hérite du pic mémoire de son parent : le
+    processus principal doit rester petit pour que les pics mesurés soient
+    ceux des cas eux-mêmes.
+    """
+    return _in_fresh_process(_prepare_all, list(corpora), count, corpus_dir)
+
+
+def _prepare_all(corpora, count, corpus_dir):
+    return {corpus: prepare_corpus(corpus, count, corpus_dir) for corpus in corpora}
+
+
+def prepare_corpus(corpus: Corpus, count: int, corpus_dir: str) -> list[str]:
+    """Génère (une fois, puis réutilise) les images d'un corpus."""
+    folder = os.path.join(corpus_dir, corpus.name)
+    os.makedirs(folder, exist_ok=True)
+    extension = ".jpg" if corpus.format == "jpeg" else ".png"
+    paths = []
+    for seed in range(count):
+        path = os.path.join(folder, f"source_{seed:02d}{extension}")
+        if not os.path.exists(path):
+            img = _synthetic_image(corpus, seed)
+            options = {"quality": 90} if corpus.format == "jpeg" else {"compress_level": 6}
+            if corpus.exif:
+                options["exif"] = _camera_exif(img)
+            # Écriture atomique : un corpus interrompu n'est pas réutilisé à moitié écrit
+            img.save(path + ".tmp", corpus.format.upper(), **options)
+            os.replace(path + ".tmp", path)
+        paths.append(path)
+    return paths
+
+
+def _measure(image_files: list[str], job: WatermarkJob) -> dict:
+    """Traite un corpus dans le processus courant (processus neuf) et chronomètre chaque image."""
+    baseline_rss = get_peak_rss()
+    stamps = []
+    with tempfile.TemporaryDirectory(prefix="cestmonimage-bench-") as output_folder:
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = run_batch(image_files, output_folder, "bench", job, ImageMetadata(author="Bench"),
+                               progress_callback=lambda *_: stamps.append(time.perf_counter()),
+                               resume=False)
+    latencies = [later - earlier for earlier, later in zip([start] + stamps, stamps)]
+    elapsed = stamps[-1] - start if stamps else 0.0
+    peak_rss = get_peak_rss()
+    return {
+        "images": len(result.outputs),
+        "errors": len(result.errors),
+        "total_s": round(elapsed, 4),
+        "images_per_s": round(len(result.outputs) / elapsed, 3) if elapsed else None,
+        "latency_ms": {
+            "first": round(latencies[0] * 1000, 1),
+            "p50": round(percentile(latencies, 0.50) * 1000, 1),
+            "p90": round(percentile(latencies, 0.90) * 1000, 1),
+            "p99": round(percentile(latencies, 0.99) * 1000, 1),
+            "max": round(max(latencies) * 1000, 1),
+        } if latencies else None,
+        "baseline_rss_mb": round(baseline_rss / 2**20, 1) if baseline_rss else None,
+        "peak_rss_mb": round(peak_rss / 2**20, 1) if peak_rss else None,
+        # Médiane par étape : où passe le temps d'une image
+        "stages_p50_ms": {name: summary["p50_ms"]
+                          for name, summary in summarize_timings(result.timings).items()},
+    }
+
+
+def _in_fresh_process(function, *args):
+    """Exécute ``function(*args)`` dans un processus neuf et retourne son résultat."""
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+        return executor.submit(function, *args).result()
+
+
+def run_case(image_files: list[str], job: WatermarkJob) -> dict:
+    """Mesure un cas dans un processus neuf (pic mémoire propre au cas)."""
+    return _in_fresh_process(_measure, image_files, job)
+
+
+def _environment() -> dict:
+    """Versions et machine, pour ne comparer que des rapports comparables."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, cwd=os.path.dirname(__file__), timeout=5).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        commit = ""
+    return {
+        "app_version": APP_VERSION,
+        "commit": commit or None,
+        "python": platform.python_version(),
+        "pillow": PIL.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "date": datetime.now().isoformat(timespec="seconds"),
+    }
+
+
+def plan_cases(corpora: list[Corpus], configs: dict[str, WatermarkJob], matrix: str):
+    """Liste les couples (corpus, configuration) à mesurer.
+
+    ``cross`` mesure toutes les configurations sur le corpus de référence et
+    tous les corpus avec la configuration de référence ; ``full`` mesure le
+    produit complet.
+    """
+    if matrix == "full":
+        return list(itertools.product(corpora, configs))
+    reference = Corpus(*REFERENCE_CORPUS)
+    cases = [(reference, name) for name in configs] if reference in corpora else []
+    if REFERENCE_CONFIG in configs:
+        cases += [(corpus, REFERENCE_CONFIG) for corpus in corpora if corpus != reference]
+    return cases
+
+
+def compare_reports(baseline: dict, current: dict, tolerance: float) -> list[str]:
+    """Affiche l'évolution de chaque cas et retourne les régressions.
+
+    La latence médiane sert de critère : contrairement au débit, elle
+    n'est pas faussée par la première image (polices et calques à froid).
+    """
+    previous = {(r["corpus"], r["config"]): r for r in baseline.get("results", [])}
+    regressions = []
+    for result in current["results"]:
+        before = previous.get((result["corpus"], result["config"]))
+        if not before or not before.get("latency_ms") or not result.get("latency_ms"):
+            continue
+        old_p50, new_p50 = before["latency_ms"]["p50"], result["latency_ms"]["p50"]
+        ratio = new_p50 / old_p50 if old_p50 else 1.0
+        line = (f"{result['corpus']:24s} {result['config']:26s} p50 {old_p50:8.1f} -> {new_p50:8.1f} ms "
+                f"({ratio - 1:+.0%})  {before['images_per_s']} -> {result['images_per_s']} img/s")
+        print(line)
+        if ratio > 1 + tolerance:
+            regressions.append(line)
+    return regressions
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Construit le parseur d'arguments du banc d'essai."""
+    parser = argparse.ArgumentParser(prog="cestmonimage.bench",
+                                     description="Mesure le débit, la latence et la mémoire du lot.")
+    parser.add_argument("-o", "--output", default="bench.json", help="Rapport JSON à écrire")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES_MP),
+                        help="Tailles des corpus en mégapixels")
+    parser.add_argument("--formats", nargs="+", choices=list(CORPUS_MODES), default=list(CORPUS_MODES),
+                        help="Formats des corpus")
+    parser.add_argument("--configs", nargs="+", default=["*"], metavar="GLOB",
+                        help="Configurations à mesurer (motifs glob sur les noms, voir --list)")
+    parser.add_argument("--matrix", choices=("cross", "full"), default="cross",
+                        help="cross : configurations x corpus de référence, corpus x configuration "
+                             "de référence ; full : toutes les combinaisons")
+    parser.add_argument("--images", type=int, default=5, help="Images par corpus")
+    parser.add_argument("--quick", action="store_true",
+                        help="Mesure rapide : corpus 2 et 12 Mpx, 3 images")
+    parser.add_argument("--corpus-dir", default=os.path.join(get_cache_dir(), "bench-corpus"),
+                        help="Dossier des corpus générés (réutilisés d'une exécution à l'autre)")
+    parser.add_argument("--compare", metavar="JSON", help="Rapport de référence à comparer")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Hausse de la latence médiane tolérée avant de signaler une "
+                             "régression (0.10 = 10%%)")
+    parser.add_argument("--list", action="store_true", help="Liste les corpus et configurations")
+    return parser
+
+
+def main(argv=None) -> int:
+    """Point d'entrée du banc d'essai.
+
+    Returns:
+        Code de sortie : 1 si une régression est détectée avec ``--compare``, 0 sinon
+    """
+    args = build_parser().parse_args(argv)
+    if args.quick:
+        args.sizes = [size for size in args.sizes if size <= 12] or [2]
+        args.images = min(args.images, 3)
+    corpora = all_corpora(args.sizes, args.formats)
+    configs = {name: job for name, job in all_configs().items()
+               if any(fnmatch.fnmatch(name, pattern) for pattern in args.configs)}
+    if args.list:
+        print("Corpus :", ", ".join(corpus.name for corpus in corpora))
+        print("Configurations :", ", ".join(configs))
+        return 0
+
+    cases = plan_cases(corpora, configs, args.matrix)
+    corpus_files = prepare_corpora({corpus for corpus, _ in cases}, args.images, args.corpus_dir)
+    report = {"environment": _environment(), "images_per_corpus": args.images, "results": []}
+    for number, (corpus, config_name) in enumerate(cases, 1):
+        measure = run_case(corpus_files[corpus], configs[config_name])
+        report["results"].append({"corpus": corpus.name, "config": config_name, **measure})
+        latency = measure["latency_ms"] or {}
+        print(f"[{number}/{len(cases)}] {corpus.name:24s} {config_name:26s} "
+              f"{measure['images_per_s'] or 0:7.2f} img/s  p50 {latency.get('p50', 0):7.1f} ms  "
+              f"p99 {latency.get('p99', 0):7.1f} ms  pic {measure['peak_rss_mb']} Mo")
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"Rapport écrit : {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            regressions = compare_reports(json.load(f), report, args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} régression(s) au-delà de {args.tolerance:.0%}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+"""Cache LRU générique et thread-safe utilisé par le moteur de rendu."""
+import threading
+from collections import OrderedDict
+
+
+def image_nbytes(img) -> int:
+    """Estime la mémoire occupée par les pixels d'une image Pillow."""
+    return img.width * img.height * len(img.getbands())
+
+
+class LRUCache:
+    """Cache LRU borné en nombre d'entrées et, optionnellement, en mémoire.
+
+    Les compteurs ``hits``/``misses`` permettent de mesurer l'efficacité
+    du cache (voir :meth:`stats`).
+
+    Args:
+        max_items: Nombre maximal d'entrées conservées
+        max_bytes: Mémoire maximale des valeurs (None = pas de limite)
+        sizeof: Fonction donnant la taille en octets d'une valeur
+            (obligatoire si ``max_bytes`` est défini)
+    """
+
+    def __init__(self, max_items: int, max_bytes: int | None = None, sizeof=None):
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._sizeof = sizeof
+        self._nbytes = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Retourne la valeur associée à ``key`` (None si absente)."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        """Ajoute une entrée et évince les plus anciennes si nécessaire.
+
+        Une valeur plus grande que ``max_bytes`` à elle seule n'est pas stockée.
+        """
+        size = self._sizeof(value) if self._sizeof else 0
+        with self._lock:
+            if self.max_bytes is not None and size > self.max_bytes:
+                return
+            if key in self._data:
+                self._nbytes -= self._data.pop(key)[1]
+            self._data[key] = (value, size)
+            self._nbytes += size
+            self._evict()
+
+    def get_or_create(self, key, factory):
+        """Retourne la valeur en cache, ou la crée avec ``factory()`` et la stocke."""
+        value = self.get(key)
+        if value is None:
+            value = factory()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        """Vide le cache et remet les compteurs à zéro."""
+        with self._lock:
+            self._data.clear()
+            self._nbytes = 0
+            self.hits = 0
+            self.misses = 0
+
+    def resize(self, max_items: int | None = None, max_bytes: int | None = None):
+        """Change les limites du cache et évince immédiatement le surplus."""
+        with self._lock:
+            if max_items is not None:
+                self.max_items = max_items
+            if max_bytes is not None:
+                self.max_bytes = max_bytes
+            self._evict()
+
+    def _evict(self):
+        """Évince les entrées les plus anciennes tant qu'une limite est dépassée (verrou tenu)."""
+        while self._data and (len(self._data) > self.max_items or (
+                self.max_bytes is not None and self._nbytes > self.max_bytes)):
+            _, (_, evicted_size) = self._data.popitem(last=False)
+            self._nbytes -= evicted_size
+
+    def stats(self) -> dict:
+        """Retourne les compteurs du cache (entrées, octets, hits, misses)."""
+        with self._lock:
+            return {"entries": len(self._data), "bytes": self._nbytes,
+                    "hits": self.hits, "misses": self.misses}
+
+    def __len__(self):
+        return len(self._data)
@@ -0,0 +1,226 @@
+"""Interface en ligne de commande : traitement par lot sans interface graphique.
+
+Exemple::
+
+    python -m cestmonimage /photos/shooting --text "Studio Dupont" --mosaic
+"""
+import argparse
+import itertools
+import json
+import os
+import signal
+import sys
+import threading
+import time
+
+from .batch import default_workers, run_batch, run_watch
+from .decode import io_stats
+from .encoders import PRESETS, OutputEncoding, output_formats
+from .engine import DEFAULT_COLOR, POSITIONS, WatermarkJob, cache_stats
+from .fonts import DEFAULT_FONT
+from .metadata import ImageMetadata
+from .scan import is_image_file, iter_images
+from .template import TEMPLATE_FIELDS, parse_template
+from .timing import PROFILE_FILENAME, summarize_timings, write_run_report
+from .utils import get_peak_rss
+from .watch import WATCH_SETTLE_SECONDS
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Construit le parseur d'arguments de la CLI."""
+    parser = argparse.ArgumentParser(
+        prog="cestmonimage",
+        description="Applique un watermark de copyright sur une image ou un dossier d'images.")
+    parser.add_argument("source", help="Image ou dossier d'images à traiter")
+    parser.add_argument("-o", "--output-dir",
+                        help="Dossier de sortie (par défaut : dossier de la source)")
+    parser.add_argument("-n", "--output-name", default="image",
+                        help="Nom de base des fichiers de sortie (image → image_001.jpg)")
+    parser.add_argument("-f", "--format", choices=output_formats(), default="jpeg",
+                        help="Format des fichiers de sortie ('keep' = format de la source)")
+    parser.add_argument("--preset", choices=PRESETS, default=None,
+                        help="Réglages d'encodage (défaut : JPEG qualité 95)")
+    parser.add_argument("-r", "--recursive", action="store_true",
+                        help="Traite aussi les images des sous-dossiers")
+    parser.add_argument("--include", action="append", default=[], metavar="GLOB",
+                        help="Ne traite que les fichiers correspondant au motif (répétable)")
+    parser.add_argument("--exclude", action="append", default=[], metavar="GLOB",
+                        help="Ignore les fichiers et sous-dossiers correspondant au motif (répétable)")
+
+    style = parser.add_argument_group("watermark")
+    style.add_argument("--symbol", default="©", help="Symbole de copyright")
+    style.add_argument("--text", default="Certification de la qualité",
+                       help="Texte du copyright ; variables remplacées pour chaque image : "
+                            + ", ".join(f"{{{name}}}" for name in TEMPLATE_FIELDS)
+                            + " (ex: '{artist} - {date}', '{index:03d}')")
+    style.add_argument("--font", default=DEFAULT_FONT, help="Nom de la police")
+    style.add_argument("--bold", action="store_true", help="Texte en gras")
+    style.add_argument("--color", default=DEFAULT_COLOR, help="Couleur '#RRGGBB'")
+    style.add_argument("--opacity", type=int, default=50, help="Opacité en %% (0-100)")
+    style.add_argument("--size", type=float, default=5.0,
+                       help="Taille de police en %% de la largeur de l'image")
+    style.add_argument("--position", choices=POSITIONS, default="bottom-right",
+                       help="Position du watermark")
+    style.add_argument("--count", type=int, default=1, help="Nombre de watermarks (hors mosaïque)")
+    style.add_argument("--mosaic", action="store_true", help="Mode mosaïque")
+    style.add_argument("--spacing-h", type=float, default=2.5, help="Espacement horizontal (mosaïque)")
+    style.add_argument("--spacing-v", type=float, default=2.5, help="Espacement vertical (mosaïque)")
+
+    parser.add_argument("--max-size", type=int, default=None,
+                        help="Plus grand côté des images de sortie en pixels (réduction)")
+
+    parser.add_argument("--no-resume", dest="resume", action="store_false",
+                        help="Retraite toutes les images, même celles déjà traitées par un "
+                             "lancement précédent (voir le manifeste du dossier de sortie)")
+
+    watch = parser.add_argument_group("surveillance")
+    watch.add_argument("--watch", action="store_true",
+                       help="Surveille le dossier source et traite chaque image dès que sa copie "
+                            "est terminée, jusqu'à Ctrl+C (inotify sous Linux, sinon relistage)")
+    watch.add_argument("--settle", type=float, default=WATCH_SETTLE_SECONDS, metavar="SECONDES",
+                       help="Délai sans changement de taille ni de date avant de traiter une "
+                            f"image déposée (défaut : {WATCH_SETTLE_SECONDS})")
+    watch.add_argument("--poll", action="store_true",
+                       help="Relit le dossier à intervalle régulier au lieu d'utiliser inotify "
+                            "(partages réseau)")
+
+    perf = parser.add_argument_group("performances")
+    perf.add_argument("-j", "--workers", type=int, default=default_workers(),
+                      help="Nombre de processus en parallèle (défaut : nombre de cœurs)")
+    perf.add_argument("--memory-mb", type=int, default=None,
+                      help="Mémoire maximale des images traitées en même temps, en Mo, estimée "
+                           "d'après leurs dimensions (défaut : 3/4 de la mémoire disponible ; "
+                           "0 = sans limite)")
+    perf.add_argument("--cache-mb", type=int, default=None,
+                      help="Mémoire maximale du cache de calques en Mo (0 = désactivé)")
+    perf.add_argument("--stats", action="store_true",
+                      help="Affiche les hits/misses des caches, les octets lus et le pic mémoire "
+                           "(processus principal : utiliser avec -j 1)")
+    perf.add_argument("--report", metavar="FICHIER", default=None,
+                      help="Écrit la durée de chaque étape (lecture, décodage, calque, fusion, "
+                           "encodage...) par image et leur synthèse : JSON, ou CSV si le nom "
+                           "se termine par .csv")
+    perf.add_argument("--profile", action="store_true",
+                      help=f"Profile le lot avec cProfile (processus du pool compris) ; le profil "
+                           f"est écrit dans le dossier de sortie ({PROFILE_FILENAME})")
+
+    meta = parser.add_argument_group("métadonnées EXIF")
+    meta.add_argument("--author", default="", help="Auteur")
+    meta.add_argument("--title", default="", help="Titre")
+    meta.add_argument("--subject", default="", help="Objet")
+    meta.add_argument("--comment", default="", help="Commentaires")
+    return parser
+
+
+def job_from_args(args: argparse.Namespace) -> WatermarkJob:
+    """Convertit les arguments de la CLI en configuration de watermark."""
+    return WatermarkJob(
+        text=f"{args.symbol} {args.text}",
+        font_name=args.font,
+        is_bold=args.bold,
+        color=args.color,
+        opacity=args.opacity / 100,
+        position=args.position,
+        num_watermarks=args.count,
+        is_mosaic=args.mosaic,
+        font_size_percent=args.size / 100,
+        mosaic_spacing_h=args.spacing_h,
+        mosaic_spacing_v=args.spacing_v,
+    )
+
+
+def main(argv=None) -> int:
+    """Point d'entrée de la CLI.
+
+    Returns:
+        Code de sortie : 0 si toutes les images ont été traitées, 1 sinon
+    """
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    job = job_from_args(args)
+    try:
+        parse_template(job.text)
+    except ValueError as e:
+        parser.error(str(e))
+    output_basename = args.output_name.strip() or "image"
+    if args.watch and not os.path.isdir(args.source):
+        parser.error("--watch attend un dossier source")
+    if args.watch and args.profile:
+        parser.error("--profile n'est pas disponible avec --watch")
+
+    metadata = ImageMetadata(author=args.author.strip(), title=args.title.strip(),
+                             subject=args.subject.strip(), comment=args.comment.strip())
+    cache_bytes = args.cache_mb * 1024 * 1024 if args.cache_mb is not None else None
+    memory_budget = args.memory_mb * 1024 * 1024 if args.memory_mb is not None else None
+    if args.watch:
+        return _watch(args, job, metadata, output_basename, cache_bytes, memory_budget)
+
+    if os.path.isdir(args.source):
+        # Listage progressif : le traitement commence avant la fin du parcours
+        image_files = iter_images(args.source, output_basename, args.recursive,
+                                  args.include, args.exclude)
+        output_folder = args.output_dir or args.source
+    elif os.path.isfile(args.source) and is_image_file(args.source):
+        image_files = [args.source]
+        output_folder = args.output_dir or os.path.dirname(os.path.abspath(args.source))
+    else:
+        print(f"Erreur : source introuvable ou non supportée : {args.source}", file=sys.stderr)
+        return 1
+
+    image_files = iter(image_files)
+    first_image = next(image_files, None)
+    if first_image is None:
+        print("Aucune image trouvée à traiter", file=sys.stderr)
+        return 1
+    image_files = itertools.chain([first_image], image_files)
+
+    os.makedirs(output_folder, exist_ok=True)
+    start = time.perf_counter()
+    result = run_batch(image_files, output_folder, output_basename, job, metadata,
+                       workers=args.workers, overlay_cache_bytes=cache_bytes, max_size=args.max_size,
+                       resume=args.resume, encoding=OutputEncoding(args.format, args.preset),
+                       memory_budget=memory_budget, profile=args.profile)
+    wall_time = time.perf_counter() - start
+
+    print(f"Traitement terminé : {len(result.outputs)}/{result.total} images traitées")
+    if result.skipped:
+        print(f"{result.skipped} images déjà traitées lors d'un lancement précédent (reprises)")
+    if args.stats:
+        peak_rss = get_peak_rss()
+        stats = {**cache_stats(), "io": io_stats(), "pipeline": result.pipeline,
+                 "peak_rss_mb": round(peak_rss / (1024 * 1024), 1) if peak_rss is not None else None}
+        print(json.dumps(stats, indent=2))
+    if args.report:
+        write_run_report(result, args.report, wall_time)
+        print(f"Rapport des étapes : {args.report}")
+    if args.profile:
+        print(f"Profil : {os.path.join(output_folder, PROFILE_FILENAME)}")
+    return 1 if result.errors else 0
+
+
+def _watch(args: argparse.Namespace, job: WatermarkJob, metadata: ImageMetadata, output_basename: str,
+           cache_bytes: int | None, memory_budget: int | None) -> int:
+    """Mode surveillance (``--watch``) : tourne jusqu'à Ctrl+C ou SIGTERM."""
+    output_folder = args.output_dir or args.source
+    os.makedirs(output_folder, exist_ok=True)
+    stop = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stop.set())
+    start = time.perf_counter()
+    result = run_watch(args.source, output_folder, output_basename, job, metadata,
+                       workers=max(1, args.workers), overlay_cache_bytes=cache_bytes,
+                       cancel_event=stop, max_size=args.max_size,
+                       encoding=OutputEncoding(args.format, args.preset), memory_budget=memory_budget,
+                       recursive=args.recursive, include=args.include, exclude=args.exclude,
+                       settle=args.settle, polling=args.poll, resume=args.resume)
+    wall_time = time.perf_counter() - start
+
+    print(f"Surveillance arrêtée : {len(result.outputs)} images traitées, {len(result.errors)} en échec")
+    latency = summarize_timings(result.timings).get("latency")
+    if latency:
+        print(f"Délai arrivée → sortie : médiane {latency['p50_ms'] / 1000:.2f} s, "
+              f"p95 {latency['p95_ms'] / 1000:.2f} s, max {latency['max_ms'] / 1000:.2f} s")
+    if args.report:
+        write_run_report(result, args.report, wall_time)
+        print(f"Rapport des étapes : {args.report}")
+    return 1 if result.errors else 0
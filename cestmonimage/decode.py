@@ -0,0 +1,158 @@
+"""Lecture et décodage des images sources, à résolution réduite quand la cible est plus petite."""
+import os
+import struct
+import threading
+
+from PIL import Image, UnidentifiedImageError
+
+# Plus grande source du traitement par lot (largeur x hauteur). Pillow refuse
+# par défaut les images de plus de 179 Mpx (protection contre les « bombes de
+# décompression »), mais les panoramas assemblés (30000 x 10000) sont traités
+# par tuiles (voir :func:`.engine.composite_tiled`). Passée explicitement à
+# load_image : la limite globale de Pillow n'est pas modifiée.
+MAX_SOURCE_PIXELS = 1_000_000_000
+
+# Compteurs d'entrées/sorties du processus courant (voir io_stats)
+_io_lock = threading.Lock()
+_io_counters = {"files": 0, "bytes": 0}
+
+
+def read_source(image_path: str) -> bytes:
+    """Lit un fichier source en une seule lecture.
+
+    Le même tampon sert ensuite au décodeur et à la lecture des EXIF : le
+    fichier n'est lu qu'une fois sur le disque (ou le partage réseau).
+    """
+    with open(image_path, 'rb') as f:
+        data = f.read()
+    with _io_lock:
+        _io_counters["files"] += 1
+        _io_counters["bytes"] += len(data)
+    return data
+
+
+def io_stats() -> dict:
+    """Retourne le nombre de fichiers sources lus et les octets lus (processus courant)."""
+    with _io_lock:
+        return dict(_io_counters)
+
+
+def reset_io_stats():
+    """Remet les compteurs d'entrées/sorties à zéro."""
+    with _io_lock:
+        _io_counters["files"] = 0
+        _io_counters["bytes"] = 0
+
+
+def fit_size(size, max_size) -> tuple[int, int]:
+    """Calcule la taille d'une image réduite pour tenir dans ``max_size`` (ratio conservé).
+
+    Args:
+        size: Taille (largeur, hauteur) d'origine
+        max_size: Boîte (largeur, hauteur) à ne pas dépasser
+
+    Returns:
+        Taille réduite (inchangée si l'image tient déjà dans la boîte)
+    """
+    width, height = size
+    scale = min(max_size[0] / width, max_size[1] / height, 1.0)
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def _open_unchecked(image_path) -> Image.Image:
+    # Même recherche du format qu'Image.open, sans sa limite globale de pixels
+    is_path = isinstance(image_path, (str, os.PathLike))
+    if is_path:
+        source = filename = os.fspath(image_path)
+        with open(source, 'rb') as f:
+            prefix = f.read(16)
+    else:
+        source, filename = image_path, ""
+        prefix = source.read(16)
+    for loader in (Image.preinit, Image.init):
+        loader()
+        for format_id in Image.ID:
+            factory, accept = Image.OPEN[format_id]
+            accepted = not accept or accept(prefix)
+            # Une chaîne est un avertissement de Pillow : format refusé
+            if not accepted or isinstance(accepted, str):
+                continue
+            if not is_path:
+                source.seek(0)
+            try:
+                return factory(source, filename)
+            except (SyntaxError, IndexError, TypeError, struct.error):
+                continue
+    raise UnidentifiedImageError(f"cannot identify image file {filename or image_path!r}")
+
+
+def open_image(image_path, max_pixels: int | None = None) -> Image.Image:
+    """Ouvre une image (en-tête seulement) avec une limite de taille propre à l'appel.
+
+    Sans ``max_pixels``, c'est ``Image.open`` et la limite globale de Pillow
+    (179 Mpx). Avec, cette limite n'est ni appliquée ni modifiée : largeur x
+    hauteur lues dans l'en-tête sont comparées à ``max_pixels``, avant tout
+    décodage.
+
+    Args:
+        image_path: Chemin (ou fichier ouvert) de l'image source
+        max_pixels: Nombre de pixels maximal, ou None pour la limite de Pillow
+
+    Raises:
+        Image.DecompressionBombError: Image plus grande que ``max_pixels``
+        PIL.UnidentifiedImageError: Format non reconnu
+    """
+    if max_pixels is None:
+        return Image.open(image_path)
+    img = _open_unchecked(image_path)
+    width, height = img.size
+    if width * height > max_pixels:
+        img.close()
+        raise Image.DecompressionBombError(
+            f"Image trop grande : {width} x {height} px ({width * height / 1e6:.0f} Mpx, "
+            f"maximum {max_pixels / 1e6:.0f} Mpx)")
+    return img
+
+
+def load_image(image_path, max_size=None, max_pixels: int | None = None) -> Image.Image:
+    """Ouvre et décode une image, directement à une résolution proche de la cible.
+
+    Les JPEG sont décodés réduits par le décodeur lui-même (mise à l'échelle
+    DCT 1/2, 1/4 ou 1/8 via ``Image.draft``). Les autres formats sont réduits
+    d'un facteur entier avec ``Image.reduce`` avant le redimensionnement
+    final LANCZOS.
+
+    Args:
+        image_path: Chemin (ou fichier ouvert) de l'image source
+        max_size: Boîte (largeur, hauteur) de la sortie, ou None pour la pleine résolution
+        max_pixels: Taille maximale de la source (voir :func:`open_image`)
+
+    Returns:
+        Image chargée en mémoire
+    """
+    img = open_image(image_path, max_pixels)
+    target = fit_size(img.size, max_size) if max_size else img.size
+    if target == img.size:
+        img.load()
+        return img
+
+    # Le décodeur JPEG choisit la plus petite échelle qui reste >= cible
+    img.draft(None, target)
+    reduced = img
+    factor = min(img.width // target[0], img.height // target[1])
+    if factor >= 2:
+        try:
+            reduced = img.reduce(factor)
+        except ValueError:
+            # Modes non supportés par reduce (P, 1, I;16...) : redimensionnement seul
+            reduced = img
+    result = reduced.resize(target, Image.Resampling.LANCZOS)
+    img.close()
+    return result
+
+
+def max_size_box(max_dimension: int | None):
+    """Convertit une taille maximale du plus grand côté en boîte (largeur, hauteur)."""
+    if not max_dimension:
+        return None
+    return (max_dimension, max_dimension)
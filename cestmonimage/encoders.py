@@ -0,0 +1,202 @@
+"""Encodage des images de sortie : format (JPEG, PNG, WebP, TIFF...) et préréglages.
+
+Chaque format est géré par un :class:`Encoder` enregistré dans ``ENCODERS``
+(voir :func:`register_encoder`). Un préréglage (``"fast"``, ``"balanced"``,
+``"smallest"``) choisit les options concrètes de chaque encodeur ; sans
+préréglage, un JPEG est écrit en qualité 95 comme auparavant.
+"""
+import io
+import os
+from dataclasses import dataclass
+
+from PIL import Image, JpegImagePlugin
+
+from .decode import MAX_SOURCE_PIXELS, open_image
+
+JPEG_QUALITY = 95
+PRESETS = ("fast", "balanced", "smallest")
+KEEP_FORMAT = "keep"  # Même format que la source
+
+# Extension de la source -> format de sortie en mode "keep"
+SOURCE_FORMATS = {'.jpg': "jpeg", '.jpeg': "jpeg", '.png': "png", '.bmp': "bmp", '.gif': "gif",
+                  '.webp': "webp", '.tif': "tiff", '.tiff': "tiff"}
+
+
+@dataclass(frozen=True)
+class OutputEncoding:
+    """Format et préréglage des fichiers de sortie.
+
+    Attributes:
+        format: Nom d'un encodeur de ``ENCODERS`` ou ``"keep"`` (format de la source)
+        preset: Préréglage (voir PRESETS), ou None pour les réglages par défaut
+    """
+    format: str = "jpeg"
+    preset: str | None = None
+
+
+@dataclass(frozen=True)
+class JpegSource:
+    """Tables de quantification et sous-échantillonnage d'une source JPEG (qualité "keep")."""
+    qtables: dict
+    subsampling: int
+
+    @classmethod
+    def from_buffer(cls, data: bytes) -> "JpegSource | None":
+        """Lit les paramètres d'encodage d'un JPEG (en-têtes seulement, pas de décodage)."""
+        try:
+            with open_image(io.BytesIO(data), MAX_SOURCE_PIXELS) as img:
+                if img.format != "JPEG" or not getattr(img, "quantization", None):
+                    return None
+                return cls(img.quantization, JpegImagePlugin.get_sampling(img))
+        except Exception:
+            return None
+
+
+class Encoder:
+    """Encodeur d'un format de sortie.
+
+    Attributes:
+        name: Nom du format (ex: "png")
+        pil_format: Format Pillow passé à ``Image.save``
+        extension: Extension des fichiers écrits
+        supports_exif: Le format peut embarquer un bloc EXIF
+        keeps_alpha: Le format conserve la transparence
+    """
+    name = ""
+    pil_format = ""
+    extension = ""
+    supports_exif = False
+    keeps_alpha = True
+
+    def prepare(self, img: Image.Image) -> Image.Image:
+        """Convertit l'image dans un mode accepté par le format."""
+        target = 'RGBA' if self.keeps_alpha and 'A' in img.getbands() else 'RGB'
+        return img if img.mode == target else img.convert(target)
+
+    def options(self, preset: str | None, jpeg_source: JpegSource | None) -> dict:
+        """Options de ``Image.save`` pour un préréglage."""
+        return {}
+
+
+class JpegEncoder(Encoder):
+    """JPEG : sans préréglage, qualité 95 (comportement historique)."""
+
+    name = "jpeg"
+    pil_format = "JPEG"
+    extension = ".jpg"
+    supports_exif = True
+    keeps_alpha = False
+
+    def options(self, preset, jpeg_source):
+        if preset == "fast":
+            return {"quality": 90, "subsampling": 2}
+        if preset == "balanced":
+            if jpeg_source is not None:
+                # Équivalent de quality='keep' : mêmes tables que la source
+                return {"qtables": jpeg_source.qtables, "subsampling": jpeg_source.subsampling,
+                        "optimize": True}
+            return {"quality": 90, "optimize": True}
+        if preset == "smallest":
+            return {"quality": 80, "optimize": True, "progressive": True, "subsampling": 2}
+        return {"quality": JPEG_QUALITY}
+
+
+class PngEncoder(Encoder):
+    """PNG sans perte, transparence conservée."""
+
+    name = "png"
+    pil_format = "PNG"
+    extension = ".png"
+    supports_exif = True
+
+    def options(self, preset, jpeg_source):
+        if preset == "fast":
+            return {"compress_level": 1}
+        if preset == "smallest":
+            return {"optimize": True}
+        return {"compress_level": 6}
+
+
+class WebpEncoder(Encoder):
+    """WebP avec perte, transparence conservée."""
+
+    name = "webp"
+    pil_format = "WEBP"
+    extension = ".webp"
+    supports_exif = True
+
+    def options(self, preset, jpeg_source):
+        if preset == "fast":
+            return {"quality": 85, "method": 0}
+        if preset == "smallest":
+            return {"quality": 75, "method": 6}
+        if preset == "balanced":
+            return {"quality": 85, "method": 4}
+        return {"quality": 90, "method": 4}
+
+
+class TiffEncoder(Encoder):
+    """TIFF, non compressé ou compressé sans perte (LZW, Deflate)."""
+
+    name = "tiff"
+    pil_format = "TIFF"
+    extension = ".tif"
+    supports_exif = True
+
+    def options(self, preset, jpeg_source):
+        if preset == "balanced":
+            return {"compression": "tiff_lzw"}
+        if preset == "smallest":
+            return {"compression": "tiff_adobe_deflate"}
+        return {}
+
+
+class GifEncoder(Encoder):
+    """GIF (palette 256 couleurs)."""
+
+    name = "gif"
+    pil_format = "GIF"
+    extension = ".gif"
+
+    def options(self, preset, jpeg_source):
+        return {"optimize": preset == "smallest"}
+
+
+class BmpEncoder(Encoder):
+    """BMP non compressé."""
+
+    name = "bmp"
+    pil_format = "BMP"
+    extension = ".bmp"
+
+
+ENCODERS = {}
+
+
+def register_encoder(encoder: Encoder):
+    """Ajoute (ou remplace) l'encodeur d'un format."""
+    ENCODERS[encoder.name] = encoder
+
+
+for _encoder in (JpegEncoder(), PngEncoder(), WebpEncoder(), TiffEncoder(), GifEncoder(), BmpEncoder()):
+    register_encoder(_encoder)
+
+
+def output_formats() -> list[str]:
+    """Formats de sortie disponibles (``"keep"`` compris)."""
+    return [KEEP_FORMAT, *ENCODERS]
+
+
+def get_encoder(encoding: OutputEncoding, source_path: str) -> Encoder:
+    """Retourne l'encodeur à utiliser pour une source.
+
+    En mode ``"keep"``, le format est déduit de l'extension de la source
+    (JPEG si elle est inconnue).
+    """
+    name = encoding.format
+    if name == KEEP_FORMAT:
+        name = SOURCE_FORMATS.get(os.path.splitext(source_path)[1].lower(), "jpeg")
+    try:
+        return ENCODERS[name]
+    except KeyError:
+        raise ValueError(f"Format de sortie inconnu : {encoding.format}") from None
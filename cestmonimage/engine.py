@@ -0,0 +1,738 @@
+"""Moteur de rendu du watermark, indépendant de l'interface Tkinter.
+
+Le moteur reçoit une configuration immuable (:class:`WatermarkJob`) et une
+image Pillow, et renvoie l'image watermarkée. L'interface graphique, la
+prévisualisation et la CLI passent toutes par ces fonctions.
+"""
+import math
+from dataclasses import dataclass
+
+from PIL import Image, ImageDraw
+
+from .cache import LRUCache, image_nbytes
+from .fonts import DEFAULT_FONT, font_cache_stats, load_font, needs_fake_bold
+from .glyphs import draw_text, glyph_cache_stats
+from .timing import stage
+from .utils import hex_to_rgb
+
+DEFAULT_COLOR = "#FFFFFF"
+POSITIONS = ("top-left", "top-right", "bottom-left", "bottom-right", "center")
+
+MOSAIC_ANGLE = 15  # Rotation des watermarks en mode mosaïque (degrés, sens horaire)
+MARGIN = 10  # Marge en pixels autour des watermarks positionnés
+STAMP_CACHE_SIZE = 32  # Nombre de tampons mosaïque pivotés conservés
+STAMP_CACHE_MAX_BYTES = 256 * 1024 * 1024  # Mémoire maximale des tampons en cache
+OVERLAY_CACHE_SIZE = 8  # Nombre de calques conservés
+OVERLAY_CACHE_MAX_BYTES = 512 * 1024 * 1024  # Mémoire maximale des calques en cache
+NATIVE_MODES = ('RGB', 'L', 'CMYK')  # Modes sans transparence fusionnés directement en RGB
+COMPOSITE_STRIP_PIXELS = 1 << 20  # Pixels fusionnés par bande (mémoire RGBA temporaire bornée)
+TILE_SIZE = 1024  # Côté des tuiles du mode tuilé
+TILED_MIN_PIXELS = 40_000_000  # Au-delà, le calque est rendu tuile par tuile (jamais en entier)
+TILED_STAMP_MAX_PIXELS = 16 * TILE_SIZE * TILE_SIZE  # Au-delà, le tampon pivoté n'est rendu que par morceaux
+STAMP_PIECE_ROWS = 32  # Hauteur des bandes du tampon mosaïque collées séparément (voir StampPieces)
+
+# Tampons mosaïque déjà pivotés, partagés entre images et prévisualisations
+# (un texte différent par image en remplit vite toutes les entrées : borné aussi en mémoire)
+_stamp_cache = LRUCache(STAMP_CACHE_SIZE, max_bytes=STAMP_CACHE_MAX_BYTES, sizeof=lambda stamp: stamp.nbytes)
+# Calques par (taille d'image, job) : un lot n'a que quelques tailles distinctes
+_overlay_cache = LRUCache(OVERLAY_CACHE_SIZE, max_bytes=OVERLAY_CACHE_MAX_BYTES,
+                          sizeof=lambda entry: image_nbytes(entry[0]))
+
+
+@dataclass(frozen=True)
+class WatermarkJob:
+    """Paramètres immuables d'un watermark.
+
+    Attributes:
+        text: Texte complet affiché (symbole inclus, ex: "© Mon texte")
+        font_name: Nom de la police (voir fonts.FONT_FILE_MAPPING)
+        is_bold: Texte en gras (faux gras si la police n'a pas de Bold)
+        color: Couleur '#RRGGBB'
+        opacity: Opacité entre 0.0 et 1.0
+        position: Position interne (voir POSITIONS)
+        num_watermarks: Nombre de lignes hors mode mosaïque
+        is_mosaic: Watermarks répétés sur toute l'image
+        font_size_percent: Taille de police en fraction de la largeur (0.05 = 5%)
+        mosaic_spacing_h: Facteur d'espacement horizontal en mode mosaïque
+        mosaic_spacing_v: Facteur d'espacement vertical en mode mosaïque
+    """
+    text: str
+    font_name: str = DEFAULT_FONT
+    is_bold: bool = False
+    color: str = DEFAULT_COLOR
+    opacity: float = 0.5
+    position: str = "bottom-right"
+    num_watermarks: int = 1
+    is_mosaic: bool = False
+    font_size_percent: float = 0.05
+    mosaic_spacing_h: float = 2.5
+    mosaic_spacing_v: float = 2.5
+
+    @property
+    def fill(self) -> tuple[int, int, int, int]:
+        """Couleur de remplissage (r, g, b, a) du texte."""
+        return (*hex_to_rgb(self.color), int(255 * self.opacity))
+
+    @property
+    def fake_bold(self) -> bool:
+        """True si le gras doit être simulé par surimpression."""
+        return self.is_bold and needs_fake_bold(self.font_name)
+
+
+def draw_text_with_fake_bold(draw, pos, text, font, fill, bold_offset=1):
+    """Dessine du texte avec un effet de faux gras (pour polices sans version Bold).
+
+    Args:
+        draw: Objet ImageDraw
+        pos: Position (x, y)
+        text: Texte à dessiner
+        font: Police à utiliser
+        fill: Couleur de remplissage (r, g, b, a)
+        bold_offset: Décalage en pixels pour l'effet gras
+    """
+    x, y = pos
+    # Dessiner le texte plusieurs fois avec de légers décalages (même masque
+    # de texte à chaque passe, assemblé une seule fois par l'atlas de glyphes)
+    for dx in range(bold_offset + 1):
+        for dy in range(bold_offset + 1):
+            draw_text(draw, (x + dx, y + dy), text, font, fill)
+
+
+def draw_watermark_text(draw, pos, job: WatermarkJob, font):
+    """Dessine le texte du job à la position donnée (avec faux gras si nécessaire)."""
+    if job.fake_bold:
+        draw_text_with_fake_bold(draw, pos, job.text, font, job.fill)
+    else:
+        draw_text(draw, pos, job.text, font, job.fill)
+
+
+def compute_positions(image_size, text_size, job: WatermarkJob) -> list[tuple[int, int]]:
+    """Calcule la position de chaque watermark hors mode mosaïque.
+
+    Args:
+        image_size: Taille (largeur, hauteur) de l'image
+        text_size: Taille (largeur, hauteur) du texte
+        job: Paramètres du watermark
+
+    Returns:
+        Liste des positions (x, y) du coin haut-gauche de chaque texte
+    """
+    width, height = image_size
+    text_width, text_height = text_size
+    num_watermarks = job.num_watermarks
+    positions = []
+    for i in range(num_watermarks):
+        if job.position == "top-left":
+            pos = (MARGIN, MARGIN + i * (text_height + MARGIN))
+        elif job.position == "top-right":
+            pos = (width - text_width - MARGIN, MARGIN + i * (text_height + MARGIN))
+        elif job.position == "bottom-left":
+            pos = (MARGIN, height - (num_watermarks - i) * (text_height + MARGIN))
+        elif job.position == "bottom-right":
+            pos = (width - text_width - MARGIN,
+                   height - (num_watermarks - i) * (text_height + MARGIN))
+        else:  # center
+            pos = ((width - text_width) // 2,
+                   ((height - (num_watermarks * text_height)) // 2) + i * (text_height + MARGIN))
+        positions.append(pos)
+    return positions
+
+
+def mosaic_lattice(text_size, job: WatermarkJob) -> tuple[int, int, int]:
+    """Calcule le réseau de la mosaïque : pas horizontal, pas vertical et décalage.
+
+    Les pas sont arrondis au pixel : la mosaïque est alors exactement
+    périodique (voir :func:`mosaic_block`). Les lignes impaires sont
+    décalées d'un demi-pas horizontal.
+
+    Returns:
+        Triplet (pas_x, pas_y, décalage des lignes impaires) en pixels
+    """
+    text_width, text_height = text_size
+
+    # Calculer la taille après rotation
+    angle_rad = math.radians(MOSAIC_ANGLE)
+    rotated_width = abs(text_width * math.cos(angle_rad)) + abs(text_height * math.sin(angle_rad))
+    rotated_height = abs(text_width * math.sin(angle_rad)) + abs(text_height * math.cos(angle_rad))
+
+    # Espacement directement basé sur les sliders utilisateur
+    step_x = max(1, round(rotated_width * job.mosaic_spacing_h))
+    step_y = max(1, round(rotated_height * job.mosaic_spacing_v))
+    return step_x, step_y, step_x // 2
+
+
+def mosaic_origins(box, stamp_size, lattice) -> list[tuple[int, int]]:
+    """Coins haut-gauche des tampons mosaïque qui recoupent ``box``, dans l'ordre de collage.
+
+    Les tampons sont centrés sur les nœuds (i * pas_x, j * pas_y) du réseau,
+    prolongé au-delà de l'image ; l'ordre (colonne par colonne) décide du
+    tampon visible là où ils se chevauchent.
+
+    Args:
+        box: Zone (gauche, haut, droite, bas)
+        stamp_size: Taille du tampon pivoté
+        lattice: Réseau de la mosaïque (voir :func:`mosaic_lattice`)
+    """
+    left, top, right, bottom = box
+    stamp_width, stamp_height = stamp_size
+    step_x, step_y, shift = lattice
+    half_width, half_height = stamp_width // 2, stamp_height // 2
+    rows = range((top + half_height - stamp_height) // step_y + 1, -(-(bottom + half_height) // step_y))
+    columns = range((left + half_width - stamp_width - shift) // step_x + 1,
+                    -(-(right + half_width) // step_x))
+    origins = []
+    for i in columns:
+        for j in rows:
+            x = i * step_x + (shift if j % 2 else 0) - half_width
+            if x < right and x + stamp_width > left:
+                origins.append((x, j * step_y - half_height))
+    return origins
+
+
+def _paste_stamps(target: Image.Image, stamp, lattice, box):
+    """Colle dans ``target``, qui couvre ``box``, les tampons du réseau qui recoupent ``box``."""
+    left, top = box[:2]
+    for paste_x, paste_y in mosaic_origins(box, stamp.size, lattice):
+        stamp.paste(target, (paste_x - left, paste_y - top))
+
+
+def mosaic_block(stamp, lattice) -> Image.Image:
+    """Rend une période de la mosaïque : un pas de large, deux lignes décalées de haut.
+
+    La mosaïque entière est le pavage de ce bloc depuis le coin de l'image
+    (voir :func:`_fill_periodic`) : seuls les tampons qui recoupent le bloc
+    sont collés, quelle que soit la taille de l'image.
+
+    Args:
+        stamp: Tampon pivoté, en morceaux (:class:`StampPieces`)
+        lattice: Réseau de la mosaïque (voir :func:`mosaic_lattice`)
+    """
+    step_x, step_y, _ = lattice
+    block = Image.new('RGBA', (step_x, 2 * step_y), (0, 0, 0, 0))
+    _paste_stamps(block, stamp, lattice, (0, 0, *block.size))
+    return block
+
+
+def _fill_periodic(target: Image.Image, block: Image.Image, phase=(0, 0)):
+    """Pave ``target`` avec ``block`` : le pixel (x, y) vaut ``block[(x + phase_x) % l, (y + phase_y) % h]``.
+
+    Un bloc est collé au coin, puis la zone remplie est recopiée sur elle-même
+    en doublant (par morceaux d'au plus COMPOSITE_STRIP_PIXELS pixels) : le
+    nombre de collages ne dépend plus du nombre de tampons.
+    """
+    width, height = target.size
+    block_width, block_height = block.size
+    phase_x, phase_y = phase[0] % block_width, phase[1] % block_height
+    for dx in (0, block_width):
+        for dy in (0, block_height):
+            target.paste(block, (dx - phase_x, dy - phase_y))
+
+    seed_height = min(block_height, height)
+    max_columns = max(1, COMPOSITE_STRIP_PIXELS // (seed_height * block_width)) * block_width
+    filled = block_width
+    while filled < width:
+        columns = min(filled, max_columns)
+        target.paste(target.crop((0, 0, columns, seed_height)), (filled, 0))
+        filled += columns
+    max_rows = max(1, COMPOSITE_STRIP_PIXELS // (width * block_height)) * block_height
+    filled = block_height
+    while filled < height:
+        rows = min(filled, max_rows)
+        target.paste(target.crop((0, 0, width, rows)), (0, filled))
+        filled += rows
+
+
+def render_stamp(job: WatermarkJob, font, text_size) -> Image.Image:
+    """Dessine le texte dans une image carrée puis la pivote pour la mosaïque."""
+    text_width, text_height = text_size
+    temp_size = int(max(text_width, text_height) * 1.5)
+    stamp = Image.new('RGBA', (temp_size, temp_size), (0, 0, 0, 0))
+    text_pos = (temp_size/2 - text_width/2, temp_size/2 - text_height/2)
+    draw_watermark_text(ImageDraw.Draw(stamp), text_pos, job, font)
+    return stamp.rotate(-MOSAIC_ANGLE, expand=True, resample=Image.BICUBIC)
+
+
+def _stamp_geometry(text_size):
+    """Géométrie du tampon de :func:`render_stamp`, sans le rastériser.
+
+    Reprend le calcul de ``Image.rotate(expand=True)`` : la matrice affine
+    (coordonnées du tampon -> carré non pivoté) et la taille du tampon.
+
+    Returns:
+        Triplet (côté du carré, matrice, (largeur, hauteur) du tampon)
+    """
+    temp_size = int(max(text_size) * 1.5)
+    angle = math.radians(MOSAIC_ANGLE)
+    matrix = [round(math.cos(angle), 15), round(math.sin(angle), 15), 0.0,
+              round(-math.sin(angle), 15), round(math.cos(angle), 15), 0.0]
+
+    def transform(x, y):
+        a, b, c, d, e, f = matrix
+        return a * x + b * y + c, d * x + e * y + f
+
+    center = temp_size / 2
+    matrix[2], matrix[5] = transform(-center, -center)
+    matrix[2] += center
+    matrix[5] += center
+    corners = [transform(x, y) for x, y in ((0, 0), (temp_size, 0), (temp_size, temp_size), (0, temp_size))]
+    width = math.ceil(max(x for x, _ in corners)) - math.floor(min(x for x, _ in corners))
+    height = math.ceil(max(y for _, y in corners)) - math.floor(min(y for _, y in corners))
+    matrix[2], matrix[5] = transform(-(width - temp_size) / 2.0, -(height - temp_size) / 2.0)
+    return temp_size, matrix, (width, height)
+
+
+class StampWindows:
+    """Morceaux du tampon mosaïque, pour les tampons trop grands pour être rastérisés.
+
+    Seul le texte non pivoté est dessiné (un rectangle serré, au lieu du
+    carré pivoté complet) ; chaque morceau est ensuite rééchantillonné
+    directement depuis ce texte avec la même transformation affine que
+    :func:`render_stamp`. Le résultat peut différer du tampon complet sur
+    quelques pixels presque transparents (arrondis de la translation), soit
+    un ou deux niveaux au plus dans l'image finale.
+    """
+
+    def __init__(self, job: WatermarkJob, font, text_size):
+        temp_size, self.matrix, self.size = _stamp_geometry(text_size)
+        text_width, text_height = text_size
+        text_pos = (temp_size/2 - text_width/2, temp_size/2 - text_height/2)
+        text_box = ImageDraw.Draw(Image.new('RGBA', (1, 1))).textbbox(text_pos, job.text, font=font)
+        # Marge du filtre bicubique et du faux gras ; l'origine du dessin reste
+        # positive pour que Pillow arrondisse le texte comme dans le carré complet
+        left = max(0, min(math.floor(text_pos[0]), math.floor(text_box[0]) - 4))
+        top = max(0, min(math.floor(text_pos[1]), math.floor(text_box[1]) - 4))
+        right = min(temp_size, math.ceil(text_box[2]) + 4)
+        bottom = min(temp_size, math.ceil(text_box[3]) + 4)
+        source = Image.new('RGBA', (right - left, bottom - top), (0, 0, 0, 0))
+        draw_watermark_text(ImageDraw.Draw(source), (text_pos[0] - left, text_pos[1] - top), job, font)
+        # Image.transform prémultiplie l'alpha à chaque appel : une seule fois ici
+        self.source = source.convert('RGBa')
+        self.origin = (left, top)
+
+        # Zone du tampon où tombe le texte (rotation inverse des coins du
+        # rectangle source, plus la portée du filtre) : ailleurs, tout est transparent
+        a, b, c, d, e, f = self.matrix
+        corners = [(a * (x - c) + d * (y - f) - 0.5, b * (x - c) + e * (y - f) - 0.5)
+                   for x in (left, right) for y in (top, bottom)]
+        self.text_box = (max(0, math.floor(min(x for x, _ in corners)) - 2),
+                         max(0, math.floor(min(y for _, y in corners)) - 2),
+                         min(self.size[0], math.ceil(max(x for x, _ in corners)) + 3),
+                         min(self.size[1], math.ceil(max(y for _, y in corners)) + 3))
+
+    def window(self, box):
+        """Partie non vide de ``render_stamp(...).crop(box)``.
+
+        Returns:
+            Couple (image RGBA, (x, y) dans ``box``), ou None si la zone est vide
+        """
+        left = max(box[0], self.text_box[0])
+        top = max(box[1], self.text_box[1])
+        right = min(box[2], self.text_box[2])
+        bottom = min(box[3], self.text_box[3])
+        if left >= right or top >= bottom:
+            return None
+        a, b, c, d, e, f = self.matrix
+        data = (a, b, c + a * left + b * top - self.origin[0],
+                d, e, f + d * left + e * top - self.origin[1])
+        part = self.source.transform((right - left, bottom - top), Image.Transform.AFFINE, data,
+                                     Image.BICUBIC)
+        return part.convert('RGBA'), (left - box[0], top - box[1])
+
+
+class StampPieces:
+    """Tampon mosaïque pivoté, découpé en bandes réduites à leur partie non transparente.
+
+    Le texte pivoté n'occupe qu'une diagonale du rectangle du tampon :
+    coller les bandes (hautes de STAMP_PIECE_ROWS pixels, recadrées sur leur
+    alpha) au lieu du tampon entier évite de fusionner ce vide. Le résultat
+    est identique, pixel pour pixel : un masque nul ne modifie pas la cible.
+
+    Args:
+        stamp: Tampon pivoté ou, s'il est trop grand pour être rastérisé, ses
+            fenêtres (:class:`StampWindows`, avec leurs arrondis)
+    """
+
+    def __init__(self, stamp):
+        self.size = stamp.size
+        self.pieces = []
+        if isinstance(stamp, StampWindows):
+            left, top, right, bottom = stamp.text_box
+        else:
+            left, top, right, bottom = 0, 0, *stamp.size
+        for row in range(top, bottom, STAMP_PIECE_ROWS):
+            band = (left, row, right, min(row + STAMP_PIECE_ROWS, bottom))
+            if isinstance(stamp, StampWindows):
+                visible = stamp.window(band)
+                if visible is None:
+                    continue
+                part, (x, y) = visible
+                x, y = x + band[0], y + band[1]
+            else:
+                part, (x, y) = stamp.crop(band), band[:2]
+            bbox = part.getchannel('A').getbbox()
+            if bbox is not None:
+                self.pieces.append((part.crop(bbox), (x + bbox[0], y + bbox[1], x + bbox[2], y + bbox[3])))
+
+    @property
+    def nbytes(self) -> int:
+        """Mémoire occupée par les morceaux."""
+        return sum(image_nbytes(piece) for piece, _ in self.pieces)
+
+    def paste(self, target: Image.Image, origin):
+        """Colle le tampon dans ``target`` avec son coin haut-gauche en ``origin``."""
+        x, y = origin
+        for piece, (left, top, right, bottom) in self.pieces:
+            if (x + right > 0 and x + left < target.width and
+                    y + bottom > 0 and y + top < target.height):
+                target.paste(piece, (x + left, y + top), piece)
+
+
+def get_stamp(job: WatermarkJob, font, font_size: int, text_size) -> StampPieces:
+    """Retourne le tampon mosaïque pivoté, rastérisé une seule fois par style.
+
+    La clé couvre tout ce qui change les pixels du tampon : texte, police,
+    gras, taille, couleur et opacité. Le tampon renvoyé est partagé et ne
+    doit pas être modifié.
+    """
+    key = (job.text, job.font_name, job.is_bold, font_size, job.color, job.opacity)
+    return _stamp_cache.get_or_create(key, lambda: StampPieces(render_stamp(job, font, text_size)))
+
+
+def stamp_cache_stats() -> dict:
+    """Retourne les compteurs du cache de tampons mosaïque."""
+    return _stamp_cache.stats()
+
+
+def _draw_mosaic(overlay: Image.Image, job: WatermarkJob, font, font_size: int, text_size):
+    """Remplit le calque de watermarks pivotés répétés.
+
+    Tous les tampons sont identiques et le réseau est périodique : une
+    période est rendue une fois (:func:`mosaic_block`) puis recopiée, au lieu
+    d'un collage par tampon.
+    """
+    stamp = get_stamp(job, font, font_size, text_size)
+    lattice = mosaic_lattice(text_size, job)
+    step_x, step_y, _ = lattice
+    if 2 * step_x * step_y < overlay.width * overlay.height:
+        _fill_periodic(overlay, mosaic_block(stamp, lattice))
+    else:
+        # Période plus grande que l'image : collage direct des quelques tampons
+        _paste_stamps(overlay, stamp, lattice, (0, 0, *overlay.size))
+
+
+def _text_boxes(positions, job: WatermarkJob, font):
+    """Boîte (gauche, haut, droite, bas) de chaque texte, marges comprises."""
+    draw = ImageDraw.Draw(Image.new('RGBA', (1, 1)))
+    bold_offset = 1 if job.fake_bold else 0
+    boxes = []
+    for pos in positions:
+        box = draw.textbbox(pos, job.text, font=font)
+        # Un pixel de marge pour l'anticrénelage, plus le décalage du faux gras
+        boxes.append((box[0] - 1, box[1] - 1, box[2] + bold_offset + 1, box[3] + bold_offset + 1))
+    return boxes
+
+
+def _text_extent(boxes, image_size):
+    """Boîte (gauche, haut, droite, bas) couverte par les textes, limitée à l'image.
+
+    Args:
+        boxes: Boîtes des textes (voir :func:`_text_boxes`)
+        image_size: Taille (largeur, hauteur) de l'image
+
+    Returns:
+        Boîte englobante, ou None si aucun texte n'est visible
+    """
+    left = max(0, min(box[0] for box in boxes))
+    top = max(0, min(box[1] for box in boxes))
+    right = min(image_size[0], max(box[2] for box in boxes))
+    bottom = min(image_size[1], max(box[3] for box in boxes))
+    if left >= right or top >= bottom:
+        return None
+    return left, top, right, bottom
+
+
+def _text_layout(image_size, job: WatermarkJob):
+    """Police, taille de police et taille du texte pour une taille d'image."""
+    # La taille de police est proportionnelle à la largeur de l'image
+    font_size = int(image_size[0] * job.font_size_percent)
+    font = load_font(job.font_name, job.is_bold, font_size)
+
+    text_bbox = ImageDraw.Draw(Image.new('RGBA', (1, 1))).textbbox((0, 0), job.text, font=font)
+    text_size = (text_bbox[2] - text_bbox[0], text_bbox[3] - text_bbox[1])
+    return font, font_size, text_size
+
+
+def create_overlay_layer(image_size, job: WatermarkJob) -> tuple[Image.Image, tuple[int, int]]:
+    """Crée le calque RGBA du watermark, limité à la zone réellement couverte.
+
+    Hors mode mosaïque, le texte n'occupe qu'une petite partie de l'image :
+    le calque ne couvre que la boîte englobante des lignes de texte. En mode
+    mosaïque, il couvre toute l'image.
+
+    Args:
+        image_size: Taille (largeur, hauteur) de l'image cible
+        job: Paramètres du watermark
+
+    Returns:
+        Couple (calque, (x, y)) : calque RGBA et position de son coin haut-gauche
+        dans l'image (calque vide si aucun texte n'est visible)
+    """
+    font, font_size, text_size = _text_layout(image_size, job)
+
+    if job.is_mosaic:
+        overlay = Image.new('RGBA', image_size, (0, 0, 0, 0))
+        _draw_mosaic(overlay, job, font, font_size, text_size)
+        return overlay, (0, 0)
+
+    positions = compute_positions(image_size, text_size, job)
+    extent = _text_extent(_text_boxes(positions, job, font), image_size)
+    if extent is None:
+        return Image.new('RGBA', (0, 0)), (0, 0)
+    left, top, right, bottom = extent
+    layer = Image.new('RGBA', (right - left, bottom - top), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(layer)
+    for x, y in positions:
+        draw_watermark_text(draw, (x - left, y - top), job, font)
+    return layer, (left, top)
+
+
+def create_overlay(image_size, job: WatermarkJob) -> Image.Image:
+    """Crée le calque RGBA transparent contenant le(s) watermark(s).
+
+    Args:
+        image_size: Taille (largeur, hauteur) de l'image cible
+        job: Paramètres du watermark
+
+    Returns:
+        Calque RGBA de la taille de l'image
+    """
+    layer, offset = create_overlay_layer(image_size, job)
+    if layer.size == tuple(image_size):
+        return layer
+    overlay = Image.new('RGBA', image_size, (0, 0, 0, 0))
+    if layer.width and layer.height:
+        overlay.paste(layer, offset)
+    return overlay
+
+
+def get_overlay_layer(image_size, job: WatermarkJob) -> tuple[Image.Image, tuple[int, int]]:
+    """Retourne le calque du job pour cette taille d'image, depuis le cache si possible.
+
+    Voir :func:`create_overlay_layer`. Le calque renvoyé est partagé et ne
+    doit pas être modifié.
+    """
+    image_size = tuple(image_size)
+    return _overlay_cache.get_or_create((image_size, job),
+                                        lambda: create_overlay_layer(image_size, job))
+
+
+def configure_overlay_cache(max_items: int | None = None, max_bytes: int | None = None):
+    """Ajuste les limites du cache de calques (0 octet désactive le cache)."""
+    _overlay_cache.resize(max_items, max_bytes)
+
+
+def overlay_cache_stats() -> dict:
+    """Retourne les compteurs du cache de calques."""
+    return _overlay_cache.stats()
+
+
+def cache_stats() -> dict:
+    """Retourne les compteurs de tous les caches du moteur (processus courant)."""
+    return {**font_cache_stats(), "glyphs": glyph_cache_stats(), "stamps": stamp_cache_stats(),
+            "overlays": overlay_cache_stats()}
+
+
+class OverlayTiler:
+    """Rend le calque du watermark par tuiles, sans jamais le matérialiser en entier.
+
+    La mise en page (police, positions ou réseau mosaïque) est calculée une
+    fois ; chaque tuile ne reçoit que les textes qui la touchent, ou le
+    pavage de la période mosaïque (:func:`mosaic_block`). Le résultat est
+    identique, pixel pour pixel, au calque complet (sauf tampons géants,
+    voir :class:`StampWindows`).
+
+    Args:
+        image_size: Taille (largeur, hauteur) de l'image cible
+        job: Paramètres du watermark
+    """
+
+    def __init__(self, image_size, job: WatermarkJob):
+        self.image_size = tuple(image_size)
+        self.job = job
+        self.font, font_size, text_size = _text_layout(self.image_size, job)
+        if job.is_mosaic:
+            _, _, stamp_size = _stamp_geometry(text_size)
+            if stamp_size[0] * stamp_size[1] <= TILED_STAMP_MAX_PIXELS:
+                self.stamp = get_stamp(job, self.font, font_size, text_size)
+            else:
+                self.stamp = StampPieces(StampWindows(job, self.font, text_size))
+            self.lattice = mosaic_lattice(text_size, job)
+            step_x, step_y, _ = self.lattice
+            # Période rendue une fois, puis pavée dans chaque tuile
+            self.block = (mosaic_block(self.stamp, self.lattice)
+                          if 2 * step_x * step_y <= TILED_STAMP_MAX_PIXELS else None)
+            self.extent = (0, 0, *self.image_size)
+        else:
+            self.block = None
+            self.positions = compute_positions(self.image_size, text_size, job)
+            self.text_boxes = _text_boxes(self.positions, job, self.font)
+            self.extent = _text_extent(self.text_boxes, self.image_size)
+
+    def tiles(self, tile_size: int = TILE_SIZE):
+        """Boîtes (gauche, haut, droite, bas) des tuiles qui recoupent le watermark."""
+        if self.extent is None:
+            return
+        left, top, right, bottom = self.extent
+        # Grille alignée sur l'image, limitée à la zone couverte
+        for tile_top in range(top - top % tile_size, bottom, tile_size):
+            for tile_left in range(left - left % tile_size, right, tile_size):
+                yield (tile_left, tile_top,
+                       min(tile_left + tile_size, self.image_size[0]),
+                       min(tile_top + tile_size, self.image_size[1]))
+
+    def render(self, box) -> Image.Image:
+        """Dessine la partie du calque comprise dans ``box``."""
+        left, top, right, bottom = box
+        tile = Image.new('RGBA', (right - left, bottom - top), (0, 0, 0, 0))
+        if self.block is not None:
+            _fill_periodic(tile, self.block, (left, top))
+        elif self.job.is_mosaic:
+            _paste_stamps(tile, self.stamp, self.lattice, box)
+        else:
+            draw = ImageDraw.Draw(tile)
+            for (x, y), text_box in zip(self.positions, self.text_boxes):
+                if (text_box[2] > left and text_box[0] < right and
+                        text_box[3] > top and text_box[1] < bottom):
+                    draw_watermark_text(draw, (x - left, y - top), self.job, self.font)
+        return tile
+
+
+def _blend_layer(target: Image.Image, layer: Image.Image, offset):
+    """Fusionne le calque dans ``target`` (RGB ou RGBA), en place, bande par bande.
+
+    Seule une bande du calque est convertie en RGBA à la fois : aucune copie
+    RGBA de l'image complète n'est créée.
+    """
+    x, y = offset
+    rows = max(1, COMPOSITE_STRIP_PIXELS // layer.width)
+    with stage("composite"):
+        for top in range(0, layer.height, rows):
+            strip = layer.crop((0, top, layer.width, min(layer.height, top + rows)))
+            box = (x, y + top, x + strip.width, y + top + strip.height)
+            region = target.crop(box)
+            if region.mode != 'RGBA':
+                region = region.convert('RGBA')
+            blended = Image.alpha_composite(region, strip)
+            if target.mode != 'RGBA':
+                blended = blended.convert(target.mode)
+            target.paste(blended, box)
+
+
+def composite(img: Image.Image, layer: Image.Image, offset=(0, 0), in_place: bool = False) -> Image.Image:
+    """Fusionne le calque de watermark sur l'image.
+
+    Les sources sans transparence (RGB, L, CMYK) sont fusionnées directement
+    dans une image RGB ; les autres modes passent par RGBA comme avant. Seule
+    la zone couverte par le calque est modifiée.
+
+    Args:
+        img: Image source
+        layer: Calque RGBA (voir :func:`create_overlay_layer`)
+        offset: Position du coin haut-gauche du calque dans l'image
+        in_place: Autorise la modification de ``img`` quand elle est déjà en
+            RGB ou RGBA (évite une copie complète)
+
+    Returns:
+        Image watermarkée, RGB pour les modes de NATIVE_MODES, RGBA sinon
+    """
+    target = _composite_target(img, in_place)
+    if layer.width and layer.height:
+        _blend_layer(target, layer, offset)
+    return target
+
+
+def _composite_target(img: Image.Image, in_place: bool) -> Image.Image:
+    """Image (RGB ou RGBA) dans laquelle le calque sera fusionné."""
+    if img.mode in ('RGB', 'RGBA') and in_place:
+        return img
+    with stage("convert"):
+        if img.mode in ('RGB', 'RGBA'):
+            return img.copy()
+        if img.mode in NATIVE_MODES:
+            return img.convert('RGB')
+        return img.convert('RGBA')
+
+
+def composite_tiled(img: Image.Image, job: WatermarkJob, in_place: bool = False,
+                    tile_size: int = TILE_SIZE) -> Image.Image:
+    """Applique le watermark tuile par tuile (voir :class:`OverlayTiler`).
+
+    Seules les tuiles qui contiennent des pixels du watermark sont rendues
+    et fusionnées (toutes en mode mosaïque). La mémoire de travail dépend
+    de ``tile_size`` et de la taille du texte, plus de celle de l'image.
+    """
+    target = _composite_target(img, in_place)
+    with stage("overlay"):
+        tiler = OverlayTiler(target.size, job)
+    for box in tiler.tiles(tile_size):
+        with stage("overlay"):
+            tile = tiler.render(box)
+            empty = tile.getbbox() is None
+        if not empty:
+            _blend_layer(target, tile, box[:2])
+    return target
+
+
+def render_watermark(img: Image.Image, job: WatermarkJob, in_place: bool = False,
+                     tiled: bool | None = None) -> Image.Image:
+    """Applique le watermark à une image.
+
+    Args:
+        img: Image source (tout mode)
+        job: Paramètres du watermark
+        in_place: Autorise la modification de ``img`` (voir :func:`composite`)
+        tiled: Rendu tuile par tuile (:func:`composite_tiled`) ; par défaut,
+            seulement au-delà de TILED_MIN_PIXELS (panoramas, gigapixels)
+
+    Returns:
+        Image watermarkée (RGB pour les sources RGB/L/CMYK, RGBA sinon)
+    """
+    if tiled is None:
+        tiled = img.width * img.height >= TILED_MIN_PIXELS
+    if tiled:
+        return composite_tiled(img, job, in_place=in_place)
+    with stage("overlay"):
+        layer, offset = get_overlay_layer(img.size, job)
+    return composite(img, layer, offset, in_place=in_place)
+
+
+def overlay_footprint(image_size, job: WatermarkJob) -> int:
+    """Estime la mémoire de travail du watermark pour une taille d'image, sans le dessiner.
+
+    Compte le calque (ou les tuiles), le tampon mosaïque et les bandes de
+    fusion de :func:`render_watermark` ; pas l'image elle-même.
+
+    Returns:
+        Estimation en octets
+    """
+    width, height = image_size
+    tiled = width * height >= TILED_MIN_PIXELS
+    working = 3 * COMPOSITE_STRIP_PIXELS * 4
+    if tiled:
+        working += 3 * TILE_SIZE * TILE_SIZE * 4
+    _, _, text_size = _text_layout(image_size, job)
+    if not job.is_mosaic:
+        # Calque limité aux textes
+        return working + (0 if tiled else text_size[0] * text_size[1] * job.num_watermarks * 4)
+
+    temp_size, _, stamp_size = _stamp_geometry(text_size)
+    stamp_pixels = stamp_size[0] * stamp_size[1]
+    step_x, step_y, _ = mosaic_lattice(text_size, job)
+    block = 2 * step_x * step_y * 4 if 2 * step_x * step_y <= TILED_STAMP_MAX_PIXELS else 0
+    if tiled and stamp_pixels > TILED_STAMP_MAX_PIXELS:
+        # Texte non pivoté (RGBA et copie prémultipliée, voir StampWindows) et
+        # ses morceaux pivotés, d'environ deux fois sa surface ; période de la mosaïque
+        return working + text_size[0] * text_size[1] * 4 * 4 + block
+    # Carré de rotation, tampon pivoté et ses morceaux (voir StampPieces), période de la mosaïque
+    stamp = (temp_size * temp_size + 2 * stamp_pixels) * 4
+    return working + stamp + block + (0 if tiled else width * height * 4)
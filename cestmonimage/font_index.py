@@ -0,0 +1,172 @@
+"""Index persistant des fichiers de polices (dossiers système et fonts/ embarqué).
+
+Le scan des dossiers de polices est fait une fois puis enregistré sur le
+disque. Aux lancements suivants, l'index est relu et n'est reconstruit que
+si la date de modification d'un des dossiers scannés a changé (police
+ajoutée ou supprimée).
+"""
+import json
+import os
+import threading
+
+from .utils import get_cache_dir
+
+INDEX_VERSION = 1
+INDEX_FILENAME = "font_index.json"
+FONT_EXTENSIONS = ('.ttf', '.otf', '.ttc')
+
+
+class FontIndex:
+    """Fichiers de polices trouvés dans un ensemble de dossiers.
+
+    Attributes:
+        roots: Dossiers racines scannés (système puis fonts/ embarqué)
+        system_fonts: Nom de fichier en minuscules -> chemin complet (dossiers système)
+        custom_fonts: Nom de fichier -> chemin complet (dossier fonts/ embarqué)
+        dir_mtimes: Dossier scanné -> mtime (ns) au moment du scan
+    """
+
+    def __init__(self, roots: list, system_fonts: dict, custom_fonts: dict, dir_mtimes: dict):
+        self.roots = roots
+        self.system_fonts = system_fonts
+        self.custom_fonts = custom_fonts
+        self.dir_mtimes = dir_mtimes
+
+    def find_system_font(self, filename: str) -> str | None:
+        """Cherche un fichier de police système (insensible à la casse)."""
+        return self.system_fonts.get(filename.lower())
+
+    def find_custom_font(self, filename: str) -> str | None:
+        """Cherche un fichier de police dans le dossier fonts/ embarqué."""
+        return self.custom_fonts.get(filename)
+
+    def is_valid_for(self, system_dirs: list[str], custom_dir: str) -> bool:
+        """Vérifie que l'index couvre exactement ces dossiers et qu'aucun n'a été modifié."""
+        if self.roots != _index_roots(system_dirs, custom_dir):
+            return False
+        for directory, mtime in self.dir_mtimes.items():
+            try:
+                if os.stat(directory).st_mtime_ns != mtime:
+                    return False
+            except OSError:
+                return False
+        return True
+
+    def to_dict(self) -> dict:
+        """Sérialise l'index pour l'enregistrement JSON."""
+        return {"version": INDEX_VERSION, "roots": self.roots, "system_fonts": self.system_fonts,
+                "custom_fonts": self.custom_fonts, "dir_mtimes": self.dir_mtimes}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "FontIndex":
+        """Recrée un index à partir de sa forme JSON."""
+        if data.get("version") != INDEX_VERSION:
+            raise ValueError("Version d'index de polices incompatible")
+        return cls(data["roots"], data["system_fonts"], data["custom_fonts"], data["dir_mtimes"])
+
+
+def _index_roots(system_dirs: list[str], custom_dir: str) -> list[str]:
+    """Liste ordonnée des dossiers racines couverts par un index."""
+    return list(system_dirs) + ([custom_dir] if os.path.isdir(custom_dir) else [])
+
+
+def _scan_dir(root: str, recursive: bool, dir_mtimes: dict) -> list[tuple[str, str]]:
+    """Liste les fichiers de polices d'un dossier et note la mtime des dossiers visités."""
+    found = []
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            dir_mtimes[directory] = os.stat(directory).st_mtime_ns
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if recursive:
+                            stack.append(entry.path)
+                    elif entry.name.lower().endswith(FONT_EXTENSIONS):
+                        found.append((entry.name, entry.path))
+        except OSError:
+            continue
+    return found
+
+
+def build_font_index(system_dirs: list[str], custom_dir: str) -> FontIndex:
+    """Scanne les dossiers de polices.
+
+    Args:
+        system_dirs: Dossiers système, par ordre de priorité (scannés récursivement)
+        custom_dir: Dossier fonts/ embarqué (non récursif)
+
+    Returns:
+        Index construit
+    """
+    dir_mtimes = {}
+    system_fonts = {}
+    for fonts_dir in system_dirs:
+        for name, path in sorted(_scan_dir(fonts_dir, True, dir_mtimes)):
+            # Le premier dossier (par priorité) l'emporte en cas de doublon
+            system_fonts.setdefault(name.lower(), path)
+    custom_fonts = {}
+    if os.path.isdir(custom_dir):
+        custom_fonts = dict(_scan_dir(custom_dir, False, dir_mtimes))
+    return FontIndex(_index_roots(system_dirs, custom_dir), system_fonts, custom_fonts, dir_mtimes)
+
+
+def get_index_path() -> str:
+    """Chemin du fichier d'index des polices dans le dossier de cache."""
+    return os.path.join(get_cache_dir(), INDEX_FILENAME)
+
+
+def load_font_index(system_dirs: list[str], custom_dir: str, index_path: str | None = None) -> FontIndex:
+    """Relit l'index enregistré s'il est encore valide, sinon le reconstruit et l'enregistre.
+
+    Args:
+        system_dirs: Dossiers de polices système
+        custom_dir: Dossier fonts/ embarqué
+        index_path: Fichier d'index (par défaut dans le dossier de cache)
+
+    Returns:
+        Index à jour
+    """
+    index_path = index_path or get_index_path()
+    try:
+        with open(index_path, encoding='utf-8') as f:
+            index = FontIndex.from_dict(json.load(f))
+        if index.is_valid_for(system_dirs, custom_dir):
+            return index
+    except (OSError, ValueError, KeyError):
+        pass
+
+    index = build_font_index(system_dirs, custom_dir)
+    try:
+        os.makedirs(os.path.dirname(index_path), exist_ok=True)
+        tmp_path = f"{index_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(index.to_dict(), f)
+        os.replace(tmp_path, index_path)
+    except OSError as e:
+        # Index non enregistré (dossier en lecture seule...) : il reste utilisable en mémoire
+        print(f"⚠ Index des polices non enregistré: {e}")
+    return index
+
+
+class FontIndexHolder:
+    """Index chargé paresseusement, une seule fois par processus."""
+
+    def __init__(self, system_dirs_factory, custom_dir_factory):
+        self._system_dirs_factory = system_dirs_factory
+        self._custom_dir_factory = custom_dir_factory
+        self._index = None
+        self._lock = threading.Lock()
+
+    def get(self) -> FontIndex:
+        """Retourne l'index (chargé ou construit au premier appel)."""
+        with self._lock:
+            if self._index is None:
+                self._index = load_font_index(self._system_dirs_factory(), self._custom_dir_factory())
+            return self._index
+
+    def invalidate(self):
+        """Oublie l'index en mémoire ; il sera revalidé au prochain accès."""
+        with self._lock:
+            self._index = None
@@ -0,0 +1,189 @@
+"""Résolution des polices : polices système (tous OS) et dossier fonts/ embarqué."""
+import os
+import sys
+
+from PIL import ImageFont
+
+from .cache import LRUCache
+from .font_index import FontIndexHolder
+from .timing import stage
+from .utils import get_resource_path
+
+DEFAULT_FONT = "Arial"
+FONT_PATH_CACHE_SIZE = 64  # Chemins résolus par (police, gras)
+FONT_CACHE_SIZE = 32  # Polices chargées par (police, gras, taille)
+
+# Mapping des noms de polices vers leurs fichiers système (normal et bold)
+FONT_FILE_MAPPING = {
+    "Arial": ("arial.ttf", "arialbd.ttf"),
+    "Times New Roman": ("times.ttf", "timesbd.ttf"),
+    "Verdana": ("verdana.ttf", "verdanab.ttf"),
+    "Calibri": ("calibri.ttf", "calibrib.ttf"),
+    "Georgia": ("georgia.ttf", "georgiab.ttf"),
+    "Tahoma": ("tahoma.ttf", "tahomabd.ttf"),
+    "Trebuchet MS": ("trebuc.ttf", "trebucbd.ttf"),
+    "Comic Sans MS": ("comic.ttf", "comicbd.ttf"),
+    "Juice ITC": ("JUICE___.TTF", None),  # Pas de version Bold
+}
+
+
+def get_system_font_dirs() -> list[str]:
+    """Retourne les dossiers de polices système existants pour l'OS courant."""
+    candidates = []
+    windir = os.environ.get("WINDIR")
+    if windir:
+        candidates.append(os.path.join(windir, "Fonts"))
+    if sys.platform == "darwin":
+        candidates += ["/Library/Fonts", "/System/Library/Fonts",
+                       os.path.expanduser("~/Library/Fonts")]
+    elif sys.platform != "win32":
+        candidates += ["/usr/share/fonts", "/usr/local/share/fonts",
+                       os.path.expanduser("~/.local/share/fonts"),
+                       os.path.expanduser("~/.fonts")]
+    return [d for d in candidates if os.path.isdir(d)]
+
+
+def get_custom_fonts_dir() -> str:
+    """Retourne le dossier fonts/ embarqué avec l'application."""
+    return get_resource_path("fonts")
+
+
+# Index des fichiers de polices, relu depuis le disque au premier accès
+_font_index = FontIndexHolder(get_system_font_dirs, get_custom_fonts_dir)
+
+
+def find_system_font(filename: str) -> str | None:
+    """Cherche un fichier de police dans les dossiers système (via l'index).
+
+    Returns:
+        Chemin complet du fichier, ou None s'il est introuvable
+    """
+    return _font_index.get().find_system_font(filename)
+
+
+def get_fallback_font_path(is_bold: bool = False) -> str:
+    """Retourne Arial (ou Arial Bold) : système d'abord, sinon la copie embarquée."""
+    if is_bold:
+        bold_path = find_system_font("arialbd.ttf")
+        if bold_path:
+            return bold_path
+    return find_system_font("arial.ttf") or os.path.join(get_custom_fonts_dir(), "arial.ttf")
+
+
+def get_available_fonts() -> list[str]:
+    """Récupère la liste triée des polices disponibles."""
+    fonts = [DEFAULT_FONT]  # Police par défaut (toujours disponible via fonts/)
+
+    # Vérifier les polices du mapping système
+    for font_name, (normal_file, _) in FONT_FILE_MAPPING.items():
+        if font_name not in fonts and find_system_font(normal_file):
+            fonts.append(font_name)
+
+    # Ajouter les polices personnalisées du dossier fonts/
+    for file in _font_index.get().custom_fonts:
+        if file.lower().endswith('.ttf'):
+            font_name = os.path.splitext(file)[0]
+            # Retirer " Bold" du nom si présent
+            if font_name.endswith(" Bold"):
+                font_name = font_name[:-5]
+            if font_name not in fonts:
+                fonts.append(font_name)
+
+    return sorted(fonts)
+
+
+# Évite les os.path.exists répétés et les rechargements FreeType
+_font_path_cache = LRUCache(FONT_PATH_CACHE_SIZE)
+_font_cache = LRUCache(FONT_CACHE_SIZE)
+
+
+def get_font_path(font_name: str, is_bold: bool = False) -> str:
+    """Obtient le chemin vers le fichier de police (résultat mis en cache).
+
+    Args:
+        font_name: Nom de la police (ex: "Arial", "Juice ITC")
+        is_bold: Si True, cherche la version Bold
+
+    Returns:
+        Chemin complet vers le fichier .ttf (Arial en dernier recours)
+    """
+    return _font_path_cache.get_or_create((font_name, is_bold),
+                                          lambda: _resolve_font_path(font_name, is_bold))
+
+
+def _resolve_font_path(font_name: str, is_bold: bool) -> str:
+    """Cherche le fichier de police sur le disque (sans cache).
+
+    Args:
+        font_name: Nom de la police (ex: "Arial", "Juice ITC")
+        is_bold: Si True, cherche la version Bold
+
+    Returns:
+        Chemin complet vers le fichier .ttf (Arial en dernier recours)
+    """
+    # Vérifier si c'est une police avec un fichier mappé
+    if font_name in FONT_FILE_MAPPING:
+        normal_file, bold_file = FONT_FILE_MAPPING[font_name]
+
+        # Si Bold demandé et fichier Bold disponible
+        if is_bold and bold_file:
+            bold_path = find_system_font(bold_file)
+            if bold_path:
+                return bold_path
+
+        normal_path = find_system_font(normal_file)
+        if normal_path:
+            return normal_path
+        return get_fallback_font_path(is_bold)
+
+    # Police standard ou personnalisée
+    font_filename = font_name
+    if is_bold:
+        font_filename += " Bold"
+    font_filename += ".ttf"
+
+    # Chercher d'abord dans les polices personnalisées
+    custom_font_path = _font_index.get().find_custom_font(font_filename)
+    if custom_font_path:
+        return custom_font_path
+
+    # Sinon chercher dans les polices système
+    return find_system_font(font_filename) or get_fallback_font_path(is_bold)
+
+
+def needs_fake_bold(font_name: str) -> bool:
+    """Vérifie si une police nécessite un faux gras (pas de fichier Bold)."""
+    if font_name in FONT_FILE_MAPPING:
+        _, bold_file = FONT_FILE_MAPPING[font_name]
+        return bold_file is None
+    return False
+
+
+def load_font(font_name: str, is_bold: bool, font_size: int) -> ImageFont.ImageFont:
+    """Charge une police TrueType (mise en cache), ou la police par défaut en cas d'échec.
+
+    La police renvoyée est partagée entre les appels et ne doit pas être modifiée.
+    """
+    with stage("font"):
+        return _font_cache.get_or_create((font_name, is_bold, font_size),
+                                         lambda: _open_font(font_name, is_bold, font_size))
+
+
+def _open_font(font_name: str, is_bold: bool, font_size: int) -> ImageFont.ImageFont:
+    """Ouvre le fichier de police avec FreeType (sans cache)."""
+    try:
+        return ImageFont.truetype(get_font_path(font_name, is_bold), font_size)
+    except (OSError, ValueError):
+        return ImageFont.load_default()
+
+
+def clear_font_caches():
+    """Vide les caches de polices (ex: après installation d'une nouvelle police)."""
+    _font_index.invalidate()
+    _font_path_cache.clear()
+    _font_cache.clear()
+
+
+def font_cache_stats() -> dict:
+    """Retourne les compteurs des caches de chemins et de polices chargées."""
+    return {"font_paths": _font_path_cache.stats(), "fonts": _font_cache.stats()}
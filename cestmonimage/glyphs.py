@@ -0,0 +1,148 @@
+"""Atlas de glyphes : textes assemblés à partir de glyphes rastérisés une seule fois.
+
+Avec un texte différent pour chaque image (voir :mod:`.template`), FreeType
+rastérisait tout le texte de chaque image. Ici, chaque glyphe est rastérisé
+une fois par police et taille ; un texte est assemblé en plaçant ses glyphes
+comme Pillow (mise en page BASIC : avances et crénage au 1/64 de pixel,
+arrondis au pixel le plus proche) et en combinant les glyphes qui se
+chevauchent comme Pillow (``a + b - a*b/255``). Le résultat est identique,
+pixel pour pixel, à ``ImageDraw.text``.
+
+Les polices mises en page par Raqm (ligatures, texte bidirectionnel) et les
+textes sur plusieurs lignes passent toujours par ``ImageDraw.text``.
+"""
+import math
+
+from PIL import Image, ImageDraw, ImageFont
+
+from .cache import LRUCache
+
+GLYPH_ATLAS_CACHE_SIZE = 16  # Atlas conservés (un par police et taille)
+TEXT_MASK_CACHE_SIZE = 8  # Masques de texte assemblés conservés par atlas
+
+
+class GlyphAtlas:
+    """Glyphes rastérisés d'une police, et masques des textes assemblés.
+
+    Args:
+        font: Police FreeType (mise en page BASIC)
+    """
+
+    def __init__(self, font: ImageFont.FreeTypeFont):
+        self.font = font
+        self._glyphs = {}
+        self._kerning = {}
+        self._masks = LRUCache(TEXT_MASK_CACHE_SIZE)
+
+    def glyph(self, char: str):
+        """Masque L d'un glyphe (None si vide), sa boîte et son avance.
+
+        Returns:
+            Triplet (masque ou None, ``font.getbbox(char)``, avance en pixels)
+        """
+        entry = self._glyphs.get(char)
+        if entry is None:
+            bbox = left, top, right, bottom = self.font.getbbox(char)
+            mask = None
+            if right > left and bottom > top:
+                mask = Image.new('L', (right - left, bottom - top), 0)
+                ImageDraw.Draw(mask).text((-left, -top), char, font=self.font, fill=255)
+            entry = (mask, bbox, self.font.getlength(char))
+            self._glyphs[char] = entry
+        return entry
+
+    def kerning(self, left: str, right: str) -> float:
+        """Crénage entre deux caractères, en pixels (multiple de 1/64)."""
+        pair = left + right
+        kerning = self._kerning.get(pair)
+        if kerning is None:
+            kerning = self.font.getlength(pair) - self.glyph(left)[2] - self.glyph(right)[2]
+            self._kerning[pair] = kerning
+        return kerning
+
+    def mask(self, text: str, start=(0.0, 0.0)):
+        """Masque L de ``text`` tel que dessiné par ``ImageDraw.text``.
+
+        Args:
+            text: Texte sur une ligne
+            start: Parties fractionnaires de la position du texte
+
+        Returns:
+            Couple (masque ou None si rien n'est visible, (x, y) de son coin
+            haut-gauche par rapport à la partie entière de la position)
+        """
+        return self._masks.get_or_create((text, start), lambda: self._assemble(text, start))
+
+    def _assemble(self, text: str, start):
+        glyphs = [self.glyph(char) for char in text]
+        if not glyphs:
+            return None, (0, 0)
+        pens = [0.0]
+        for i in range(1, len(text)):
+            pens.append(pens[-1] + glyphs[i - 1][2] + self.kerning(text[i - 1], text[i]))
+
+        # Boîte de font.getbbox(text) sans nouvelle mise en page FreeType :
+        # union des boîtes des glyphes, élargie à l'avance totale
+        left = min(math.floor(pen + 0.5) + bbox[0] for pen, (_, bbox, _) in zip(pens, glyphs))
+        top = min(bbox[1] for _, bbox, _ in glyphs)
+        right = max(max(math.floor(pen + 0.5) + bbox[2] for pen, (_, bbox, _) in zip(pens, glyphs)),
+                    math.ceil(pens[-1] + glyphs[-1][2]))
+        bottom = max(bbox[3] for _, bbox, _ in glyphs)
+
+        # Comme Pillow : le masque couvre cette boîte, agrandie d'un pixel pour
+        # un départ fractionnaire positif ; le départ est arrondi au 1/64 de
+        # pixel, chaque glyphe au pixel (demi-pixel vers la droite et vers le
+        # haut), et les glyphes sont rognés à la boîte
+        width = right - left + math.ceil(start[0])
+        height = bottom - top + math.ceil(start[1])
+        if width <= 0 or height <= 0:
+            return None, (0, 0)
+        result = Image.new('L', (width, height), 0)
+        start_x = math.floor(start[0] * 64 + 0.5) / 64
+        dy = math.ceil(math.floor(start[1] * 64 + 0.5) / 64 - 0.5) - top
+        inked = -math.inf  # Bord droit des glyphes déjà posés
+        for pen, (mask, bbox, _) in zip(pens, glyphs):
+            if mask is None:
+                continue
+            x = math.floor(start_x + pen + 0.5) + bbox[0] - left
+            y = dy + bbox[1]
+            box = (x, y, x + mask.width, y + mask.height)
+            if x >= inked:
+                result.paste(mask, box)
+            else:
+                # Glyphes qui se chevauchent : a + b - a*b/255 arrondi, calculé
+                # sur le canal alpha par alpha_composite (arrondi identique à Pillow)
+                strip = (x, y, min(box[2], inked), box[3])
+                under = Image.new('RGBA', (strip[2] - x, mask.height), 0)
+                under.putalpha(result.crop(strip))
+                over = Image.new('RGBA', under.size, 0)
+                over.putalpha(mask.crop((0, 0, *under.size)))
+                result.paste(mask, box)
+                result.paste(Image.alpha_composite(under, over).getchannel('A'), strip)
+            inked = max(inked, box[2])
+        return result, (left, top)
+
+
+_atlas_cache = LRUCache(GLYPH_ATLAS_CACHE_SIZE)
+
+
+def get_atlas(font: ImageFont.FreeTypeFont) -> GlyphAtlas:
+    """Retourne l'atlas de glyphes d'une police (créé au premier appel)."""
+    # La police est conservée par son atlas : son id ne peut pas être réutilisé
+    return _atlas_cache.get_or_create(id(font), lambda: GlyphAtlas(font))
+
+
+def glyph_cache_stats() -> dict:
+    """Retourne les compteurs du cache d'atlas de glyphes."""
+    return _atlas_cache.stats()
+
+
+def draw_text(draw: ImageDraw.ImageDraw, xy, text: str, font, fill):
+    """Équivalent de ``draw.text(xy, text, font=font, fill=fill)``, depuis l'atlas de la police."""
+    if (not isinstance(font, ImageFont.FreeTypeFont) or font.layout_engine != ImageFont.Layout.BASIC
+            or '\n' in text or '\r' in text):
+        draw.text(xy, text, font=font, fill=fill)
+        return
+    mask, (dx, dy) = get_atlas(font).mask(text, (math.modf(xy[0])[0], math.modf(xy[1])[0]))
+    if mask is not None:
+        draw.bitmap((int(xy[0]) + dx, int(xy[1]) + dy), mask, fill=fill)
@@ -0,0 +1,197 @@
+"""Test de charge du service HTTP (:mod:`.service`) : requêtes/s et latence.
+
+Plusieurs clients envoient la même image en boucle, chacun sur sa propre
+connexion keep-alive, et le rapport donne le débit, la latence (médiane,
+p90, p99, max) et le nombre de refus (503). ``--serve`` lance un service
+local le temps de la mesure.
+
+Exemple::
+
+    python -m cestmonimage.loadtest photo.jpg --serve -j 4 -c 8 -n 400
+    python -m cestmonimage.loadtest photo.jpg --url http://127.0.0.1:8765/watermark -p mosaic=1
+"""
+import argparse
+import http.client
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import urlencode, urlsplit
+
+from .utils import percentile
+
+LOADTEST_CONNECT_SECONDS = 60  # Attente maximale du service lancé par --serve (préchauffage compris)
+
+
+def _post(connection: http.client.HTTPConnection, path: str, body: bytes) -> tuple[int, int]:
+    """Envoie une requête ; retourne (code HTTP, octets reçus)."""
+    connection.request("POST", path, body=body, headers={"Content-Type": "application/octet-stream"})
+    response = connection.getresponse()
+    received = len(response.read())
+    if response.getheader("Connection", "").lower() == "close":
+        connection.close()
+    return response.status, received
+
+
+def run_load(url: str, body: bytes, requests: int, concurrency: int, warmup: int = 0) -> dict:
+    """Envoie ``requests`` requêtes avec ``concurrency`` clients en parallèle.
+
+    Args:
+        url: URL complète de ``/watermark``, paramètres compris
+        body: Image envoyée
+        requests: Nombre de requêtes mesurées
+        concurrency: Nombre de connexions simultanées
+        warmup: Requêtes envoyées avant la mesure (non comptées)
+
+    Returns:
+        Synthèse : débit, latences en ms, codes HTTP
+    """
+    parts = urlsplit(url)
+    path = parts.path + (f"?{parts.query}" if parts.query else "")
+    remaining = iter(range(requests))
+    lock = threading.Lock()
+    latencies, statuses, received = [], {}, [0]
+
+    warm = http.client.HTTPConnection(parts.hostname, parts.port or 80)
+    for _ in range(warmup):
+        _post(warm, path, body)
+    warm.close()
+
+    def client():
+        connection = http.client.HTTPConnection(parts.hostname, parts.port or 80)
+        while True:
+            with lock:
+                if next(remaining, None) is None:
+                    break
+            start = time.perf_counter()
+            try:
+                status, size = _post(connection, path, body)
+            except (OSError, http.client.HTTPException):
+                connection.close()
+                status, size = "erreur", 0
+            elapsed = time.perf_counter() - start
+            with lock:
+                statuses[status] = statuses.get(status, 0) + 1
+                if status == 200:
+                    latencies.append(elapsed)
+                    received[0] += size
+        connection.close()
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall_time = time.perf_counter() - start
+
+    summary = {
+        "requests": requests,
+        "concurrency": concurrency,
+        "wall_s": round(wall_time, 3),
+        "requests_per_s": round(len(latencies) / wall_time, 2) if wall_time else 0.0,
+        "statuses": {str(status): count for status, count in sorted(statuses.items(), key=str)},
+        "request_bytes": len(body),
+        "response_bytes_mean": round(received[0] / len(latencies)) if latencies else 0,
+    }
+    if latencies:
+        summary["latency_ms"] = {
+            "p50": round(percentile(latencies, 0.50) * 1000, 1),
+            "p90": round(percentile(latencies, 0.90) * 1000, 1),
+            "p99": round(percentile(latencies, 0.99) * 1000, 1),
+            "max": round(max(latencies) * 1000, 1),
+        }
+    return summary
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _start_service(port: int, workers: int | None) -> subprocess.Popen:
+    """Lance ``python -m cestmonimage.service`` et attend qu'il réponde sur /health."""
+    command = [sys.executable, "-m", "cestmonimage.service", "--port", str(port)]
+    if workers is not None:
+        command += ["-j", str(workers)]
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL)
+    deadline = time.monotonic() + LOADTEST_CONNECT_SECONDS
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Le service s'est arrêté au démarrage (code {process.returncode})")
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            connection.request("GET", "/health")
+            if connection.getresponse().status == 200:
+                connection.close()
+                return process
+        except OSError:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError("Le service ne répond pas")
+
+
+def main(argv=None) -> int:
+    """Point d'entrée du test de charge.
+
+    Returns:
+        Code de sortie : 0 si toutes les requêtes mesurées ont répondu 200, 1 sinon
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m cestmonimage.loadtest",
+        description="Test de charge du service HTTP : requêtes/s et latence p50/p90/p99.")
+    parser.add_argument("image", help="Image envoyée à chaque requête")
+    parser.add_argument("--url", default="http://127.0.0.1:8765/watermark", help="URL du service")
+    parser.add_argument("-p", "--param", action="append", default=[], metavar="NOM=VALEUR",
+                        help="Paramètre du watermark ajouté à l'URL (répétable, ex: -p mosaic=1)")
+    parser.add_argument("-n", "--requests", type=int, default=200, help="Nombre de requêtes mesurées")
+    parser.add_argument("-c", "--concurrency", type=int, default=8, help="Connexions simultanées")
+    parser.add_argument("--warmup", type=int, default=5, help="Requêtes non comptées avant la mesure")
+    parser.add_argument("--serve", action="store_true",
+                        help="Lance un service local (port libre) pour la durée du test")
+    parser.add_argument("-j", "--workers", type=int, default=None,
+                        help="Nombre de processus du service lancé par --serve")
+    parser.add_argument("-o", "--output", default=None, help="Écrit la synthèse en JSON")
+    args = parser.parse_args(argv)
+
+    params = []
+    for item in args.param:
+        name, sep, value = item.partition("=")
+        if not sep:
+            parser.error(f"Paramètre attendu sous la forme NOM=VALEUR : {item}")
+        params.append((name, value))
+    with open(args.image, 'rb') as f:
+        body = f.read()
+    params.append(("filename", os.path.basename(args.image)))
+
+    process = None
+    url = args.url
+    if args.serve:
+        port = _free_port()
+        process = _start_service(port, args.workers)
+        url = f"http://127.0.0.1:{port}/watermark"
+    try:
+        summary = run_load(f"{url}?{urlencode(params)}", body, args.requests, args.concurrency,
+                           args.warmup)
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    print(json.dumps(summary, indent=2))
+    latency = summary.get("latency_ms")
+    if latency:
+        print(f"{summary['requests_per_s']} requêtes/s, latence médiane {latency['p50']} ms, "
+              f"p99 {latency['p99']} ms")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+    return 0 if summary["statuses"].get("200") == args.requests else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
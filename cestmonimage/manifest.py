@@ -0,0 +1,122 @@
+"""Manifeste de reprise des traitements par lot.
+
+Chaque dossier de sortie contient un manifeste (JSON lines, une ligne par
+image terminée) qui associe une source (chemin, taille, date, empreinte du
+contenu) et les paramètres du watermark au fichier écrit. Relancer le même
+lot saute les images déjà traitées et reprend là où il s'était arrêté
+(plantage ou annulation).
+"""
+import dataclasses
+import hashlib
+import json
+import os
+import threading
+
+MANIFEST_FILENAME = ".cestmonimage_manifest.jsonl"
+MANIFEST_VERSION = 1
+
+
+def content_hash(data: bytes) -> str:
+    """Empreinte du contenu d'un fichier source."""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def params_hash(job, metadata, output_basename: str, max_size: int | None, encoding=None) -> str:
+    """Empreinte de tout ce qui détermine le contenu des sorties d'un lot."""
+    params = {
+        "version": MANIFEST_VERSION,
+        "job": dataclasses.asdict(job),
+        "metadata": dataclasses.asdict(metadata),
+        "output_basename": output_basename,
+        "max_size": max_size,
+    }
+    if encoding is not None:
+        # Absent pour le JPEG par défaut : les manifestes existants restent valides
+        params["encoding"] = dataclasses.asdict(encoding)
+    encoded = json.dumps(params, sort_keys=True, ensure_ascii=False).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class BatchManifest:
+    """Manifeste d'un dossier de sortie, pour un jeu de paramètres donné.
+
+    Le fichier est relu une fois à l'ouverture ; la recherche d'une image
+    déjà traitée est ensuite une simple lecture de dictionnaire (plus un
+    ``stat`` de la sortie). Chaque image terminée est ajoutée en fin de
+    fichier, immédiatement : un plantage ne perd au plus que les images en
+    cours.
+
+    Args:
+        output_folder: Dossier de sortie du lot
+        params: Empreinte des paramètres (voir :func:`params_hash`)
+    """
+
+    def __init__(self, output_folder: str, params: str):
+        self.path = os.path.join(output_folder, MANIFEST_FILENAME)
+        self.params = params
+        self._entries = {}
+        self._outputs = set()  # Sorties notées, tous paramètres confondus
+        self._lock = threading.Lock()
+        self._load()
+        self._file = open(self.path, 'a', encoding='utf-8')
+
+    def _load(self):
+        """Relit les entrées enregistrées pour ces paramètres."""
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # Dernière ligne tronquée par un plantage
+                        continue
+                    if "output" in entry:
+                        self._outputs.add(entry["output"])
+                    if entry.get("params") == self.params:
+                        self._entries[entry["source"]] = entry
+        except OSError:
+            pass
+
+    def lookup(self, source_path: str, stat: os.stat_result) -> str | None:
+        """Retourne la sortie déjà écrite pour cette source, ou None s'il faut la traiter.
+
+        La source doit être inchangée (taille et date) et la sortie toujours présente.
+        """
+        entry = self._entries.get(os.path.abspath(source_path))
+        if entry is None or entry["size"] != stat.st_size or entry["mtime_ns"] != stat.st_mtime_ns:
+            return None
+        if not os.path.exists(entry["output"]):
+            return None
+        return entry["output"]
+
+    def outputs(self) -> set[str]:
+        """Sorties notées dans le manifeste, tous paramètres confondus (chemins absolus)."""
+        with self._lock:
+            return set(self._outputs)
+
+    def record(self, source_path: str, stat: os.stat_result, source_hash: str, output_path: str):
+        """Enregistre une image terminée."""
+        entry = {
+            "source": os.path.abspath(source_path),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "hash": source_hash,
+            "params": self.params,
+            "output": os.path.abspath(output_path),
+        }
+        with self._lock:
+            self._entries[entry["source"]] = entry
+            self._outputs.add(entry["output"])
+            self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self._file.flush()
+
+    def close(self):
+        """Ferme le fichier du manifeste."""
+        with self._lock:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,118 @@
+"""Construction des métadonnées EXIF écrites dans les images JPEG."""
+import json
+import os
+from dataclasses import dataclass
+from datetime import datetime
+
+import piexif
+
+from .engine import WatermarkJob
+
+APP_NAME = "CestMonImage"
+APP_VERSION = "1.0"
+
+
+@dataclass(frozen=True)
+class ImageMetadata:
+    """Métadonnées saisies par l'utilisateur (non affichées sur l'image).
+
+    Attributes:
+        author: Auteur / signature
+        title: Titre de l'image
+        subject: Objet / sujet
+        comment: Commentaires libres
+    """
+    author: str = ""
+    title: str = ""
+    subject: str = ""
+    comment: str = ""
+
+
+def build_watermark_info(job: WatermarkJob, metadata: ImageMetadata) -> dict:
+    """Prépare les informations de watermark stockées en JSON dans UserComment."""
+    return {
+        "text": job.text,
+        "signature": metadata.author,
+        "date_applied": datetime.now().isoformat(),
+        "opacity": job.opacity,
+        "position": job.position,
+        "is_mosaic": job.is_mosaic,
+        "num_watermarks": job.num_watermarks,
+        "font": job.font_name,
+        "is_bold": job.is_bold,
+        "font_size_percent": job.font_size_percent,
+        "application": APP_NAME,
+        "version": APP_VERSION
+    }
+
+
+def load_source_exif(source) -> dict | None:
+    """Lit les métadonnées EXIF existantes d'un JPEG (None si illisibles).
+
+    Args:
+        source: Chemin du fichier, ou contenu du fichier déjà lu (bytes)
+    """
+    try:
+        return piexif.load(source)
+    except Exception:
+        # Ignorer silencieusement les erreurs de lecture EXIF
+        return None
+
+
+def build_exif_bytes(job: WatermarkJob, metadata: ImageMetadata, output_path: str,
+                     source_exif: dict | None = None) -> bytes:
+    """Construit le bloc EXIF d'une image watermarkée.
+
+    Args:
+        job: Paramètres du watermark appliqué
+        metadata: Métadonnées saisies par l'utilisateur
+        output_path: Chemin du fichier de sortie (pour DocumentName)
+        source_exif: EXIF de l'image source à conserver
+
+    Returns:
+        EXIF sérialisé, prêt pour ``Image.save(..., exif=...)``
+    """
+    exif_dict = {"0th": {}, "Exif": {}, "GPS": {}, "1st": {}}
+
+    # Copier les métadonnées EXIF existantes si possible
+    if source_exif:
+        for ifd in ("0th", "Exif", "GPS", "1st"):
+            if ifd in source_exif:
+                exif_dict[ifd].update(source_exif[ifd])
+
+    # Ajouter nos métadonnées personnalisées (JSON complet)
+    watermark_bytes = json.dumps(build_watermark_info(job, metadata)).encode('utf-8')
+    exif_dict["Exif"][piexif.ExifIFD.UserComment] = watermark_bytes
+
+    # Ajouter le copyright dans le champ standard
+    copyright_text = job.text
+    if metadata.author:
+        copyright_text += " - " + metadata.author
+    exif_dict["0th"][piexif.ImageIFD.Copyright] = copyright_text.encode('utf-8')
+
+    # Ajouter l'auteur
+    author = metadata.author or "CestMonImage User"
+    exif_dict["0th"][piexif.ImageIFD.Artist] = author.encode('utf-8')
+
+    # Ajouter le titre (ImageDescription pour EXIF, XPTitle pour Windows)
+    if metadata.title:
+        exif_dict["0th"][piexif.ImageIFD.ImageDescription] = metadata.title.encode('utf-8')
+        exif_dict["0th"][piexif.ImageIFD.XPTitle] = metadata.title.encode('utf-16le')
+
+    # Ajouter l'objet/sujet (XPSubject pour Windows)
+    if metadata.subject:
+        exif_dict["0th"][piexif.ImageIFD.XPSubject] = metadata.subject.encode('utf-16le')
+
+    # Ajouter les commentaires (XPComment pour Windows)
+    if metadata.comment:
+        exif_dict["0th"][piexif.ImageIFD.XPComment] = metadata.comment.encode('utf-16le')
+
+    # Ajouter la date et le logiciel
+    exif_dict["0th"][piexif.ImageIFD.Software] = APP_NAME.encode('utf-8')
+    exif_dict["Exif"][piexif.ExifIFD.DateTimeOriginal] = \
+        datetime.now().strftime("%Y:%m:%d %H:%M:%S").encode('utf-8')
+
+    # Nom du document
+    exif_dict["0th"][piexif.ImageIFD.DocumentName] = os.path.basename(output_path).encode('utf-8')
+
+    return piexif.dump(exif_dict)
@@ -0,0 +1,208 @@
+"""Attribution des noms de fichiers de sortie d'un lot."""
+import os
+import re
+import socket
+import sys
+import threading
+
+RESERVATION_SUFFIX = ".part"  # Réservation d'un nom : fichier caché ``.nom.jpg.part``
+
+
+def format_output_name(basename: str, index: int, suffix: int = 0, extension: str = ".jpg") -> str:
+    """Nom de sortie : ``basename_001.jpg``, puis ``basename_001_1.jpg``... en cas de doublon."""
+    if suffix:
+        return f"{basename}_{index:03d}_{suffix}{extension}"
+    return f"{basename}_{index:03d}{extension}"
+
+
+def reservation_path(filepath: str) -> str:
+    """Fichier caché qui réserve le nom ``filepath`` (même dossier)."""
+    folder, name = os.path.split(filepath)
+    return os.path.join(folder, f".{name}{RESERVATION_SUFFIX}")
+
+
+def _reserved_name(entry_name: str) -> str | None:
+    """Nom réservé par un fichier ``.nom.part`` (None pour un autre fichier)."""
+    if entry_name.startswith('.') and entry_name.endswith(RESERVATION_SUFFIX):
+        return entry_name[1:-len(RESERVATION_SUFFIX)]
+    return None
+
+
+def _owner() -> str:
+    """Propriétaire d'une réservation : machine et processus."""
+    return f"{socket.gethostname()} {os.getpid()}"
+
+
+def _process_running(pid: int) -> bool:
+    """True si le processus ``pid`` de cette machine existe (ou si on ne peut pas le savoir)."""
+    try:
+        import psutil
+    except ImportError:
+        if sys.platform == 'win32':
+            return True
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except OSError:
+            return True
+        return True
+    return psutil.pid_exists(pid)
+
+
+def _is_stale(reservation: str) -> bool:
+    """True si la réservation a été laissée par un processus arrêté de cette machine.
+
+    Une réservation vide (en cours de création), illisible ou posée depuis une
+    autre machine (dossier partagé) est considérée comme vivante.
+    """
+    try:
+        with open(reservation, encoding='utf-8') as f:
+            host, pid = f.read().split()
+        pid = int(pid)
+    except (OSError, ValueError):
+        return False
+    return host == socket.gethostname() and pid != os.getpid() and not _process_running(pid)
+
+
+def last_output_index(folder: str, basename: str) -> int:
+    """Plus grand numéro des sorties ``basename_NNN`` déjà présentes dans un dossier (0 si aucune)."""
+    pattern = re.compile(rf"{re.escape(basename)}_(\d+)(?:_\d+)?\.[^.]+", re.IGNORECASE)
+    last = 0
+    try:
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                match = pattern.fullmatch(entry.name)
+                if match:
+                    last = max(last, int(match.group(1)))
+    except OSError:
+        pass
+    return last
+
+
+class OutputNameAllocator:
+    """Attribue des noms de sortie uniques dans un dossier, sans sonder le disque à chaque essai.
+
+    Le dossier est listé une seule fois (``os.scandir``) ; les noms déjà
+    pris sont ensuite testés en mémoire. Chaque nom attribué est réservé en
+    créant de façon exclusive (``O_EXCL``) un fichier caché à côté (voir
+    :func:`reservation_path`) : deux lots écrivant dans le même dossier ne
+    peuvent pas obtenir le même nom. Le nom définitif n'apparaît qu'avec
+    l'image complète (:func:`.pipeline.write_atomic`) : un plantage ne
+    laisse jamais de fichier vide à sa place.
+
+    Args:
+        folder: Dossier de destination (doit exister)
+        extension: Extension par défaut des fichiers de sortie
+    """
+
+    def __init__(self, folder: str, extension: str = ".jpg"):
+        self.folder = folder
+        self.extension = extension
+        self._lock = threading.Lock()
+        # Comparaison insensible à la casse (Windows, macOS)
+        self._taken = set()
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                self._taken.add((_reserved_name(entry.name) or entry.name).lower())
+        self._next_suffix = {}
+
+    def allocate(self, basename: str, index: int, extension: str | None = None) -> str:
+        """Réserve et retourne le chemin d'un fichier de sortie qui n'existait pas.
+
+        Le chemin retourné n'existe pas encore : l'image doit y être écrite
+        d'un bloc (:func:`.pipeline.write_atomic`), puis la réservation
+        libérée avec :meth:`release`, que l'écriture ait réussi ou non.
+
+        Args:
+            basename: Nom de base des sorties
+            index: Numéro de l'image dans le lot
+            extension: Extension du fichier (par défaut celle de l'allocateur)
+        """
+        extension = extension or self.extension
+        key = (basename, index, extension)
+        with self._lock:
+            suffix = self._next_suffix.get(key, 0)
+            while True:
+                filename = format_output_name(basename, index, suffix, extension)
+                suffix += 1
+                if filename.lower() in self._taken:
+                    continue
+                self._taken.add(filename.lower())
+                filepath = os.path.join(self.folder, filename)
+                try:
+                    fd = os.open(reservation_path(filepath), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                except FileExistsError:
+                    # Réservé depuis le listage (autre lot) : essayer le suffixe suivant
+                    continue
+                # Propriétaire noté pour la reprise après un plantage (voir reclaim)
+                with open(fd, 'w', encoding='utf-8') as f:
+                    f.write(_owner())
+                if os.path.lexists(filepath):
+                    # Écrit depuis le listage (hors allocateur) : jamais écrasé
+                    self.release(filepath)
+                    continue
+                self._next_suffix[key] = suffix
+                return filepath
+
+    def reclaim(self, basename: str, recorded=()) -> list[str]:
+        """Libère les noms laissés par un lancement interrompu (plantage, ``kill -9``).
+
+        Sont supprimés : les réservations d'un processus arrêté de cette
+        machine et leurs fichiers temporaires, la sortie d'une telle
+        réservation si elle n'est pas dans ``recorded`` (terminée par un
+        processus du pool après la mort du lot, sans être notée au
+        manifeste), et les sorties ``basename_NNN`` vides (réservations des
+        versions précédentes). Les noms libérés redeviennent attribuables :
+        la reprise réécrit ``image_013.jpg`` au lieu de créer ``image_013_1.jpg``.
+
+        Args:
+            basename: Nom de base des sorties du lot
+            recorded: Chemins absolus des sorties notées au manifeste (conservées)
+
+        Returns:
+            Noms de sortie libérés
+        """
+        output_name = re.compile(rf"{re.escape(basename)}_\d+(?:_\d+)?\.[^.]+", re.IGNORECASE)
+        recorded = {os.path.normcase(path) for path in recorded}
+        stale, empty, temporary = [], [], []
+        with os.scandir(self.folder) as entries:
+            for entry in entries:
+                name = _reserved_name(entry.name)
+                if name is not None:
+                    if output_name.fullmatch(name) and _is_stale(entry.path):
+                        stale.append(name)
+                elif entry.name.startswith('.') and entry.name.endswith('.tmp'):
+                    temporary.append(entry.name)
+                elif output_name.fullmatch(entry.name) and entry.is_file() and entry.stat().st_size == 0:
+                    empty.append(entry.name)
+
+        reclaimed = []
+        for name in stale:
+            filepath = os.path.join(self.folder, name)
+            if os.path.normcase(os.path.abspath(filepath)) not in recorded:
+                _remove(filepath)
+            for temp_name in temporary:
+                if temp_name.startswith(f".{name}."):
+                    _remove(os.path.join(self.folder, temp_name))
+            _remove(reservation_path(filepath))
+            if not os.path.lexists(filepath):
+                reclaimed.append(name)
+        for name in empty:
+            _remove(os.path.join(self.folder, name))
+            reclaimed.append(name)
+        with self._lock:
+            self._taken.difference_update(name.lower() for name in reclaimed)
+            self._next_suffix.clear()
+        return reclaimed
+
+    def release(self, filepath: str):
+        """Libère la réservation d'un nom (image écrite, ou en échec)."""
+        _remove(reservation_path(filepath))
+
+
+def _remove(path: str):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
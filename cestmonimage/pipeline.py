@@ -0,0 +1,187 @@
+"""Entrées/sorties d'un lot en parallèle du rendu : lecture anticipée, écriture différée.
+
+Le rendu d'une image (décodage, watermark, encodage) occupe le processeur ;
+la lecture de la source et l'écriture de la sortie attendent le disque ou le
+réseau. Des threads de lecture chargent les sources suivantes pendant le
+rendu, et un thread d'écriture enregistre les sorties déjà encodées : disque
+et processeur travaillent en même temps. Les files sont bornées (images lues
+d'avance, sorties et octets en attente d'écriture) : la mémoire ne dépend
+pas de la taille du lot.
+
+Chaque sortie est écrite dans un fichier temporaire du même dossier, puis
+renommée (``os.replace``) : une image à moitié écrite (lot interrompu, disque
+plein) n'apparaît jamais sous son nom définitif.
+"""
+import itertools
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+
+from .decode import read_source
+
+PIPELINE_READERS = 2  # Threads de lecture des sources
+PIPELINE_READ_AHEAD = 4  # Sources lues (ou en cours de lecture) d'avance
+PIPELINE_WRITE_BEHIND = 4  # Sorties encodées en attente d'écriture
+PIPELINE_WRITE_BEHIND_BYTES = 256 * 1024 * 1024  # Octets en attente d'écriture (une sortie plus grosse passe seule)
+
+_temp_counter = itertools.count()
+
+
+def write_atomic(path: str, data) -> None:
+    """Écrit un fichier d'un bloc : fichier temporaire du même dossier, puis renommage.
+
+    Le fichier temporaire (``.nom.tmp``, ignoré par le listage des sources)
+    est supprimé en cas d'échec. Le nom définitif n'existe qu'une fois le
+    fichier complet.
+    """
+    folder, name = os.path.split(path)
+    temp_path = os.path.join(folder, f".{name}.{os.getpid()}-{next(_temp_counter)}.tmp")
+    # Droits par défaut (umask), comme un fichier ouvert normalement
+    fd = os.open(temp_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY | getattr(os, 'O_BINARY', 0), 0o666)
+    try:
+        with open(fd, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+class _Depth:
+    """Profondeur d'une file relevée à chaque passage (moyenne et maximum)."""
+
+    __slots__ = ("total", "samples", "max")
+
+    def __init__(self):
+        self.total = self.samples = self.max = 0
+
+    def sample(self, depth: int):
+        self.total += depth
+        self.samples += 1
+        self.max = max(self.max, depth)
+
+    def summary(self, limit: int) -> dict:
+        return {"limit": limit, "mean_depth": round(self.total / self.samples, 2) if self.samples else 0.0,
+                "max_depth": self.max}
+
+
+class IOPipeline:
+    """Threads de lecture anticipée et thread d'écriture différée d'un lot.
+
+    Le thread qui fait le rendu demande les lectures à l'avance avec
+    :meth:`read` et confie les sorties encodées à :meth:`write` ; les
+    attentes de ce thread sont comptées (voir :meth:`stats`).
+
+    Args:
+        readers: Nombre de threads de lecture
+        read_ahead: Sources lues d'avance (limite appliquée par l'appelant, rapportée)
+        write_behind: Sorties en attente d'écriture au maximum
+        write_behind_bytes: Octets en attente d'écriture au maximum
+    """
+
+    def __init__(self, readers: int = PIPELINE_READERS, read_ahead: int = PIPELINE_READ_AHEAD,
+                 write_behind: int = PIPELINE_WRITE_BEHIND,
+                 write_behind_bytes: int = PIPELINE_WRITE_BEHIND_BYTES):
+        self.readers = readers
+        self.read_ahead = read_ahead
+        self.write_behind = write_behind
+        self.write_behind_bytes = write_behind_bytes
+        self._reader_pool = ThreadPoolExecutor(readers, thread_name_prefix="cestmonimage-lecture")
+        self._writer_pool = ThreadPoolExecutor(1, thread_name_prefix="cestmonimage-ecriture")
+        self._writes = {}  # Écritures en attente -> taille
+        self._lock = threading.Lock()
+        self._busy = {"read": 0.0, "write": 0.0}
+        self._stalls = {"read": 0.0, "write": 0.0}
+        self._read_depth = _Depth()
+        self._write_depth = _Depth()
+        self._max_write_bytes = 0
+
+    def _read(self, path: str) -> tuple[bytes, float]:
+        start = time.perf_counter()
+        data = read_source(path)
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self._busy["read"] += elapsed
+        return data, elapsed
+
+    def _write(self, path: str, data) -> float:
+        start = time.perf_counter()
+        write_atomic(path, data)
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self._busy["write"] += elapsed
+        return elapsed
+
+    def read(self, path: str) -> Future:
+        """Lance la lecture d'une source ; le résultat est (contenu, durée de lecture)."""
+        return self._reader_pool.submit(self._read, path)
+
+    def wait_read(self, future: Future) -> tuple[bytes, float]:
+        """Attend une lecture (attente comptée comme rendu bloqué par la lecture)."""
+        if not future.done():
+            start = time.perf_counter()
+            wait([future])
+            self.add_stall("read", time.perf_counter() - start)
+        return future.result()
+
+    def write(self, path: str, data) -> Future:
+        """Confie une sortie encodée au thread d'écriture.
+
+        Bloque tant que la file d'écriture est pleine (attente comptée). Le
+        résultat est la durée d'écriture ; une erreur d'écriture est levée
+        par ``future.result()``.
+        """
+        self._prune()
+        if self._writes and (len(self._writes) >= self.write_behind
+                             or sum(self._writes.values()) + len(data) > self.write_behind_bytes):
+            start = time.perf_counter()
+            while self._writes and (len(self._writes) >= self.write_behind
+                                    or sum(self._writes.values()) + len(data) > self.write_behind_bytes):
+                wait(list(self._writes), return_when=FIRST_COMPLETED)
+                self._prune()
+            self.add_stall("write", time.perf_counter() - start)
+        self._write_depth.sample(len(self._writes))
+        future = self._writer_pool.submit(self._write, path, data)
+        self._writes[future] = len(data)
+        self._max_write_bytes = max(self._max_write_bytes, sum(self._writes.values()))
+        return future
+
+    def _prune(self):
+        for future in [future for future in self._writes if future.done()]:
+            del self._writes[future]
+
+    def sample_read_ahead(self, depth: int):
+        """Note le nombre de sources lues d'avance au moment de lancer un rendu."""
+        self._read_depth.sample(depth)
+
+    def add_stall(self, name: str, seconds: float):
+        """Compte une attente du rendu : ``"read"`` (source pas encore lue) ou ``"write"`` (file pleine)."""
+        self._stalls[name] += seconds
+
+    def stats(self) -> dict:
+        """Profondeur des files, attentes du rendu et temps d'occupation des threads (secondes)."""
+        with self._lock:
+            busy = dict(self._busy)
+        return {
+            "readers": self.readers,
+            "read_ahead": self._read_depth.summary(self.read_ahead),
+            "write_behind": {**self._write_depth.summary(self.write_behind),
+                             "max_mb": round(self._max_write_bytes / (1024 * 1024), 1)},
+            "stalls_s": {name: round(seconds, 4) for name, seconds in self._stalls.items()},
+            "busy_s": {name: round(seconds, 4) for name, seconds in busy.items()},
+        }
+
+    def close(self):
+        """Abandonne les lectures pas encore commencées et termine les écritures en attente."""
+        self._reader_pool.shutdown(wait=True, cancel_futures=True)
+        self._writer_pool.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,58 @@
+"""Prévisualisation : image source réduite gardée en mémoire entre deux rendus."""
+import os
+import threading
+
+from PIL import Image
+
+from .decode import load_image
+from .engine import WatermarkJob, render_watermark
+from .template import expand_job
+
+PREVIEW_SIZE = (400, 300)
+
+
+class PreviewRenderer:
+    """Rend la prévisualisation d'un watermark sur une image réduite en cache.
+
+    L'image source n'est décodée et réduite qu'une fois par fichier : les
+    changements de paramètres (texte, opacité, taille...) ne font que
+    redessiner le watermark sur la copie en mémoire. Le cache est invalidé
+    quand le fichier sélectionné change (chemin, date ou taille).
+
+    Args:
+        size: Taille maximale (largeur, hauteur) de la prévisualisation
+    """
+
+    def __init__(self, size: tuple[int, int] = PREVIEW_SIZE):
+        self.size = size
+        self._key = None
+        self._base = None
+        self._lock = threading.Lock()
+
+    def get_base(self, image_path: str) -> Image.Image:
+        """Retourne l'image source réduite (décodée au premier appel pour ce fichier)."""
+        stat = os.stat(image_path)
+        key = (os.path.abspath(image_path), stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            if key != self._key:
+                self._base = self._load(image_path)
+                self._key = key
+            return self._base
+
+    def _load(self, image_path: str) -> Image.Image:
+        """Décode l'image source directement à résolution réduite."""
+        return load_image(image_path, self.size)
+
+    def render(self, image_path: str, job: WatermarkJob, index: int = 1) -> Image.Image:
+        """Retourne la prévisualisation RGB du watermark sur ``image_path``.
+
+        Les variables du texte sont remplacées comme pour l'image ``index`` du lot.
+        """
+        job = expand_job(job, image_path, index)
+        return render_watermark(self.get_base(image_path), job).convert('RGB')
+
+    def invalidate(self):
+        """Oublie l'image en cache (elle sera relue au prochain rendu)."""
+        with self._lock:
+            self._key = None
+            self._base = None
@@ -0,0 +1,136 @@
+"""Parcours des dossiers sources : listage progressif, filtres et instantané en cache."""
+import fnmatch
+import os
+import threading
+from collections.abc import Iterator
+
+SUPPORTED_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.gif')
+
+
+def is_image_file(filename: str) -> bool:
+    """Vérifie si le fichier a une extension d'image supportée."""
+    return filename.lower().endswith(SUPPORTED_EXTENSIONS)
+
+
+def _matches(relative_path: str, name: str, patterns) -> bool:
+    """Teste des motifs glob : sur le chemin relatif s'ils contiennent un '/', sinon sur le nom."""
+    for pattern in patterns:
+        if fnmatch.fnmatch(relative_path if '/' in pattern else name, pattern):
+            return True
+    return False
+
+
+def is_source_file(relative_path: str, output_basename: str, include=(), exclude=()) -> bool:
+    """Vérifie qu'un fichier est une image à traiter (voir :func:`iter_images`).
+
+    Args:
+        relative_path: Chemin relatif au dossier source, séparateur '/'
+        output_basename: Préfixe des fichiers de sortie à ignorer
+        include: Motifs glob à retenir (tous les fichiers si vide)
+        exclude: Motifs glob à ignorer
+    """
+    name = relative_path.rsplit('/', 1)[-1]
+    if not is_image_file(name) or name.startswith(output_basename):
+        return False
+    if include and not _matches(relative_path, name, include):
+        return False
+    return not _matches(relative_path, name, exclude)
+
+
+def is_excluded_dir(relative_path: str, exclude=()) -> bool:
+    """Vérifie qu'un sous-dossier (chemin relatif, séparateur '/') est exclu en entier."""
+    return _matches(relative_path, relative_path.rsplit('/', 1)[-1], exclude)
+
+
+def iter_images(folder: str, output_basename: str, recursive: bool = False,
+                include=(), exclude=(), dir_mtimes: dict | None = None) -> Iterator[str]:
+    """Parcourt un dossier et renvoie les images au fur et à mesure.
+
+    Les images sont produites dossier par dossier, triées par nom (ordre
+    stable d'un lancement à l'autre) : un lot peut commencer avant la fin du
+    listage d'une grande arborescence.
+
+    Args:
+        folder: Dossier source
+        output_basename: Préfixe des fichiers de sortie à ignorer
+        recursive: Parcourt aussi les sous-dossiers
+        include: Motifs glob à retenir (tous les fichiers si vide), ex: ``"*.jpg"``
+        exclude: Motifs glob à ignorer ; un sous-dossier qui correspond est sauté
+            en entier. Un motif contenant '/' s'applique au chemin relatif
+            (ex: ``"brouillons/*"``), sinon au nom seul.
+        dir_mtimes: Si fourni, reçoit la date de modification (ns) de chaque dossier visité
+
+    Yields:
+        Chemins complets des images à traiter
+    """
+    stack = [(folder, "")]
+    while stack:
+        directory, relative_dir = stack.pop()
+        try:
+            if dir_mtimes is not None:
+                dir_mtimes[directory] = os.stat(directory).st_mtime_ns
+            with os.scandir(directory) as entries:
+                entries = sorted(entries, key=lambda entry: entry.name)
+        except OSError:
+            continue
+
+        subdirs = []
+        for entry in entries:
+            relative_path = f"{relative_dir}{entry.name}"
+            if entry.is_dir(follow_symlinks=False):
+                if recursive and not is_excluded_dir(relative_path, exclude):
+                    subdirs.append((entry.path, f"{relative_path}/"))
+                continue
+            if is_source_file(relative_path, output_basename, include, exclude) and entry.is_file():
+                yield entry.path
+        # Sous-dossiers visités dans l'ordre alphabétique
+        stack.extend(reversed(subdirs))
+
+
+class DirectoryIndex:
+    """Instantané en cache de la liste des images d'un dossier.
+
+    La liste est reconstruite uniquement si les paramètres changent ou si la
+    date de modification d'un des dossiers parcourus a changé (fichier
+    ajouté, supprimé ou renommé). La prévisualisation et le lot partagent
+    ainsi le même listage.
+    """
+
+    def __init__(self):
+        self._key = None
+        self._files = None
+        self._dir_mtimes = {}
+        self._lock = threading.Lock()
+
+    def _is_fresh(self) -> bool:
+        """Vérifie qu'aucun dossier parcouru n'a été modifié (verrou tenu)."""
+        for directory, mtime in self._dir_mtimes.items():
+            try:
+                if os.stat(directory).st_mtime_ns != mtime:
+                    return False
+            except OSError:
+                return False
+        return True
+
+    def snapshot(self, folder: str, output_basename: str, recursive: bool = False,
+                 include=(), exclude=()) -> list[str]:
+        """Retourne la liste des images (voir :func:`iter_images`), depuis le cache si possible."""
+        key = (os.path.abspath(folder), output_basename, recursive, tuple(include), tuple(exclude))
+        with self._lock:
+            if key == self._key and self._is_fresh():
+                return list(self._files)
+
+        dir_mtimes = {}
+        files = list(iter_images(folder, output_basename, recursive, include, exclude, dir_mtimes))
+        with self._lock:
+            self._key = key
+            self._files = files
+            self._dir_mtimes = dir_mtimes
+        return list(files)
+
+    def invalidate(self):
+        """Oublie l'instantané ; le prochain appel relistera le dossier."""
+        with self._lock:
+            self._key = None
+            self._files = None
+            self._dir_mtimes = {}
@@ -0,0 +1,139 @@
+"""Admission des images d'un lot parallèle selon un budget mémoire.
+
+Un nombre fixe d'images en parallèle gaspille des cœurs sur les petites
+photos ou épuise la mémoire sur les très grandes. Ici, chaque image se voit
+attribuer une empreinte mémoire estimée d'après son en-tête (dimensions et
+mode, lus sans décodage), et n'est lancée que si la somme
+des empreintes en cours reste dans le budget. Les plus grosses images d'une
+fenêtre d'attente passent en premier : les petites remplissent ensuite les
+trous, au lieu qu'une grosse image isolée allonge la fin du lot.
+"""
+import bisect
+import itertools
+import os
+
+from .decode import MAX_SOURCE_PIXELS, fit_size, max_size_box, open_image
+from .engine import WatermarkJob, overlay_footprint
+
+MEMORY_BUDGET_FRACTION = 0.75  # Part de la mémoire disponible allouée par défaut aux images en cours
+ADMISSION_LOOKAHEAD = 64  # Images en attente parmi lesquelles les plus grosses sont choisies
+MAX_BYPASS = 8  # Petites images admises avant une grosse en attente, avant de la réserver
+
+
+def _pixel_bytes(mode: str) -> int:
+    """Octets par pixel d'une image Pillow décodée (RGB est stocké sur 4 octets)."""
+    return 1 if mode in ('1', 'L', 'P') else 2 if mode.startswith('I;16') else 4
+
+
+def estimate_footprint(image_path: str, job: WatermarkJob, max_size: int | None = None) -> int:
+    """Estime le pic mémoire du traitement d'une image, d'après son seul en-tête.
+
+    L'estimation additionne le fichier lu en mémoire, l'image décodée, la
+    copie RGB/RGBA des modes qui ne sont pas fusionnés en place et la
+    mémoire de travail du watermark (voir :func:`.engine.overlay_footprint`).
+
+    Args:
+        image_path: Image source
+        job: Paramètres du watermark
+        max_size: Plus grand côté de la sortie (None = taille d'origine)
+
+    Returns:
+        Empreinte estimée en octets (taille du fichier seule s'il est illisible)
+    """
+    try:
+        file_bytes = os.path.getsize(image_path)
+    except OSError:
+        return 0
+    try:
+        with open_image(image_path, MAX_SOURCE_PIXELS) as img:
+            size, mode, image_format = img.size, img.mode, img.format
+    except Exception:
+        # Le traitement échouera rapidement : seul le fichier sera lu
+        return file_bytes
+
+    target = fit_size(size, max_size_box(max_size)) if max_size else size
+    pixels = target[0] * target[1]
+    decoded = pixels * _pixel_bytes(mode)
+    if target != size:
+        # Image décodée avant réduction : à l'échelle DCT pour un JPEG (voir load_image)
+        scale = 1
+        if image_format == "JPEG":
+            scale = next(s for s in (8, 4, 2, 1)
+                         if -(-size[0] // s) >= target[0] and -(-size[1] // s) >= target[1])
+        decoded += -(-size[0] // scale) * -(-size[1] // scale) * _pixel_bytes(mode)
+
+    # Les modes autres que RGB/RGBA sont convertis (copie) avant la fusion
+    converted = 0 if mode in ('RGB', 'RGBA') else pixels * 4
+    return file_bytes + decoded + converted + overlay_footprint(target, job)
+
+
+def default_memory_budget() -> int | None:
+    """Budget mémoire par défaut : une part de la mémoire disponible (None si inconnue)."""
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return int(psutil.virtual_memory().available * MEMORY_BUDGET_FRACTION)
+
+
+class AdmissionQueue:
+    """Images en attente, admises par ordre de taille décroissante dans un budget mémoire.
+
+    La plus grosse image en attente est admise dès que le budget le permet.
+    Sinon, la plus grosse de celles qui tiennent passe devant, au plus
+    ``max_bypass`` fois de suite : la grosse image est ensuite réservée (rien
+    d'autre n'est admis) jusqu'à ce que la mémoire se libère. Une image
+    plus grosse que le budget entier est admise seule, quand plus rien ne tourne.
+
+    Args:
+        budget: Mémoire totale des images en cours, en octets (None = pas de limite)
+        max_bypass: Nombre d'images pouvant doubler la plus grosse en attente
+    """
+
+    def __init__(self, budget: int | None, max_bypass: int = MAX_BYPASS):
+        self.budget = budget
+        self.max_bypass = max_bypass
+        self.in_use = 0
+        self._waiting = []  # (-empreinte, ordre d'arrivée, élément), trié
+        self._order = itertools.count()
+        self._bypassed = 0
+
+    def __len__(self):
+        return len(self._waiting)
+
+    def push(self, item, cost: int):
+        """Met une image en attente avec son empreinte estimée."""
+        bisect.insort(self._waiting, (-cost, next(self._order), item))
+
+    def pop(self):
+        """Admet une image si le budget le permet.
+
+        Returns:
+            Couple (élément, empreinte), ou None si rien ne peut être admis pour l'instant
+        """
+        if not self._waiting:
+            return None
+        if self.budget is None or self.in_use == 0 or -self._waiting[0][0] <= self.budget - self.in_use:
+            position = 0
+            self._bypassed = 0
+        elif self._bypassed < self.max_bypass:
+            # Plus grosse image qui tient dans la mémoire restante
+            position = bisect.bisect_left(self._waiting, (self.in_use - self.budget,))
+            if position == len(self._waiting):
+                return None
+            self._bypassed += 1
+        else:
+            return None
+        negative_cost, _, item = self._waiting.pop(position)
+        self.in_use -= negative_cost
+        return item, -negative_cost
+
+    def release(self, cost: int):
+        """Rend au budget la mémoire d'une image terminée."""
+        self.in_use -= cost
+
+    def clear(self) -> list:
+        """Vide la file (annulation) et retourne les éléments qui n'ont pas été admis."""
+        items = [item for _, _, item in self._waiting]
+        self._waiting.clear()
+        return items
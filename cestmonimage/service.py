@@ -0,0 +1,564 @@
+"""Service HTTP local : une image envoyée en POST, l'image watermarkée en réponse.
+
+Le service évite à un serveur web de lancer la CLI pour chaque image : les
+processus de rendu restent lancés, polices, glyphes et calques en cache.
+L'image est le corps de la requête, les paramètres du watermark sont dans
+l'URL (mêmes noms et valeurs par défaut que la CLI)::
+
+    python -m cestmonimage.service --port 8765 -j 4
+    curl --data-binary @photo.jpg -o sortie.jpg \\
+        "http://127.0.0.1:8765/watermark?text=Studio%20Dupont&opacity=40&position=center"
+
+Le nombre de requêtes acceptées en même temps est borné (processus + file
+d'attente) : au-delà, le service répond 503 tout de suite au lieu
+d'accumuler les images en mémoire. ``GET /health`` renvoie l'état du service
+en JSON. Voir :mod:`.loadtest` pour mesurer le débit et la latence.
+"""
+import argparse
+import io
+import itertools
+import json
+import os
+import signal
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from PIL import Image
+
+from .batch import default_workers, init_resident_worker, watermark_bytes
+from .cli import build_parser, job_from_args
+from .decode import open_image
+from .encoders import PRESETS, SOURCE_FORMATS, OutputEncoding, output_formats
+from .engine import POSITIONS, WatermarkJob, render_watermark
+from .metadata import ImageMetadata
+from .template import expand_job, parse_template
+from .utils import hex_to_rgb
+
+SERVICE_HOST = "127.0.0.1"
+SERVICE_PORT = 8765
+SERVICE_QUEUE_PER_WORKER = 4  # Requêtes en attente par processus, en plus de celles en cours
+SERVICE_MAX_BODY_BYTES = 64 * 1024 * 1024  # Taille maximale d'une image envoyée
+SERVICE_CHUNK_BYTES = 256 * 1024  # Taille des blocs lus et écrits sur la connexion
+SERVICE_TIMEOUT_SECONDS = 30  # Connexion inactive (envoi interrompu, keep-alive) fermée après ce délai
+SERVICE_MAX_TEXT_CHARS = 256  # Longueur maximale du texte et des métadonnées
+SERVICE_MAX_PIXELS = 50_000_000  # Dimensions maximales d'une image envoyée (largeur x hauteur)
+# Plages des curseurs de l'interface graphique : au-delà, un seul envoi
+# demanderait des milliers de collages ou un calque démesuré
+SERVICE_SIZE_RANGE = (1.0, 20.0)  # % de la largeur
+SERVICE_COUNT_RANGE = (1, 10)
+SERVICE_SPACING_RANGE = (0.1, 5.0)
+WARM_IMAGE_SIZE = (2048, 1365)  # Image rendue par chaque processus au démarrage
+
+# Extension des fichiers par format Pillow détecté (nom de la source si absent de l'URL)
+_FORMAT_EXTENSIONS = {"JPEG": ".jpg", "MPO": ".jpg", "PNG": ".png", "GIF": ".gif", "BMP": ".bmp",
+                      "WEBP": ".webp", "TIFF": ".tif"}
+_FLAGS = {"1": True, "true": True, "yes": True, "oui": True, "on": True,
+          "0": False, "false": False, "no": False, "non": False, "off": False, "": True}
+
+
+class RequestError(Exception):
+    """Requête refusée : code HTTP et message renvoyé au client."""
+
+    def __init__(self, status: HTTPStatus, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def _flag(value: str) -> bool:
+    try:
+        return _FLAGS[value.strip().lower()]
+    except KeyError:
+        raise ValueError(f"booléen attendu (1/0, true/false) : {value}") from None
+
+
+def _text(value: str) -> str:
+    if len(value) > SERVICE_MAX_TEXT_CHARS:
+        raise ValueError(f"{SERVICE_MAX_TEXT_CHARS} caractères au maximum")
+    return value
+
+
+# Paramètre de l'URL -> (argument de la CLI, conversion)
+QUERY_PARAMETERS = {
+    "text": ("text", _text),
+    "copyright_symbol": ("symbol", _text),
+    "font": ("font", _text),
+    "bold": ("bold", _flag),
+    "color": ("color", str),
+    "opacity": ("opacity", int),
+    "size": ("size", float),
+    "position": ("position", str),
+    "count": ("count", int),
+    "mosaic": ("mosaic", _flag),
+    "spacing_h": ("spacing_h", float),
+    "spacing_v": ("spacing_v", float),
+    "format": ("format", str),
+    "preset": ("preset", str),
+    "max_size": ("max_size", int),
+    "author": ("author", _text),
+    "title": ("title", _text),
+    "subject": ("subject", _text),
+    "comment": ("comment", _text),
+    "filename": ("filename", _text),
+}
+
+
+def default_arguments() -> dict:
+    """Valeurs par défaut des paramètres (celles de la CLI)."""
+    return {**vars(build_parser().parse_args([""])), "filename": None}
+
+
+def parse_query(query: str, defaults: dict) -> tuple[WatermarkJob, ImageMetadata, OutputEncoding,
+                                                     int | None, str | None]:
+    """Convertit les paramètres de l'URL en réglages du watermark.
+
+    Args:
+        query: Partie ``?...`` de l'URL, sans le point d'interrogation
+        defaults: Valeurs des paramètres absents (voir :func:`default_arguments`)
+
+    Returns:
+        (job, métadonnées, encodage, plus grand côté ou None, nom du fichier ou None)
+
+    Raises:
+        RequestError: Paramètre inconnu ou valeur invalide (400)
+    """
+    values = dict(defaults)
+    for name, items in parse_qs(query, keep_blank_values=True).items():
+        if name not in QUERY_PARAMETERS:
+            raise RequestError(HTTPStatus.BAD_REQUEST,
+                               f"Paramètre inconnu : {name} (disponibles : {', '.join(QUERY_PARAMETERS)})")
+        dest, convert = QUERY_PARAMETERS[name]
+        try:
+            values[dest] = convert(items[-1])
+        except ValueError as e:
+            raise RequestError(HTTPStatus.BAD_REQUEST, f"Valeur invalide pour {name} : {e}") from None
+
+    args = argparse.Namespace(**values)
+    size_low, size_high = SERVICE_SIZE_RANGE
+    count_low, count_high = SERVICE_COUNT_RANGE
+    spacing_low, spacing_high = SERVICE_SPACING_RANGE
+    checks = (
+        (args.position in POSITIONS, f"position parmi {', '.join(POSITIONS)}"),
+        (args.format in output_formats(), f"format parmi {', '.join(output_formats())}"),
+        (args.preset is None or args.preset in PRESETS, f"preset parmi {', '.join(PRESETS)}"),
+        (0 <= args.opacity <= 100, "opacity entre 0 et 100"),
+        (size_low <= args.size <= size_high, f"size entre {size_low:g} et {size_high:g} (% de la largeur)"),
+        (count_low <= args.count <= count_high, f"count entre {count_low} et {count_high}"),
+        (spacing_low <= args.spacing_h <= spacing_high and spacing_low <= args.spacing_v <= spacing_high,
+         f"spacing_h et spacing_v entre {spacing_low:g} et {spacing_high:g}"),
+        (args.max_size is None or args.max_size > 0, "max_size positif"),
+    )
+    for valid, expected in checks:
+        if not valid:
+            raise RequestError(HTTPStatus.BAD_REQUEST, f"Paramètre invalide : {expected}")
+    try:
+        hex_to_rgb(args.color)
+    except ValueError:
+        raise RequestError(HTTPStatus.BAD_REQUEST, f"Couleur invalide : {args.color} (attendu '#RRGGBB')") from None
+    try:
+        job = job_from_args(args)
+        parse_template(job.text)
+    except ValueError as e:
+        raise RequestError(HTTPStatus.BAD_REQUEST, str(e)) from None
+
+    metadata = ImageMetadata(author=args.author.strip(), title=args.title.strip(),
+                             subject=args.subject.strip(), comment=args.comment.strip())
+    filename = os.path.basename(args.filename) if args.filename else None
+    return job, metadata, OutputEncoding(args.format, args.preset), args.max_size, filename
+
+
+def source_filename(data: bytes, filename: str | None, max_pixels: int = SERVICE_MAX_PIXELS) -> str:
+    """Nom de la source : celui donné dans l'URL, sinon déduit du format de l'image.
+
+    Raises:
+        RequestError: Le corps n'est pas une image lisible (415) ou dépasse
+            ``max_pixels`` (413)
+    """
+    try:
+        # En-tête seulement : une image illisible ou trop grande est refusée
+        # sans occuper un processus
+        with open_image(io.BytesIO(data), max_pixels) as img:
+            detected = img.format
+    except Image.DecompressionBombError as e:
+        raise RequestError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, str(e)) from None
+    except Exception:
+        raise RequestError(HTTPStatus.UNSUPPORTED_MEDIA_TYPE, "Le corps de la requête n'est pas une "
+                           "image lisible (JPEG, PNG, GIF, BMP, WebP, TIFF)") from None
+    if filename and os.path.splitext(filename)[1].lower() in SOURCE_FORMATS:
+        return filename
+    stem = os.path.splitext(filename)[0] if filename else "image"
+    return stem + _FORMAT_EXTENSIONS.get(detected, ".jpg")
+
+
+def _init_service_worker(overlay_cache_bytes: int | None, job: WatermarkJob):
+    """Initialise un processus du service : polices, glyphes et calque du job par défaut en cache."""
+    init_resident_worker(overlay_cache_bytes, job.font_name, job.is_bold)
+    warm_job = expand_job(job, "image.jpg", 1, file_date=False)
+    render_watermark(Image.new('RGB', WARM_IMAGE_SIZE), warm_job, in_place=True)
+
+
+def _worker_pid() -> int:
+    return os.getpid()
+
+
+class WatermarkService:
+    """Pool de processus de rendu et limite des requêtes acceptées.
+
+    Args:
+        workers: Nombre de processus de rendu
+        queue_size: Requêtes acceptées en attente d'un processus libre
+        job: Watermark par défaut, rendu au démarrage de chaque processus
+        overlay_cache_bytes: Mémoire maximale du cache de calques par processus
+    """
+
+    def __init__(self, workers: int, queue_size: int, job: WatermarkJob,
+                 overlay_cache_bytes: int | None = None):
+        self.workers = workers
+        self.capacity = workers + queue_size
+        self._pool_args = (workers, overlay_cache_bytes, job)
+        self._slots = threading.BoundedSemaphore(self.capacity)
+        self._lock = threading.Lock()
+        self._restart_lock = threading.Lock()
+        self._counter = itertools.count(1)
+        self.stats = {"served": 0, "rejected": 0, "failed": 0, "in_flight": 0}
+        self._executor = self._start_pool()
+
+    def _start_pool(self) -> ProcessPoolExecutor:
+        workers, overlay_cache_bytes, job = self._pool_args
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_service_worker,
+                                       initargs=(overlay_cache_bytes, job))
+        # Démarre tous les processus (et leur préchauffage) avant la première requête
+        for future in [executor.submit(_worker_pid) for _ in range(workers)]:
+            future.result()
+        return executor
+
+    def _count(self, key: str, delta: int = 1):
+        with self._lock:
+            self.stats[key] += delta
+
+    def admit(self) -> bool:
+        """Réserve une place pour une requête ; False si le service est plein."""
+        if self._slots.acquire(blocking=False):
+            self._count("in_flight")
+            return True
+        self._count("rejected")
+        return False
+
+    def release(self):
+        self._count("in_flight", -1)
+        self._slots.release()
+
+    def render(self, data: bytes, filename: str, job: WatermarkJob, metadata: ImageMetadata,
+               encoding: OutputEncoding, max_size: int | None,
+               max_pixels: int = SERVICE_MAX_PIXELS) -> tuple[bytes, str, dict[str, float]]:
+        """Watermarke une image dans un processus du pool (requête déjà admise)."""
+        executor = self._executor
+        submitted = time.perf_counter()
+        try:
+            future = executor.submit(watermark_bytes, data, filename, job, metadata,
+                                     next(self._counter), max_size, encoding, max_pixels)
+            body, pil_format, stage_times = future.result()
+        except BrokenProcessPool:
+            self._count("failed")
+            self._restart_pool(executor)
+            raise
+        except Exception:
+            self._count("failed")
+            raise
+        # Attente d'un processus libre et transferts entre processus
+        stage_times["queue"] = max(0.0, time.perf_counter() - submitted - stage_times["total"])
+        self._count("served")
+        return body, pil_format, stage_times
+
+    def _restart_pool(self, broken: ProcessPoolExecutor):
+        """Remplace un pool dont un processus a été tué (mémoire...) pour les requêtes suivantes.
+
+        Le nouveau pool démarre hors de ``self._lock`` : compteurs et
+        ``/health`` restent disponibles pendant son préchauffage. Les requêtes
+        qui trouvent le même pool cassé attendent ce remplacement au lieu
+        d'en lancer un autre.
+        """
+        with self._restart_lock:
+            if self._executor is not broken:
+                return
+            executor = self._start_pool()
+            with self._lock:
+                self._executor = executor
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def health(self) -> dict:
+        with self._lock:
+            return {"status": "ok", "workers": self.workers, "capacity": self.capacity, **self.stats}
+
+    def close(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+class WatermarkHandler(BaseHTTPRequestHandler):
+    """Requêtes HTTP du service (une connexion par thread, keep-alive HTTP/1.1)."""
+
+    protocol_version = "HTTP/1.1"
+    server_version = "CestMonImage"
+    timeout = SERVICE_TIMEOUT_SECONDS
+
+    def handle_expect_100(self):
+        # Client qui attend l'accord du serveur avant d'envoyer l'image : une
+        # image trop grosse est refusée sans être transmise
+        length = self.headers.get("Content-Length", "")
+        if length.isdigit() and int(length) > self.server.max_body_bytes:
+            self._body_read = False
+            self._reject(RequestError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, self._too_large()))
+            return False
+        return super().handle_expect_100()
+
+    def do_GET(self):
+        self._body_read = True
+        if urlsplit(self.path).path != "/health":
+            self._reject(RequestError(HTTPStatus.NOT_FOUND,
+                                      "Chemins disponibles : POST /watermark, GET /health"))
+            return
+        self._send(HTTPStatus.OK, json.dumps(self.server.service.health()).encode(), "application/json")
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        self._body_read = False
+        if url.path != "/watermark":
+            self._reject(RequestError(HTTPStatus.NOT_FOUND,
+                                      "Chemins disponibles : POST /watermark, GET /health"))
+            return
+        service = self.server.service
+        try:
+            job, metadata, encoding, max_size, filename = parse_query(url.query, self.server.defaults)
+        except RequestError as e:
+            self._reject(e)
+            return
+        if not service.admit():
+            self._reject(RequestError(HTTPStatus.SERVICE_UNAVAILABLE, "Service saturé, réessayez plus tard"),
+                         {"Retry-After": "1"})
+            return
+        try:
+            data = self._read_body()
+            filename = source_filename(data, filename, self.server.max_pixels)
+            body, pil_format, stage_times = service.render(data, filename, job, metadata,
+                                                           encoding, max_size, self.server.max_pixels)
+        except RequestError as e:
+            self._reject(e)
+            return
+        except (ConnectionError, TimeoutError):
+            # Client parti ou trop lent : rien à répondre
+            self.close_connection = True
+            return
+        except Exception as e:
+            self._reject(RequestError(HTTPStatus.INTERNAL_SERVER_ERROR, f"Erreur de traitement : {e}"))
+            return
+        finally:
+            service.release()
+        timing = ", ".join(f"{name};dur={seconds * 1000:.1f}" for name, seconds in stage_times.items())
+        self._send(HTTPStatus.OK, body, Image.MIME.get(pil_format, "application/octet-stream"),
+                   {"Server-Timing": timing})
+
+    def _reject(self, error: RequestError, headers=None):
+        """Répond une erreur en JSON.
+
+        Le reste du corps est lu sans être conservé : le client reçoit la
+        réponse au lieu d'une connexion coupée en plein envoi, et la
+        connexion reste réutilisable (sauf corps trop gros ou invalide).
+        """
+        close = self.close_connection
+        if not self._body_read:
+            try:
+                self._read_body(keep=False)
+            except RequestError:
+                close = True
+            except (ConnectionError, TimeoutError):
+                self.close_connection = True
+                return
+        body = json.dumps({"error": str(error)}, ensure_ascii=False).encode()
+        self._send(error.status, body, "application/json; charset=utf-8", headers, close)
+
+    def _read_body(self, keep: bool = True) -> bytearray | None:
+        """Lit le corps de la requête par blocs (Content-Length ou envoi chunked).
+
+        Les blocs sont lus directement dans un seul tampon, alloué à la taille
+        annoncée par Content-Length (ou agrandi bloc par bloc en chunked),
+        qui est renvoyé tel quel : l'image n'est jamais recopiée.
+
+        Args:
+            keep: False pour lire le corps sans le conserver (requête refusée)
+
+        Raises:
+            RequestError: Corps absent (411), invalide (400) ou trop gros (413)
+        """
+        try:
+            body = self._read_body_chunks(keep)
+        except RequestError:
+            # Corps lu en partie : la connexion ne peut pas être réutilisée
+            self._body_read = True
+            self.close_connection = True
+            raise
+        self._body_read = True
+        if not keep:
+            return None
+        if not body:
+            raise RequestError(HTTPStatus.BAD_REQUEST, "Aucune image dans le corps de la requête")
+        return body
+
+    def _read_body_chunks(self, keep: bool) -> bytearray | None:
+        body = bytearray() if keep else None
+        received = 0
+        if "chunked" in self.headers.get("Transfer-Encoding", "").lower():
+            while True:
+                line = self.rfile.readline(1024)
+                try:
+                    size = int(line.split(b";", 1)[0].strip(), 16)
+                except ValueError:
+                    raise RequestError(HTTPStatus.BAD_REQUEST, "Encodage chunked invalide") from None
+                if size == 0:
+                    # Fin du corps (en-têtes de fin ignorés)
+                    while self.rfile.readline(1024) not in (b"\r\n", b"\n", b""):
+                        pass
+                    break
+                received = self._read_chunk(body, received, size)
+                self.rfile.readline(1024)
+        else:
+            length = self.headers.get("Content-Length")
+            if length is None or not length.isdigit():
+                raise RequestError(HTTPStatus.LENGTH_REQUIRED, "Content-Length ou envoi chunked attendu")
+            length = int(length)
+            if keep and length <= self.server.max_body_bytes:
+                body = bytearray(length)
+            self._read_chunk(body, 0, length)
+        return body
+
+    def _read_chunk(self, body: bytearray | None, received: int, size: int) -> int:
+        """Lit ``size`` octets du corps à la suite des ``received`` déjà lus.
+
+        Args:
+            body: Tampon du corps (agrandi s'il est trop court), ou None pour
+                lire sans conserver
+
+        Returns:
+            Nombre total d'octets lus
+        """
+        if received + size > self.server.max_body_bytes:
+            raise RequestError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, self._too_large())
+        end = received + size
+        if body is not None and len(body) < end:
+            body.extend(bytes(end - len(body)))
+        scratch = memoryview(body) if body is not None else memoryview(bytearray(SERVICE_CHUNK_BYTES))
+        with scratch:
+            while received < end:
+                count = min(end - received, SERVICE_CHUNK_BYTES)
+                target = scratch[received:received + count] if body is not None else scratch[:count]
+                read = self.rfile.readinto(target)
+                target.release()
+                if not read:
+                    raise ConnectionError("Connexion fermée pendant l'envoi de l'image")
+                received += read
+        return received
+
+    def _too_large(self) -> str:
+        return f"Image trop grosse (maximum {self.server.max_body_bytes // (1024 * 1024)} Mo)"
+
+    def _send(self, status: HTTPStatus, body: bytes, content_type: str, headers=None, close=False):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if close:
+            # Corps de la requête pas entièrement lu : la connexion ne peut pas être réutilisée
+            self.send_header("Connection", "close")
+            self.close_connection = True
+        self.end_headers()
+        view = memoryview(body)
+        for offset in range(0, len(view), SERVICE_CHUNK_BYTES):
+            self.wfile.write(view[offset:offset + SERVICE_CHUNK_BYTES])
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class WatermarkServer(ThreadingHTTPServer):
+    """Serveur HTTP du service (un thread par connexion)."""
+
+    daemon_threads = True
+
+    def __init__(self, address, service: WatermarkService, defaults: dict,
+                 max_body_bytes: int = SERVICE_MAX_BODY_BYTES, verbose: bool = False,
+                 max_pixels: int = SERVICE_MAX_PIXELS):
+        super().__init__(address, WatermarkHandler)
+        self.service = service
+        self.defaults = defaults
+        self.max_body_bytes = max_body_bytes
+        self.max_pixels = max_pixels
+        self.verbose = verbose
+
+
+def build_service_parser() -> argparse.ArgumentParser:
+    """Construit le parseur d'arguments du service."""
+    parser = argparse.ArgumentParser(
+        prog="python -m cestmonimage.service",
+        description="Service HTTP local : POST /watermark avec l'image en corps et les paramètres "
+                    "du watermark dans l'URL (" + ", ".join(QUERY_PARAMETERS) + ").")
+    parser.add_argument("--host", default=SERVICE_HOST, help=f"Adresse d'écoute (défaut : {SERVICE_HOST})")
+    parser.add_argument("--port", type=int, default=SERVICE_PORT, help=f"Port (défaut : {SERVICE_PORT})")
+    parser.add_argument("-j", "--workers", type=int, default=default_workers(),
+                        help="Nombre de processus de rendu (défaut : nombre de cœurs)")
+    parser.add_argument("--queue", type=int, default=None,
+                        help="Requêtes en attente au-delà des processus occupés, avant de répondre 503 "
+                             f"(défaut : {SERVICE_QUEUE_PER_WORKER} par processus)")
+    parser.add_argument("--max-body-mb", type=int, default=SERVICE_MAX_BODY_BYTES // (1024 * 1024),
+                        help="Taille maximale d'une image envoyée, en Mo")
+    parser.add_argument("--max-mpx", type=int, default=SERVICE_MAX_PIXELS // 1_000_000,
+                        help="Dimensions maximales d'une image envoyée, en mégapixels (lues dans l'en-tête)")
+    parser.add_argument("--cache-mb", type=int, default=None,
+                        help="Mémoire maximale du cache de calques par processus, en Mo")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Affiche chaque requête")
+    return parser
+
+
+def main(argv=None) -> int:
+    """Point d'entrée du service : tourne jusqu'à Ctrl+C ou SIGTERM."""
+    args = build_service_parser().parse_args(argv)
+    workers = max(1, args.workers)
+    queue_size = args.queue if args.queue is not None else SERVICE_QUEUE_PER_WORKER * workers
+    cache_bytes = args.cache_mb * 1024 * 1024 if args.cache_mb is not None else None
+    defaults = default_arguments()
+    default_job = job_from_args(argparse.Namespace(**defaults))
+
+    start = time.perf_counter()
+    service = WatermarkService(workers, max(0, queue_size), default_job, cache_bytes)
+    try:
+        server = WatermarkServer((args.host, args.port), service, defaults,
+                                 args.max_body_mb * 1024 * 1024, args.verbose, args.max_mpx * 1_000_000)
+    except OSError as e:
+        service.close()
+        print(f"Erreur : impossible d'écouter sur {args.host}:{args.port} ({e})", file=sys.stderr)
+        return 1
+    print(f"Service prêt en {time.perf_counter() - start:.1f} s : http://{args.host}:{args.port}/watermark "
+          f"({workers} processus, {service.capacity} requêtes au plus)", flush=True)
+
+    stop = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stop.set())
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    stop.wait()
+    server.shutdown()
+    server.server_close()
+    service.close()
+    health = service.health()
+    print(f"Service arrêté : {health['served']} images servies, {health['rejected']} refusées (503), "
+          f"{health['failed']} en échec")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
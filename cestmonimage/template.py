@@ -0,0 +1,172 @@
+"""Texte du watermark propre à chaque image : variables ``{filename}``, ``{date}``...
+
+Le texte peut contenir des variables entre accolades, remplacées pour chaque
+image (``"© {artist} - {filename}"``, ``"{index:03d}"``) ; ``{{`` et ``}}``
+produisent des accolades littérales. Les valeurs EXIF ne sont lues que si le
+texte en utilise, depuis l'en-tête de l'image (sans décodage des pixels).
+"""
+import io
+import os
+import string
+from dataclasses import replace
+from datetime import datetime
+
+from PIL.ExifTags import IFD, Base
+
+from .cache import LRUCache
+from .decode import MAX_SOURCE_PIXELS, open_image
+from .engine import WatermarkJob
+
+# Variables disponibles et leur description (aide de la CLI, README)
+TEMPLATE_FIELDS = {
+    "filename": "nom du fichier source, sans extension",
+    "index": "numéro de l'image dans le lot (à partir de 1)",
+    "date": "date de prise de vue JJ/MM/AAAA (EXIF, sinon date du fichier)",
+    "year": "année de prise de vue",
+    "camera": "marque et modèle de l'appareil (EXIF)",
+    "owner": "propriétaire de l'appareil (EXIF)",
+    "artist": "auteur (EXIF)",
+    "copyright": "copyright (EXIF)",
+}
+EXIF_FIELDS = frozenset({"date", "year", "camera", "owner", "artist", "copyright"})
+TEMPLATE_VALUE_MAX_CHARS = 128  # Longueur maximale d'une valeur EXIF insérée
+TEMPLATE_CACHE_SIZE = 16  # Textes analysés conservés
+
+_formatter = string.Formatter()
+_template_cache = LRUCache(TEMPLATE_CACHE_SIZE)
+
+
+class TextTemplate:
+    """Texte de watermark analysé une fois, développé pour chaque image.
+
+    Args:
+        text: Texte du watermark, avec ou sans variables
+
+    Raises:
+        ValueError: Accolade non fermée, variable inconnue ou format invalide
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        try:
+            parts = list(_formatter.parse(text))
+        except ValueError as e:
+            raise ValueError(f"Texte du watermark invalide ({e}) : utilisez {{{{ et }}}} "
+                             "pour des accolades littérales") from None
+        self.fields = frozenset(name for _, name, _, _ in parts if name is not None)
+        for name in self.fields:
+            if name not in TEMPLATE_FIELDS:
+                raise ValueError(f"Variable inconnue dans le texte du watermark : {{{name}}} "
+                                 f"(disponibles : {', '.join(TEMPLATE_FIELDS)})")
+        self._parts = parts
+        # Vérifie les formats ({index:03d}...) une fois pour toutes
+        self._format({name: 1 if name == "index" else "" for name in TEMPLATE_FIELDS})
+
+    @property
+    def is_static(self) -> bool:
+        """True si le texte est le même pour toutes les images."""
+        return not self.fields
+
+    def expand(self, image_path: str, index: int, source=None, file_date: bool = True) -> str:
+        """Texte du watermark pour une image.
+
+        Args:
+            image_path: Image source
+            index: Numéro de l'image dans le lot (à partir de 1)
+            source: Contenu du fichier déjà lu (bytes), pour ne pas le relire
+            file_date: Date du fichier si l'EXIF n'en a pas ; False pour une
+                image reçue en mémoire, dont le nom n'est pas un chemin local
+
+        Returns:
+            Texte avec les variables remplacées
+        """
+        values = {"filename": os.path.splitext(os.path.basename(image_path))[0], "index": index}
+        if self.fields & EXIF_FIELDS:
+            values.update(_exif_values(image_path, source, file_date))
+        return self._format(values)
+
+    def _format(self, values: dict) -> str:
+        result = []
+        for literal, name, spec, conversion in self._parts:
+            result.append(literal)
+            if name is not None:
+                try:
+                    value = _formatter.convert_field(values[name], conversion)
+                    result.append(_clean(_formatter.format_field(value, spec)))
+                except ValueError:
+                    field = name + (f"!{conversion}" if conversion else "") + (f":{spec}" if spec else "")
+                    raise ValueError(f"Format invalide dans le texte du watermark : {{{field}}}") from None
+        return "".join(result)
+
+
+def parse_template(text: str) -> TextTemplate:
+    """Retourne le texte analysé (analyse mise en cache).
+
+    Raises:
+        ValueError: Texte invalide (voir :class:`TextTemplate`)
+    """
+    return _template_cache.get_or_create(text, lambda: TextTemplate(text))
+
+
+def expand_job(job: WatermarkJob, image_path: str, index: int, source=None,
+               file_date: bool = True) -> WatermarkJob:
+    """Retourne le job avec le texte propre à l'image (le job lui-même sans variable).
+
+    Voir :meth:`TextTemplate.expand`.
+    """
+    if '{' not in job.text and '}' not in job.text:
+        return job
+    return replace(job, text=parse_template(job.text).expand(image_path, index, source, file_date))
+
+
+def _clean(value: str) -> str:
+    # Une seule ligne : retours à la ligne, tabulations et autres caractères de
+    # contrôle (NUL de fin des champs EXIF...) remplacés par des espaces
+    if not value.isprintable():
+        value = " ".join("".join(c if c.isprintable() else " " for c in value).split())
+    return value
+
+
+def _exif_text(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, bytes):
+        value = value.decode('utf-8', errors='replace')
+    return _clean(str(value)).strip()[:TEMPLATE_VALUE_MAX_CHARS]
+
+
+def _exif_values(image_path: str, source=None, file_date: bool = True) -> dict:
+    """Valeurs des variables EXIF (chaînes vides si absentes ou illisibles)."""
+    exif, sub = {}, {}
+    try:
+        with open_image(io.BytesIO(source) if source is not None else image_path, MAX_SOURCE_PIXELS) as img:
+            exif = img.getexif()
+            sub = exif.get_ifd(IFD.Exif)
+    except Exception:
+        # Image sans EXIF lisible : les variables restent vides
+        pass
+
+    shot = None
+    for raw in (sub.get(Base.DateTimeOriginal), exif.get(Base.DateTime)):
+        try:
+            shot = datetime.strptime(_exif_text(raw)[:19], "%Y:%m:%d %H:%M:%S")
+            break
+        except ValueError:
+            continue
+    if shot is None and file_date:
+        try:
+            shot = datetime.fromtimestamp(os.path.getmtime(image_path))
+        except OSError:
+            shot = None
+
+    make, model = _exif_text(exif.get(Base.Make)), _exif_text(exif.get(Base.Model))
+    # Beaucoup de boîtiers répètent la marque dans le modèle ("Canon" / "Canon EOS 5D")
+    camera = model if model.lower().startswith(make.lower()) else f"{make} {model}".strip()
+    return {
+        "date": shot.strftime("%d/%m/%Y") if shot else "",
+        "year": str(shot.year) if shot else "",
+        "camera": camera,
+        "owner": _exif_text(sub.get(Base.CameraOwnerName)),
+        "artist": _exif_text(exif.get(Base.Artist)),
+        "copyright": _exif_text(exif.get(Base.Copyright)),
+    }
@@ -0,0 +1,195 @@
+"""Chronométrage des étapes du traitement d'une image, rapport de lot et profilage.
+
+Les étapes (lecture, décodage, police, calque, fusion, conversion, EXIF,
+encodage, écriture) sont mesurées en temps exclusif : une étape imbriquée
+dans une autre (chargement de police pendant le rendu du calque) n'est
+comptée qu'une fois. Hors de :func:`record_stages`, :func:`stage` ne mesure rien.
+"""
+import cProfile
+import csv
+import glob
+import json
+import os
+import pstats
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from multiprocessing.util import Finalize
+
+from .utils import percentile
+
+STAGES = ("read", "decode", "font", "overlay", "composite", "convert", "exif", "encode", "write")
+PROFILE_FILENAME = "cestmonimage_profile.prof"
+
+_local = threading.local()
+
+
+class _StageTimer:
+    """Temps exclusifs par étape pour un traitement en cours (un thread)."""
+
+    def __init__(self):
+        self.times = {}
+        self._stack = []  # [nom, début, temps des étapes imbriquées]
+
+
+class stage:
+    """Chronomètre une étape du traitement en cours (``with stage("decode"): ...``)."""
+
+    __slots__ = ("name", "timer")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.timer = getattr(_local, "timer", None)
+
+    def __enter__(self):
+        if self.timer is not None:
+            self.timer._stack.append([self.name, time.perf_counter(), 0.0])
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.timer is None:
+            return
+        name, start, nested = self.timer._stack.pop()
+        elapsed = time.perf_counter() - start
+        times = self.timer.times
+        times[name] = times.get(name, 0.0) + elapsed - nested
+        if self.timer._stack:
+            self.timer._stack[-1][2] += elapsed
+
+
+@contextmanager
+def record_stages():
+    """Active le chronométrage des étapes dans le thread courant.
+
+    Yields:
+        Dictionnaire étape -> secondes, complété à la sortie par ``total``
+        (durée du bloc) et ``other`` (temps hors étapes)
+    """
+    timer = _StageTimer()
+    previous = getattr(_local, "timer", None)
+    _local.timer = timer
+    start = time.perf_counter()
+    try:
+        yield timer.times
+    finally:
+        _local.timer = previous
+        total = time.perf_counter() - start
+        timer.times["other"] = max(0.0, total - sum(timer.times.values()))
+        timer.times["total"] = total
+
+
+def summarize_timings(timings) -> dict:
+    """Agrège les temps par étape d'un lot.
+
+    Args:
+        timings: Couples (source, temps par étape) de :attr:`.batch.BatchResult.timings`
+
+    Returns:
+        Par étape : total, moyenne, médiane, p95, maximum (ms) et part du temps
+        total ; en mode surveillance, ``latency`` donne aussi la médiane, le
+        p95 et le maximum du délai entre l'arrivée d'une image et sa sortie
+    """
+    columns = [*STAGES, "other", "total"]
+    grand_total = sum(times.get("total", 0.0) for _, times in timings) or 1.0
+    summary = {}
+    for name in columns:
+        values = [times.get(name, 0.0) for _, times in timings]
+        if not values:
+            continue
+        summary[name] = {
+            "total_s": round(sum(values), 4),
+            "mean_ms": round(sum(values) / len(values) * 1000, 2),
+            "p50_ms": round(percentile(values, 0.50) * 1000, 2),
+            "p95_ms": round(percentile(values, 0.95) * 1000, 2),
+            "max_ms": round(max(values) * 1000, 2),
+            "share": round(sum(values) / grand_total, 4),
+        }
+    # Mode surveillance : de l'arrivée du fichier à la fin de l'écriture de la sortie
+    latencies = [times["latency"] for _, times in timings if "latency" in times]
+    if latencies:
+        summary["latency"] = {
+            "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+            "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+            "max_ms": round(max(latencies) * 1000, 2),
+        }
+    return summary
+
+
+def write_run_report(result, path: str, wall_time: float | None = None):
+    """Écrit le rapport d'un lot : JSON (résumé et détail), ou CSV (une ligne par image).
+
+    Le format est choisi d'après l'extension de ``path`` (``.csv`` ou autre).
+
+    Args:
+        result: :class:`.batch.BatchResult` du lot
+        path: Fichier du rapport
+        wall_time: Durée totale du lot en secondes (JSON uniquement)
+    """
+    columns = [*STAGES, "other", "total"]
+    if any("latency" in times for _, times in result.timings):
+        columns.append("latency")
+    if path.lower().endswith(".csv"):
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(["source", *(f"{name}_ms" for name in columns)])
+            for source, times in result.timings:
+                writer.writerow([source, *(round(times.get(name, 0.0) * 1000, 3) for name in columns)])
+        return
+
+    report = {
+        "images": len(result.timings),
+        "skipped": result.skipped,
+        "errors": len(result.errors),
+        "wall_s": round(wall_time, 3) if wall_time is not None else None,
+        "stages": summarize_timings(result.timings),
+        "pipeline": result.pipeline,
+        "files": [{"source": source, **{f"{name}_ms": round(times.get(name, 0.0) * 1000, 3)
+                                        for name in columns}}
+                  for source, times in result.timings],
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+
+def _dump_profile(profiler: cProfile.Profile, path: str):
+    profiler.disable()
+    profiler.dump_stats(path)
+
+
+def start_worker_profile(profile_dir: str):
+    """Profile le processus courant (processus du pool) jusqu'à sa fin.
+
+    Le profil est écrit dans ``profile_dir`` à l'arrêt du processus, puis
+    fusionné par :func:`profile_batch`.
+    """
+    profiler = cProfile.Profile()
+    profiler.enable()
+    Finalize(profiler, _dump_profile, args=(profiler, os.path.join(profile_dir, f"{os.getpid()}.prof")),
+             exitpriority=10)
+
+
+@contextmanager
+def profile_batch(output_folder: str):
+    """Profile un lot avec cProfile, processus du pool compris.
+
+    Yields:
+        Dossier où les processus du pool déposent leur profil (voir
+        :func:`start_worker_profile`)
+
+    Le profil fusionné est écrit dans ``output_folder`` (PROFILE_FILENAME),
+    lisible avec ``python -m pstats`` ou snakeviz.
+    """
+    profile_dir = tempfile.mkdtemp(prefix="cestmonimage-profile-")
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profile_dir
+    finally:
+        profiler.disable()
+        stats = pstats.Stats(profiler)
+        for worker_profile in glob.glob(os.path.join(profile_dir, "*.prof")):
+            stats.add(worker_profile)
+            os.remove(worker_profile)
+        os.rmdir(profile_dir)
+        stats.dump_stats(os.path.join(output_folder, PROFILE_FILENAME))
@@ -0,0 +1,76 @@
+"""Utilitaires partagés entre l'interface graphique, le moteur et la CLI."""
+import math
+import os
+import sys
+
+
+def get_resource_path(relative_path: str) -> str:
+    """Obtient le chemin absolu vers une ressource (compatible PyInstaller).
+
+    Args:
+        relative_path: Chemin relatif à la racine du projet (ex: "fonts")
+
+    Returns:
+        Chemin absolu vers la ressource
+    """
+    try:
+        base_path = sys._MEIPASS
+    except AttributeError:
+        # Racine du projet : indépendante du dossier courant (CLI, services)
+        base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(base_path, relative_path)
+
+
+def get_cache_dir() -> str:
+    """Dossier de cache de l'application (surchargeable par CESTMONIMAGE_CACHE_DIR)."""
+    override = os.environ.get("CESTMONIMAGE_CACHE_DIR")
+    if override:
+        return override
+    if sys.platform == 'win32':
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser(os.path.join("~", "AppData", "Local"))
+        return os.path.join(base, "CestMonImage", "cache")
+    if sys.platform == 'darwin':
+        return os.path.expanduser(os.path.join("~", "Library", "Caches", "CestMonImage"))
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser(os.path.join("~", ".cache"))
+    return os.path.join(base, "cestmonimage")
+
+
+def hex_to_rgb(hex_color: str) -> tuple[int, int, int]:
+    """Convertit une couleur '#RRGGBB' en tuple (r, g, b)."""
+    hex_color = hex_color.lstrip('#')
+    return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
+
+
+def format_duration(seconds: float) -> str:
+    """Formate une durée en 'm:ss' (ou 'h:mm:ss' au-delà d'une heure)."""
+    seconds = int(round(seconds))
+    hours, rest = divmod(seconds, 3600)
+    minutes, secs = divmod(rest, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{secs:02d}"
+    return f"{minutes}:{secs:02d}"
+
+
+def get_peak_rss() -> int | None:
+    """Pic de mémoire résidente du processus courant, en octets (None si indisponible)."""
+    if sys.platform == 'win32':
+        try:
+            import psutil
+        except ImportError:
+            return None
+        return psutil.Process().memory_info().peak_wset
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss est en octets sous macOS, en kilo-octets ailleurs
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def percentile(values, fraction: float) -> float:
+    """Percentile par rang le plus proche (valeurs non triées).
+
+    Le rang retenu est ``ceil(fraction * n)`` : sur 20 valeurs, p95 est la
+    19e valeur triée.
+    """
+    ordered = sorted(values)
+    rank = min(max(1, math.ceil(fraction * len(ordered))), len(ordered))
+    return ordered[rank - 1]
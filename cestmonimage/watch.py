@@ -0,0 +1,284 @@
+"""Surveillance d'un dossier : images déposées détectées dès qu'elles sont complètes.
+
+Sous Linux, les dossiers sont surveillés avec inotify (appels système via
+ctypes, sans dépendance) ; ailleurs, ou si inotify n'est pas disponible, le
+dossier est relisté à intervalle régulier. Dans les deux cas, une image
+n'est traitée que quand sa taille et sa date n'ont plus bougé pendant un
+court délai : une copie en cours (carte mémoire, partage réseau) n'est
+jamais lue à moitié, même si l'outil de copie ne signale pas la fin de
+l'écriture.
+"""
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+import time
+
+from .scan import DirectoryIndex, is_excluded_dir, iter_images
+
+WATCH_SETTLE_SECONDS = 0.2  # Délai sans changement de taille ni de date avant de traiter une image
+WATCH_POLL_SECONDS = 0.5  # Intervalle de relistage du dossier sans inotify
+WATCH_EMPTY_TIMEOUT_SECONDS = 60  # Un fichier encore vide après ce délai n'est plus surveillé
+
+# Constantes de <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = 0o2000000
+_EVENT = struct.Struct("iIII")  # wd, mask, cookie, len (suivi du nom)
+_WATCH_MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+
+
+def _relative(folder: str, path: str) -> str:
+    """Chemin relatif au dossier surveillé, séparateur '/' (comme :func:`.scan.iter_images`)."""
+    return os.path.relpath(path, folder).replace(os.sep, '/')
+
+
+class PollingWatcher:
+    """Détecte les nouvelles images en relistant le dossier (tous OS).
+
+    Le dossier n'est relisté que si sa date de modification a changé (voir
+    :class:`.scan.DirectoryIndex`) ; une image réécrite sur place, sans
+    changer le contenu du dossier, n'est détectée qu'avec inotify.
+    """
+
+    name = "scrutation"
+
+    def __init__(self, folder: str, output_basename: str, recursive: bool = False,
+                 include=(), exclude=(), interval: float = WATCH_POLL_SECONDS):
+        self.folder = folder
+        self.interval = interval
+        self._args = (folder, output_basename, recursive, include, exclude)
+        self._index = DirectoryIndex()
+        self._known = set(self._index.snapshot(*self._args))
+        self._next_poll = time.monotonic() + interval
+
+    def wait(self, timeout: float) -> list[str]:
+        """Attend au plus ``timeout`` secondes ; retourne les images apparues."""
+        delay = self._next_poll - time.monotonic()
+        if delay > timeout:
+            time.sleep(max(0.0, timeout))
+            return []
+        time.sleep(max(0.0, delay))
+        self._next_poll = time.monotonic() + self.interval
+        files = self._index.snapshot(*self._args)
+        added = [path for path in files if path not in self._known]
+        self._known = set(files)
+        return added
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class InotifyWatcher:
+    """Événements inotify des dossiers surveillés (Linux).
+
+    Les nouveaux sous-dossiers sont surveillés dès leur création en mode
+    récursif. Les chemins renvoyés sont bruts : le filtrage (extension,
+    sorties, motifs) est fait par l'appelant.
+
+    Raises:
+        OSError: inotify indisponible (autre OS, limite de surveillances atteinte...)
+    """
+
+    name = "inotify"
+
+    def __init__(self, folder: str, output_basename: str, recursive: bool = False, exclude=()):
+        if not sys.platform.startswith("linux"):
+            raise OSError(errno.ENOSYS, "inotify n'existe que sous Linux")
+        self.folder = folder
+        self.output_basename = output_basename
+        self.recursive = recursive
+        self.exclude = exclude
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error))
+        self._dirs = {}
+        try:
+            self._add_tree(folder)
+        except OSError:
+            self.close()
+            raise
+
+    def _add_watch(self, directory: str):
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), _WATCH_MASK)
+        if wd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, f"{os.strerror(error)} : {directory}")
+        self._dirs[wd] = directory
+
+    def _add_tree(self, directory: str) -> list[str]:
+        """Surveille un dossier (et ses sous-dossiers en mode récursif).
+
+        Returns:
+            Fichiers déjà présents dans les sous-dossiers ajoutés (arrivés avant
+            que la surveillance ne soit en place)
+        """
+        self._add_watch(directory)
+        if not self.recursive:
+            return []
+        found = []
+        stack = [directory]
+        while stack:
+            try:
+                with os.scandir(stack.pop()) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            if not is_excluded_dir(_relative(self.folder, entry.path), self.exclude):
+                                self._add_watch(entry.path)
+                                stack.append(entry.path)
+                        elif directory != self.folder:
+                            found.append(entry.path)
+            except FileNotFoundError:
+                # Sous-dossier supprimé entre-temps
+                continue
+        return found
+
+    def wait(self, timeout: float) -> list[str]:
+        """Attend au plus ``timeout`` secondes ; retourne les fichiers créés ou modifiés."""
+        readable, _, _ = select.select([self._fd], [], [], max(0.0, timeout))
+        if not readable:
+            return []
+        paths = []
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = _EVENT.unpack_from(data, offset)
+                name = data[offset + _EVENT.size:offset + _EVENT.size + length].split(b"\0", 1)[0]
+                offset += _EVENT.size + length
+                if mask & IN_Q_OVERFLOW:
+                    # Événements perdus : tout le dossier est revu
+                    paths.extend(iter_images(self.folder, self.output_basename, self.recursive,
+                                             exclude=self.exclude))
+                    continue
+                if mask & IN_IGNORED:
+                    self._dirs.pop(wd, None)
+                    continue
+                directory = self._dirs.get(wd)
+                if directory is None or not name:
+                    continue
+                path = os.path.join(directory, os.fsdecode(name))
+                if mask & IN_ISDIR:
+                    if (self.recursive and mask & (IN_CREATE | IN_MOVED_TO)
+                            and not is_excluded_dir(_relative(self.folder, path), self.exclude)):
+                        try:
+                            paths.extend(self._add_tree(path))
+                        except OSError:
+                            pass
+                    continue
+                paths.append(path)
+        return paths
+
+    def close(self):
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def open_watcher(folder: str, output_basename: str, recursive: bool = False, include=(),
+                 exclude=(), polling: bool = False):
+    """Surveillance inotify si possible, sinon par relistage (voir :class:`PollingWatcher`)."""
+    if not polling:
+        try:
+            return InotifyWatcher(folder, output_basename, recursive, exclude)
+        except (OSError, AttributeError):
+            # Autre OS, libc sans inotify, ou limite max_user_watches atteinte
+            pass
+    return PollingWatcher(folder, output_basename, recursive, include, exclude)
+
+
+class StableFiles:
+    """Fichiers signalés, rendus prêts quand leur taille et leur date ne bougent plus.
+
+    Un fichier vide est en général sur le point d'être écrit : il reste
+    surveillé, mais au plus ``empty_timeout`` secondes après son apparition.
+    Il ne revient ensuite que s'il est de nouveau signalé (écriture vue par
+    inotify).
+
+    Args:
+        settle: Durée en secondes sans changement avant qu'un fichier soit prêt
+        empty_timeout: Durée en secondes après laquelle un fichier toujours vide est abandonné
+    """
+
+    def __init__(self, settle: float = WATCH_SETTLE_SECONDS,
+                 empty_timeout: float = WATCH_EMPTY_TIMEOUT_SECONDS):
+        self.settle = settle
+        self.empty_timeout = empty_timeout
+        self._files = {}  # chemin -> (taille, date, vu depuis, première apparition)
+
+    def __len__(self):
+        return len(self._files)
+
+    def add(self, path: str, arrival: float | None = None):
+        """Signale un fichier nouveau ou modifié (l'attente recommence)."""
+        now = time.monotonic()
+        previous = self._files.get(path)
+        first_seen = previous[3] if previous else (arrival if arrival is not None else now)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            self._files.pop(path, None)
+            return
+        self._files[path] = (stat.st_size, stat.st_mtime_ns, now, first_seen)
+
+    def next_check(self) -> float | None:
+        """Instant (``time.monotonic``) du prochain fichier à vérifier, ou None."""
+        if not self._files:
+            return None
+        return min(seen for _, _, seen, _ in self._files.values()) + self.settle
+
+    def pop_ready(self) -> list[tuple[str, os.stat_result, float]]:
+        """Retire et retourne les fichiers stables depuis ``settle`` secondes.
+
+        Returns:
+            Triplets (chemin, stat, instant de première apparition)
+        """
+        now = time.monotonic()
+        ready = []
+        for path, (size, mtime, seen, first_seen) in list(self._files.items()):
+            if now - seen < self.settle:
+                continue
+            try:
+                stat = os.stat(path)
+            except OSError:
+                # Supprimé ou renommé avant la fin de la copie
+                del self._files[path]
+                continue
+            if stat.st_size == 0 and now - first_seen >= self.empty_timeout:
+                # Resté vide : abandonné au lieu d'être revérifié indéfiniment
+                del self._files[path]
+                continue
+            if stat.st_size != size or stat.st_mtime_ns != mtime or stat.st_size == 0:
+                # Encore en cours d'écriture
+                self._files[path] = (stat.st_size, stat.st_mtime_ns, now, first_seen)
+                continue
+            del self._files[path]
+            ready.append((path, stat, first_seen))
+        return ready
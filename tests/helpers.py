@@ -0,0 +1,54 @@
+"""Outils communs aux tests : images synthétiques et lancement de la CLI."""
+import os
+import struct
+import subprocess
+import sys
+import zlib
+
+from PIL import Image
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def textured_image(size, mode='RGB') -> Image.Image:
+    """Image non uniforme (bruit et dégradé) : une différence de fusion s'y voit."""
+    width, height = size
+    noise = Image.effect_noise(size, 48)
+    gradient = Image.linear_gradient('L').resize(size)
+    image = Image.merge('RGB', (noise, gradient, gradient.transpose(Image.Transpose.FLIP_LEFT_RIGHT)))
+    if mode == 'RGBA':
+        image.putalpha(Image.linear_gradient('L').rotate(90).resize(size))
+    return image.convert(mode) if image.mode != mode else image
+
+
+def write_image(path, size=(320, 240), color=(90, 120, 150), **options) -> str:
+    """Écrit une image unie (format d'après l'extension) et retourne son chemin."""
+    Image.new('RGB', size, color).save(path, **options)
+    return str(path)
+
+
+def png_header(size) -> bytes:
+    """PNG minimal dont seul l'en-tête compte : dimensions lisibles, aucun pixel."""
+    def chunk(tag, data=b""):
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data))
+
+    ihdr = struct.pack(">IIBBBBB", *size, 8, 2, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", ihdr) + chunk(b"IDAT") + chunk(b"IEND")
+
+
+def cli_command(*args) -> list[str]:
+    """Commande ``python -m cestmonimage`` avec ces arguments."""
+    return [sys.executable, "-m", "cestmonimage", *map(str, args)]
+
+
+def cli_env() -> dict:
+    """Environnement d'un sous-processus qui importe le package de ce dépôt."""
+    path = os.environ.get("PYTHONPATH")
+    return dict(os.environ, PYTHONPATH=ROOT + (os.pathsep + path if path else ""),
+                PYTHONIOENCODING="utf-8")
+
+
+def run_cli(*args, timeout: float = 300, **kwargs) -> subprocess.CompletedProcess:
+    """Lance la CLI dans un sous-processus et attend sa fin."""
+    return subprocess.run(cli_command(*args), cwd=ROOT, env=cli_env(), capture_output=True,
+                          text=True, timeout=timeout, **kwargs)
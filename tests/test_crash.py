@@ -0,0 +1,94 @@
+"""Lot tué en cours de route (``kill -9``) : aucune image tronquée ou vide sous son nom définitif."""
+import os
+import re
+import signal
+import subprocess
+import sys
+import time
+
+import pytest
+from PIL import Image
+
+from cestmonimage.manifest import MANIFEST_FILENAME
+
+from .helpers import ROOT, cli_command, cli_env, textured_image
+
+SOURCE_COUNT = 40
+SOURCE_SIZE = (1600, 1200)
+KILL_AFTER_RECORDS = 3  # Images terminées avant le kill
+OUTPUT_NAME = re.compile(r"image_\d{3}(?:_\d+)?\.jpg")
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="kill -9 d'un groupe de processus (POSIX)")
+
+
+@pytest.fixture(scope="module")
+def sources(tmp_path_factory):
+    folder = tmp_path_factory.mktemp("sources")
+    image = textured_image(SOURCE_SIZE)
+    for number in range(SOURCE_COUNT):
+        image.save(folder / f"photo_{number:02d}.jpg", quality=92)
+    return folder
+
+
+def _manifest_records(output_dir) -> int:
+    try:
+        with open(output_dir / MANIFEST_FILENAME, encoding='utf-8') as f:
+            return sum(1 for line in f if line.endswith("\n"))
+    except OSError:
+        return 0
+
+
+def run_and_kill(sources, output_dir, *args) -> int:
+    """Lance le lot, le tue (processus du pool compris) après quelques images ; retourne le nombre d'images notées."""
+    process = subprocess.Popen(cli_command(sources, "-o", output_dir, "--mosaic", "--spacing-h", "1",
+                                           *args),
+                               cwd=ROOT, env=cli_env(), stdout=subprocess.DEVNULL,
+                               stderr=subprocess.DEVNULL, start_new_session=True)
+    deadline = time.monotonic() + 120
+    while _manifest_records(output_dir) < KILL_AFTER_RECORDS and process.poll() is None:
+        assert time.monotonic() < deadline, "lot trop lent"
+        time.sleep(0.01)
+    os.killpg(process.pid, signal.SIGKILL)
+    process.wait()
+    records = _manifest_records(output_dir)
+    if records >= SOURCE_COUNT:
+        pytest.skip("lot terminé avant le kill")
+    return records
+
+
+def final_outputs(output_dir) -> list[str]:
+    return sorted(name for name in os.listdir(output_dir) if OUTPUT_NAME.fullmatch(name))
+
+
+def assert_outputs_complete(output_dir):
+    for name in final_outputs(output_dir):
+        path = output_dir / name
+        assert path.stat().st_size > 0, f"{name} vide"
+        with Image.open(path) as image:
+            image.load()  # Lève une erreur sur un JPEG tronqué
+            assert image.size == SOURCE_SIZE
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_killed_batch_leaves_no_broken_output(sources, tmp_path, workers):
+    output_dir = tmp_path / "sorties"
+    output_dir.mkdir()
+    run_and_kill(sources, output_dir, "-j", workers)
+    assert_outputs_complete(output_dir)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_resume_after_crash_finishes_without_duplicates(sources, tmp_path, workers):
+    output_dir = tmp_path / "sorties"
+    output_dir.mkdir()
+    records = run_and_kill(sources, output_dir, "-j", workers)
+
+    result = subprocess.run(cli_command(sources, "-o", output_dir, "--mosaic", "--spacing-h", "1",
+                                        "-j", workers),
+                            cwd=ROOT, env=cli_env(), capture_output=True, text=True, timeout=300)
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert f"{records} images déjà traitées" in result.stdout
+    # Mêmes noms qu'un lot sans interruption : ni doublon _1, ni réservation ou fichier temporaire restant
+    assert final_outputs(output_dir) == [f"image_{number:03d}.jpg" for number in range(1, SOURCE_COUNT + 1)]
+    assert sorted(os.listdir(output_dir)) == sorted([MANIFEST_FILENAME, *final_outputs(output_dir)])
+    assert_outputs_complete(output_dir)
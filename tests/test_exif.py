@@ -0,0 +1,30 @@
+"""EXIF des sorties : embarqué seulement pour les sources JPEG et les formats qui l'acceptent."""
+import contextlib
+import io
+
+import pytest
+from PIL import Image
+
+from cestmonimage import ImageMetadata, WatermarkJob, process_image
+from cestmonimage.batch import embeds_exif
+from cestmonimage.encoders import KEEP_FORMAT, OutputEncoding
+
+from .helpers import write_image
+
+JOB = WatermarkJob(text="© EXIF")
+
+
+@pytest.mark.parametrize("source, output_format", [
+    ("photo.jpg", "jpeg"), ("photo.jpg", "png"), ("photo.jpg", "webp"), ("photo.jpg", "gif"),
+    ("photo.jpg", "bmp"), ("photo.jpg", KEEP_FORMAT), ("photo.png", KEEP_FORMAT), ("photo.png", "jpeg"),
+])
+def test_embeds_exif_matches_output(tmp_path, source, output_format):
+    path = write_image(tmp_path / source)
+    encoding = OutputEncoding(output_format)
+    with contextlib.redirect_stdout(io.StringIO()):
+        output = process_image(path, str(tmp_path), "sortie", 1, JOB, ImageMetadata(author="Bob"),
+                               encoding=encoding)
+    with Image.open(output) as img:
+        has_exif = img.getexif().get(0x013B) == "Bob"  # Artist
+    assert embeds_exif(path, encoding) == has_exif
+    assert has_exif == (source.endswith(".jpg") and output_format not in ("gif", "bmp"))
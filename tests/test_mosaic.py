@@ -0,0 +1,41 @@
+"""Mosaïque : le pavage de la période donne exactement le collage de chaque tampon du réseau."""
+import pytest
+from PIL import Image, ImageChops
+
+from cestmonimage.engine import (OverlayTiler, WatermarkJob, _paste_stamps, _text_layout, create_overlay,
+                                 get_stamp, mosaic_lattice)
+
+JOBS = {
+    "default": WatermarkJob(text="© Mosaïque", is_mosaic=True, opacity=0.4),
+    "tightest": WatermarkJob(text="© Serré", is_mosaic=True, mosaic_spacing_h=0.1, mosaic_spacing_v=0.1),
+    "dense": WatermarkJob(text="© Dense", is_mosaic=True, mosaic_spacing_h=0.3, mosaic_spacing_v=0.3),
+    "unit": WatermarkJob(text="© Unité", is_mosaic=True, mosaic_spacing_h=1.0, mosaic_spacing_v=1.0),
+    "uneven-bold": WatermarkJob(text="© Gras", is_mosaic=True, is_bold=True, font_size_percent=0.08,
+                                mosaic_spacing_h=1.7, mosaic_spacing_v=0.45),
+    "wide": WatermarkJob(text="© Large", is_mosaic=True, mosaic_spacing_h=5.0, mosaic_spacing_v=5.0),
+}
+
+
+def _per_cell_overlay(image_size, job):
+    # Un collage par tampon du réseau, sur tout le calque
+    font, font_size, text_size = _text_layout(image_size, job)
+    overlay = Image.new('RGBA', image_size, (0, 0, 0, 0))
+    _paste_stamps(overlay, get_stamp(job, font, font_size, text_size), mosaic_lattice(text_size, job),
+                  (0, 0, *image_size))
+    return overlay
+
+
+def _tiled_overlay(image_size, job, tile_size):
+    tiler = OverlayTiler(image_size, job)
+    overlay = Image.new('RGBA', image_size, (0, 0, 0, 0))
+    for box in tiler.tiles(tile_size):
+        overlay.paste(tiler.render(box), box[:2])
+    return overlay
+
+
+@pytest.mark.parametrize("name", sorted(JOBS))
+@pytest.mark.parametrize("size", [(1800, 1200), (700, 1100)])
+def test_periodic_fill_matches_per_cell_pastes(name, size):
+    reference = _per_cell_overlay(size, JOBS[name])
+    assert ImageChops.difference(create_overlay(size, JOBS[name]), reference).getbbox() is None
+    assert ImageChops.difference(_tiled_overlay(size, JOBS[name], 256), reference).getbbox() is None
@@ -0,0 +1,75 @@
+"""Attribution des noms de sortie : réservations, doublons, écriture d'un bloc."""
+import os
+
+import pytest
+
+from cestmonimage.batch import get_unique_filename
+from cestmonimage.naming import OutputNameAllocator, last_output_index, reservation_path
+from cestmonimage.pipeline import write_atomic
+
+
+def test_reserved_name_appears_only_when_written(tmp_path):
+    allocator = OutputNameAllocator(str(tmp_path))
+    path = allocator.allocate("image", 1)
+    assert os.path.basename(path) == "image_001.jpg"
+    assert not os.path.exists(path)
+    assert os.path.exists(reservation_path(path))
+
+    write_atomic(path, b"jpeg")
+    allocator.release(path)
+    assert sorted(os.listdir(tmp_path)) == ["image_001.jpg"]
+
+
+def test_release_after_failure_leaves_nothing(tmp_path):
+    allocator = OutputNameAllocator(str(tmp_path))
+    path = allocator.allocate("image", 1)
+    allocator.release(path)
+    assert os.listdir(tmp_path) == []
+
+
+def test_existing_outputs_get_a_suffix(tmp_path):
+    (tmp_path / "image_001.jpg").write_bytes(b"x")
+    (tmp_path / "IMAGE_001_1.JPG").write_bytes(b"x")
+    allocator = OutputNameAllocator(str(tmp_path))
+    assert os.path.basename(allocator.allocate("image", 1)) == "image_001_2.jpg"
+    assert os.path.basename(allocator.allocate("image", 2, ".png")) == "image_002.png"
+
+
+def test_two_batches_never_share_a_name(tmp_path):
+    first = OutputNameAllocator(str(tmp_path))
+    second = OutputNameAllocator(str(tmp_path))
+    names = {first.allocate("image", 1), second.allocate("image", 1),
+             first.allocate("image", 1), second.allocate("image", 1)}
+    assert len(names) == 4
+    # Un troisième lot voit les réservations en cours dès le listage
+    third = OutputNameAllocator(str(tmp_path))
+    assert os.path.basename(third.allocate("image", 1)) == "image_001_4.jpg"
+
+
+def test_file_written_after_listing_is_not_overwritten(tmp_path):
+    allocator = OutputNameAllocator(str(tmp_path))
+    (tmp_path / "image_001.jpg").write_bytes(b"autre")
+    path = allocator.allocate("image", 1)
+    assert os.path.basename(path) == "image_001_1.jpg"
+    assert (tmp_path / "image_001.jpg").read_bytes() == b"autre"
+    assert not os.path.exists(reservation_path(str(tmp_path / "image_001.jpg")))
+
+
+def test_get_unique_filename_skips_reserved_names(tmp_path):
+    allocator = OutputNameAllocator(str(tmp_path))
+    allocator.allocate("image", 1)
+    assert os.path.basename(get_unique_filename(str(tmp_path), "image", 1)) == "image_001_1.jpg"
+
+
+def test_last_output_index_ignores_reservations(tmp_path):
+    (tmp_path / "image_003.jpg").write_bytes(b"x")
+    (tmp_path / "image_007_1.png").write_bytes(b"x")
+    (tmp_path / ".image_009.jpg.part").write_bytes(b"")
+    assert last_output_index(str(tmp_path), "image") == 7
+
+
+def test_write_atomic_failure_keeps_no_partial_file(tmp_path):
+    path = str(tmp_path / "image_001.jpg")
+    with pytest.raises(TypeError):
+        write_atomic(path, object())
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,75 @@
+"""Reprise d'un lot : images déjà traitées sautées, restes d'un plantage récupérés."""
+import os
+import socket
+import subprocess
+import sys
+
+from cestmonimage import ImageMetadata, WatermarkJob, run_batch
+from cestmonimage.manifest import MANIFEST_FILENAME
+from cestmonimage.naming import OutputNameAllocator, reservation_path
+
+from .helpers import write_image
+
+JOB = WatermarkJob(text="© Reprise")
+
+
+def _dead_pid() -> int:
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+def _reserve(path, pid):
+    with open(reservation_path(str(path)), 'w', encoding='utf-8') as f:
+        f.write(f"{socket.gethostname()} {pid}")
+
+
+def test_rerun_skips_finished_images(tmp_path):
+    sources = tmp_path / "sources"
+    sources.mkdir()
+    output_dir = tmp_path / "sorties"
+    output_dir.mkdir()
+    images = [write_image(sources / f"photo_{n}.jpg") for n in range(3)]
+
+    first = run_batch(images, str(output_dir), "image", JOB, ImageMetadata())
+    assert [os.path.basename(path) for path in first.outputs] == ["image_001.jpg", "image_002.jpg",
+                                                                 "image_003.jpg"]
+    again = run_batch(images, str(output_dir), "image", JOB, ImageMetadata())
+    assert again.skipped == 3 and again.outputs == first.outputs
+    assert sorted(os.listdir(output_dir)) == [MANIFEST_FILENAME, "image_001.jpg", "image_002.jpg",
+                                              "image_003.jpg"]
+
+
+def test_reclaim_removes_leftovers_of_dead_processes(tmp_path):
+    dead = _dead_pid()
+    # Réservation d'un lot tué, avec son fichier temporaire à moitié écrit
+    _reserve(tmp_path / "image_002.jpg", dead)
+    (tmp_path / f".image_002.jpg.{dead}-0.tmp").write_bytes(b"\xff\xd8")
+    # Sortie terminée par un processus du pool après la mort du lot, jamais notée
+    _reserve(tmp_path / "image_003.jpg", dead)
+    (tmp_path / "image_003.jpg").write_bytes(b"orpheline")
+    # Sortie notée au manifeste juste avant le plantage : conservée
+    _reserve(tmp_path / "image_004.jpg", dead)
+    (tmp_path / "image_004.jpg").write_bytes(b"notee")
+    # Réservation vide des versions précédentes, sous le nom définitif
+    (tmp_path / "image_005.jpg").write_bytes(b"")
+    # Lot en cours (ce processus) et autre nom de base : intouchables
+    _reserve(tmp_path / "image_006.jpg", os.getpid())
+    _reserve(tmp_path / "autre_001.jpg", dead)
+
+    allocator = OutputNameAllocator(str(tmp_path))
+    recorded = {os.path.abspath(tmp_path / "image_004.jpg")}
+    assert sorted(allocator.reclaim("image", recorded)) == ["image_002.jpg", "image_003.jpg",
+                                                            "image_005.jpg"]
+    assert sorted(os.listdir(tmp_path)) == [".autre_001.jpg.part", ".image_006.jpg.part", "image_004.jpg"]
+    names = [os.path.basename(allocator.allocate("image", n)) for n in range(2, 7)]
+    assert names == ["image_002.jpg", "image_003.jpg", "image_004_1.jpg", "image_005.jpg",
+                     "image_006_1.jpg"]
+
+
+def test_reservation_from_another_host_is_kept(tmp_path):
+    with open(reservation_path(str(tmp_path / "image_001.jpg")), 'w', encoding='utf-8') as f:
+        f.write(f"autre-machine {_dead_pid()}")
+    allocator = OutputNameAllocator(str(tmp_path))
+    assert allocator.reclaim("image") == []
+    assert os.path.basename(allocator.allocate("image", 1)) == "image_001_1.jpg"
@@ -0,0 +1,125 @@
+"""Service HTTP : lecture du corps, limites des paramètres et des images, nom envoyé par le client, relance du pool."""
+import argparse
+import http.client
+import io
+import os
+import signal
+import sys
+import threading
+
+import pytest
+from PIL import Image
+
+from cestmonimage import ImageMetadata, WatermarkJob
+from cestmonimage import template
+from cestmonimage.batch import watermark_bytes
+from cestmonimage.cli import job_from_args
+from cestmonimage.service import SERVICE_MAX_PIXELS, WatermarkServer, WatermarkService, default_arguments
+
+from .helpers import png_header
+
+MAX_BODY_BYTES = 1024 * 1024
+
+
+@pytest.fixture(scope="module")
+def server():
+    defaults = default_arguments()
+    service = WatermarkService(1, 2, job_from_args(argparse.Namespace(**defaults)))
+    httpd = WatermarkServer(("127.0.0.1", 0), service, defaults, MAX_BODY_BYTES)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+    service.close()
+
+
+@pytest.fixture(scope="module")
+def photo() -> bytes:
+    output = io.BytesIO()
+    Image.new('RGB', (320, 240), (90, 120, 150)).save(output, 'JPEG')
+    return output.getvalue()
+
+
+def _post(server, body, query="", **kwargs):
+    connection = http.client.HTTPConnection(*server.server_address, timeout=60)
+    try:
+        connection.request("POST", "/watermark" + query, body=body, **kwargs)
+        response = connection.getresponse()
+        return response.status, response.read()
+    finally:
+        connection.close()
+
+
+def _pixels(body: bytes) -> bytes:
+    with Image.open(io.BytesIO(body)) as img:
+        return img.tobytes()
+
+
+def test_chunked_upload_matches_content_length(server, photo):
+    status, expected = _post(server, photo, "?format=png")
+    assert status == 200
+    chunks = (photo[offset:offset + 1000] for offset in range(0, len(photo), 1000))
+    status, body = _post(server, chunks, "?format=png", encode_chunked=True)
+    assert status == 200 and _pixels(body) == _pixels(expected)
+
+
+@pytest.mark.parametrize("chunked", [False, True])
+def test_body_too_large_refused_before_reading(server, chunked):
+    # Taille annoncée seulement : la réponse arrive sans que le corps soit envoyé
+    connection = http.client.HTTPConnection(*server.server_address, timeout=60)
+    try:
+        connection.putrequest("POST", "/watermark")
+        if chunked:
+            connection.putheader("Transfer-Encoding", "chunked")
+            connection.endheaders()
+            connection.send(b"%x\r\n" % (MAX_BODY_BYTES + 1))
+        else:
+            connection.putheader("Content-Length", str(MAX_BODY_BYTES + 1))
+            connection.endheaders()
+        assert connection.getresponse().status == 413
+    finally:
+        connection.close()
+
+
+@pytest.mark.parametrize("query", ["size=21", "size=0.5", "count=11", "count=0", "spacing_h=0.05",
+                                   "spacing_v=5.5", "mosaic=1&spacing_h=20&spacing_v=20"])
+def test_parameters_outside_interface_ranges_refused(server, photo, query):
+    status, body = _post(server, photo, "?" + query)
+    assert status == 400 and b"entre" in body
+
+
+def test_interface_range_limits_accepted(server, photo):
+    assert _post(server, photo, "?mosaic=1&size=20&spacing_h=0.1&spacing_v=5")[0] == 200
+    assert _post(server, photo, "?size=1&count=10")[0] == 200
+
+
+def test_image_dimensions_checked_before_rendering(server):
+    # En-tête juste au-delà de la limite, dans un corps de quelques octets
+    size = (8000, SERVICE_MAX_PIXELS // 8000 + 1)
+    failed = server.service.health()["failed"]
+    status, body = _post(server, png_header(size))
+    assert status == 413 and b"trop grande" in body
+    assert server.service.health()["failed"] == failed
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="SIGKILL")
+def test_pool_restarted_after_worker_killed(server, photo):
+    service = server.service
+    for pid in list(service._executor._processes):
+        os.kill(pid, signal.SIGKILL)
+    assert _post(server, photo)[0] == 500
+    assert _post(server, photo)[0] == 200
+    assert service.health()["failed"] >= 1
+
+
+def test_client_filename_is_never_looked_up(monkeypatch, photo, tmp_path):
+    def no_stat(path):
+        raise AssertionError(f"chemin du client consulté : {path}")
+
+    monkeypatch.setattr(template.os.path, "getmtime", no_stat)
+    job = WatermarkJob(text="© {filename} {date}")
+    body, _, _ = watermark_bytes(photo, str(tmp_path / "secret" / "photo.jpg"), job, ImageMetadata())
+    with Image.open(io.BytesIO(body)) as img:
+        assert img.getexif().get(0x010D) == "photo.jpg"  # DocumentName
+    assert template.TextTemplate("{date}").expand(__file__, 1, photo, file_date=False) == ""
@@ -0,0 +1,88 @@
+"""Variables du texte du watermark : analyse, valeurs EXIF et erreurs."""
+import os
+from datetime import datetime
+
+import pytest
+from PIL import Image
+from PIL.ExifTags import IFD, Base
+
+from cestmonimage.engine import WatermarkJob
+from cestmonimage.template import TEMPLATE_VALUE_MAX_CHARS, TextTemplate, expand_job, parse_template
+
+
+def _photo(path, **tags):
+    exif = Image.Exif()
+    for name, value in tags.items():
+        if name in ("DateTimeOriginal", "CameraOwnerName"):
+            exif.get_ifd(IFD.Exif)[getattr(Base, name)] = value
+        else:
+            exif[getattr(Base, name)] = value
+    Image.new('RGB', (32, 24), (90, 120, 150)).save(path, exif=exif)
+    return str(path)
+
+
+def test_filename_and_index(tmp_path):
+    template = TextTemplate("{filename} n°{index:03d}")
+    assert template.fields == {"filename", "index"}
+    assert template.expand(str(tmp_path / "vacances.2024.jpg"), 7) == "vacances.2024 n°007"
+
+
+def test_escaped_braces_are_literal():
+    template = TextTemplate("{{© }}{index}")
+    assert template.expand("photo.jpg", 3) == "{© }3"
+    assert TextTemplate("{{texte}}").is_static
+
+
+def test_exif_fields(tmp_path):
+    path = _photo(tmp_path / "photo.jpg", Make="Canon", Model="Canon EOS 5D", Artist="Jeanne Dupont",
+                  Copyright="(c) 2021 J. Dupont", DateTimeOriginal="2021:07:14 10:30:00",
+                  CameraOwnerName="Studio Dupont")
+    template = TextTemplate("{date}|{year}|{camera}|{owner}|{artist}|{copyright}")
+    expected = "14/07/2021|2021|Canon EOS 5D|Studio Dupont|Jeanne Dupont|(c) 2021 J. Dupont"
+    assert template.expand(path, 1) == expected
+    # Contenu déjà lu : même résultat sans relire le fichier
+    with open(path, 'rb') as f:
+        source = f.read()
+    assert template.expand(path, 1, source) == expected
+
+
+def test_camera_make_not_repeated(tmp_path):
+    path = _photo(tmp_path / "photo.jpg", Make="NIKON", Model="D750")
+    assert TextTemplate("{camera}").expand(path, 1) == "NIKON D750"
+
+
+def test_date_falls_back_to_file_time(tmp_path):
+    path = _photo(tmp_path / "photo.jpg")
+    stamp = datetime(2019, 3, 2, 12, 0).timestamp()
+    os.utime(path, (stamp, stamp))
+    assert TextTemplate("{date} {year}").expand(path, 1) == "02/03/2019 2019"
+
+
+def test_missing_exif_values_are_empty(tmp_path):
+    path = _photo(tmp_path / "photo.jpg")
+    assert TextTemplate("[{artist}][{camera}]").expand(path, 1) == "[][]"
+
+
+def test_exif_values_are_one_bounded_line(tmp_path):
+    path = _photo(tmp_path / "photo.jpg", Artist="Jeanne\nDupont\x00", Copyright="x" * 500)
+    assert TextTemplate("{artist}").expand(path, 1) == "Jeanne Dupont"
+    assert TextTemplate("{copyright}").expand(path, 1) == "x" * TEMPLATE_VALUE_MAX_CHARS
+
+
+@pytest.mark.parametrize("text, message", [
+    ("© {artist", "accolades littérales"),
+    ("© artist}", "accolades littérales"),
+    ("{auteur}", "Variable inconnue"),
+    ("{index:zz}", "Format invalide"),
+    ("{filename:d}", "Format invalide"),
+])
+def test_invalid_templates(text, message):
+    with pytest.raises(ValueError, match=message):
+        parse_template(text)
+
+
+def test_expand_job():
+    job = WatermarkJob(text="© {filename}")
+    assert expand_job(job, "/photos/IMG_0001.jpg", 1).text == "© IMG_0001"
+    static = WatermarkJob(text="© Studio")
+    assert expand_job(static, "/photos/IMG_0001.jpg", 1) is static
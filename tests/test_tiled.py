@@ -0,0 +1,94 @@
+"""Rendu tuilé (très grandes images) : identique au calque complet, mémoire bornée."""
+import resource
+import sys
+
+import pytest
+from PIL import Image, ImageChops
+
+from cestmonimage import engine
+from cestmonimage.decode import MAX_SOURCE_PIXELS, open_image
+from cestmonimage.engine import WatermarkJob, composite_tiled, render_watermark
+
+from .helpers import png_header, run_cli, textured_image
+
+JOBS = {
+    "bottom-right": WatermarkJob(text="© Studio Test"),
+    "center-3": WatermarkJob(text="© Studio Test", position="center", num_watermarks=3, opacity=0.8),
+    "top-left-bold": WatermarkJob(text="© Gras", position="top-left", is_bold=True, font_size_percent=0.12),
+    "mosaic": WatermarkJob(text="© Mosaïque", is_mosaic=True, opacity=0.4),
+    "mosaic-dense": WatermarkJob(text="© Dense", is_mosaic=True, mosaic_spacing_h=0.6, mosaic_spacing_v=0.8),
+}
+
+PANORAMA_SIZE = (30000, 10000)  # 300 Mpx
+PANORAMA_COLOR = (90, 120, 150)
+# Image décodée (900 Mo) + calque RGBA complet (1,2 Go) dépasseraient ce plafond
+PANORAMA_MEMORY_CAP = 1500 * 1024 * 1024
+
+
+def _max_difference(a: Image.Image, b: Image.Image) -> int:
+    assert a.mode == b.mode and a.size == b.size
+    return max(high for _, high in ImageChops.difference(a, b).getextrema())
+
+
+@pytest.mark.parametrize("mode", ["RGB", "RGBA"])
+@pytest.mark.parametrize("name", sorted(JOBS))
+@pytest.mark.parametrize("tile_size", [100, 256])
+def test_tiled_matches_full_layer(name, mode, tile_size):
+    image = textured_image((900, 600), mode)
+    full = render_watermark(image.copy(), JOBS[name], tiled=False)
+    tiled = composite_tiled(image.copy(), JOBS[name], tile_size=tile_size)
+    assert _max_difference(full, tiled) == 0
+
+
+def test_windowed_stamp_close_to_full_layer(monkeypatch):
+    # Tampon mosaïque « géant » : rendu par fenêtres, arrondis d'au plus 2 niveaux
+    monkeypatch.setattr(engine, "TILED_STAMP_MAX_PIXELS", 64 * 64)
+    image = textured_image((900, 600))
+    job = JOBS["mosaic"]
+    full = render_watermark(image.copy(), job, tiled=False)
+    tiled = composite_tiled(image.copy(), job, tile_size=128)
+    assert _max_difference(full, tiled) <= 2
+
+
+def test_source_limit_is_per_call(tmp_path):
+    source = tmp_path / "panorama.png"
+    source.write_bytes(png_header(PANORAMA_SIZE))
+    # Limite globale de Pillow inchangée par l'import du paquet
+    with pytest.raises(Image.DecompressionBombError):
+        Image.open(source)
+    with open_image(source, MAX_SOURCE_PIXELS) as img:
+        assert img.size == PANORAMA_SIZE
+    with pytest.raises(Image.DecompressionBombError, match="trop grande"):
+        open_image(source, 100_000_000)
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="RLIMIT_AS n'est fiable que sous Linux")
+def test_panorama_300mp_under_memory_cap(tmp_path):
+    source = tmp_path / "panorama.jpg"
+    Image.new('RGB', PANORAMA_SIZE, PANORAMA_COLOR).save(source, quality=90)
+    output_dir = tmp_path / "sorties"
+    output_dir.mkdir()
+
+    def limit_memory():
+        resource.setrlimit(resource.RLIMIT_AS, (PANORAMA_MEMORY_CAP, PANORAMA_MEMORY_CAP))
+
+    result = run_cli(source, "-o", output_dir, "--mosaic", "--text", "Panorama", "--size", "1",
+                     "--spacing-h", "1", "--spacing-v", "1", "--color", "#FFFFFF", "--opacity", "80",
+                     "-j", "1", "--no-resume", preexec_fn=limit_memory)
+    assert result.returncode == 0, result.stdout + result.stderr
+
+    with open_image(output_dir / "image_001.jpg", MAX_SOURCE_PIXELS) as output:
+        assert output.size == PANORAMA_SIZE
+        # Décodage au 1/8 : une case de 256 px y couvre 2 x 2 tuiles
+        output.draft('RGB', (PANORAMA_SIZE[0] // 8, PANORAMA_SIZE[1] // 8))
+        preview = output.convert('RGB')
+    # Mosaïque serrée : chaque case a reçu du texte, et le fond reste celui de la source
+    background = Image.new('RGB', preview.size, PANORAMA_COLOR)
+    difference = ImageChops.difference(preview, background).convert('L')
+    cell = 256
+    for top in range(0, preview.height, cell):
+        for left in range(0, preview.width, cell):
+            box = (left, top, min(left + cell, preview.width), min(top + cell, preview.height))
+            low, high = difference.crop(box).getextrema()
+            assert high > 40, f"case {box} sans watermark"
+            assert low <= 4, f"case {box} sans fond d'origine"
@@ -0,0 +1,18 @@
+"""Rapport des étapes : percentiles identiques à ceux du banc d'essai."""
+from cestmonimage.bench import percentile as bench_percentile
+from cestmonimage.timing import summarize_timings
+from cestmonimage.utils import percentile
+
+
+def test_nearest_rank():
+    values = [n / 1000 for n in range(20, 0, -1)]
+    assert percentile(values, 0.95) == 0.019
+    assert percentile(values, 0.50) == 0.010
+    assert percentile(values, 1.0) == 0.020 and percentile(values, 0.0) == 0.001
+    assert bench_percentile is percentile
+
+
+def test_report_uses_same_percentile():
+    timings = [(f"image_{n}.jpg", {"total": n / 1000}) for n in range(1, 21)]
+    summary = summarize_timings(timings)["total"]
+    assert summary["p95_ms"] == 19.0 and summary["p50_ms"] == 10.0 and summary["max_ms"] == 20.0
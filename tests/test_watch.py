@@ -0,0 +1,71 @@
+"""Surveillance : fichiers stables, fichiers restés vides, reprise désactivée."""
+import os
+import threading
+import time
+
+import pytest
+
+from cestmonimage import ImageMetadata, WatermarkJob, run_batch
+from cestmonimage.batch import run_watch
+from cestmonimage.watch import StableFiles
+
+from .helpers import write_image
+
+JOB = WatermarkJob(text="© Surveillance")
+
+
+def test_file_ready_once_unchanged(tmp_path):
+    path = write_image(tmp_path / "photo.jpg")
+    stable = StableFiles(settle=0)
+    stable.add(path)
+    assert [ready[0] for ready in stable.pop_ready()] == [path]
+    assert len(stable) == 0
+
+
+def test_empty_file_expires(tmp_path):
+    path = tmp_path / "photo.jpg"
+    path.touch()
+    stable = StableFiles(settle=0, empty_timeout=0.2)
+    stable.add(str(path))
+    assert stable.pop_ready() == [] and len(stable) == 1
+    time.sleep(0.3)
+    assert stable.pop_ready() == [] and len(stable) == 0
+    # Écrit plus tard : de nouveau signalé, puis prêt
+    write_image(path)
+    stable.add(str(path))
+    assert [ready[0] for ready in stable.pop_ready()] == [str(path)]
+
+
+def _watch_until(folder, output_dir, count, **kwargs):
+    stop = threading.Event()
+    results = []
+    thread = threading.Thread(target=lambda: results.append(
+        run_watch(str(folder), str(output_dir), "image", JOB, ImageMetadata(), cancel_event=stop,
+                  settle=0.05, **kwargs)))
+    thread.start()
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline and len(os.listdir(output_dir)) < count:
+        time.sleep(0.1)
+    # Laisse le temps à une sortie en trop d'apparaître
+    time.sleep(1)
+    stop.set()
+    thread.join(60)
+    return results[0]
+
+
+@pytest.mark.parametrize("resume", [True, False])
+def test_watch_honours_resume(tmp_path, resume):
+    sources = tmp_path / "sources"
+    sources.mkdir()
+    output_dir = tmp_path / "sorties"
+    output_dir.mkdir()
+    images = [write_image(sources / f"photo_{n}.jpg") for n in range(2)]
+    run_batch(images, str(output_dir), "image", JOB, ImageMetadata())
+    write_image(sources / "photo_new.jpg")
+    expected = 1 if resume else 3
+    before = len(os.listdir(output_dir))
+
+    result = _watch_until(sources, output_dir, before + expected, resume=resume)
+    assert len(result.outputs) == expected
+    assert sorted(os.path.basename(path) for path in result.outputs) == [
+        f"image_{index:03d}.jpg" for index in range(3, 3 + expected)]
@@ -1,22 +1,32 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, colorchooser, messagebox
-from PIL import Image, ImageDraw, ImageFont, ImageTk
-from datetime import datetime
+from PIL import ImageTk
+import multiprocessing
 import os
-import math
+import queue
 import sys
-import json
+import threading
+import time
 import traceback
-import piexif
-from piexif import ImageIFD, ExifIFD
-import glob
 
-# Gestion des imports optionnels
-try:
-    from PIL.ExifTags import TAGS
-    HAS_EXIF = True
-except ImportError:
-    HAS_EXIF = False
+from cestmonimage.batch import default_workers, embeds_exif, run_batch
+from cestmonimage.encoders import OutputEncoding
+from cestmonimage.engine import DEFAULT_COLOR, WatermarkJob
+from cestmonimage.fonts import get_available_fonts
+from cestmonimage.metadata import ImageMetadata
+from cestmonimage.preview import PREVIEW_SIZE, PreviewRenderer
+from cestmonimage.scan import DirectoryIndex
+from cestmonimage.template import parse_template
+from cestmonimage.utils import format_duration, get_resource_path
+
+BATCH_POLL_MS = 100  # Intervalle de relève de la file de progression du lot
+PREVIEW_DELAY_MS = 30  # Regroupement des rafraîchissements de prévisualisation
+
+# Libellés des listes déroulantes de sortie -> valeurs de OutputEncoding
+OUTPUT_FORMAT_LABELS = {"JPEG": "jpeg", "Format d'origine": "keep", "PNG": "png",
+                        "WebP": "webp", "TIFF": "tiff"}
+OUTPUT_PRESET_LABELS = {"Standard": None, "Rapide": "fast", "Équilibrée": "balanced",
+                        "Compacte": "smallest"}
 
 def show_error_and_exit(title, message):
     """Affiche une erreur et quitte l'application"""
@@ -27,16 +37,6 @@ def show_error_and_exit(title, message):
         print(f"ERREUR - {title}: {message}")
     sys.exit(1)
 
-def get_resource_path(relative_path):
-    """Obtient le chemin absolu vers une ressource"""
-    try:
-        base_path = sys._MEIPASS
-    except Exception:
-        base_path = os.path.abspath(".")
-    
-    full_path = os.path.join(base_path, relative_path)
-    return full_path
-
 class WatermarkApp:
     def __init__(self, root):
         try:
@@ -85,6 +85,8 @@ class WatermarkApp:
             self.single_image_path = tk.StringVar()  # Chemin d'une image unique
             self.selection_mode = tk.StringVar(value="folder")  # "folder" ou "image"
             self.output_basename = tk.StringVar(value="image")  # Nom de base pour les fichiers de sortie
+            self.output_format = tk.StringVar(value="JPEG")  # Voir OUTPUT_FORMAT_LABELS
+            self.output_preset = tk.StringVar(value="Standard")  # Voir OUTPUT_PRESET_LABELS
             self.copyright_text = tk.StringVar(value="Certification de la qualité")
             self.signature_text = tk.StringVar(value="")  # Signature / Auteur
             
@@ -122,21 +124,21 @@ class WatermarkApp:
             }
             self.positions_reverse = {v: k for k, v in self.positions_mapping.items()}
             
-            # Mapping des noms de polices vers leurs fichiers système (normal et bold)
-            self.font_file_mapping = {
-                "Arial": ("arial.ttf", "arialbd.ttf"),
-                "Times New Roman": ("times.ttf", "timesbd.ttf"),
-                "Verdana": ("verdana.ttf", "verdanab.ttf"),
-                "Calibri": ("calibri.ttf", "calibrib.ttf"),
-                "Georgia": ("georgia.ttf", "georgiab.ttf"),
-                "Tahoma": ("tahoma.ttf", "tahomabd.ttf"),
-                "Trebuchet MS": ("trebuc.ttf", "trebucbd.ttf"),
-                "Comic Sans MS": ("comic.ttf", "comicbd.ttf"),
-                "Juice ITC": ("JUICE___.TTF", None),  # Pas de version Bold
-            }
+            # Traitement par lot en cours (thread de fond)
+            self.batch_thread = None
+            
+            # Prévisualisation : image réduite en cache et rafraîchissement planifié
+            self.preview_renderer = PreviewRenderer()
+            self._preview_pending = None
+            
+            # Liste des images du dossier, relistée seulement si le dossier change
+            self.directory_index = DirectoryIndex()
+            
+            # Couleur du texte (modifiable via "Choisir la couleur")
+            self.color = DEFAULT_COLOR
             
             # Charger les polices disponibles
-            self.available_fonts = self.get_available_fonts()
+            self.available_fonts = get_available_fonts()
             
             self.create_widgets()
             
@@ -167,77 +169,6 @@ class WatermarkApp:
         
         messagebox.showerror("Erreur", error_msg)
     
-    def get_available_fonts(self):
-        """Récupère la liste des polices disponibles"""
-        fonts = ["Arial"]  # Police par défaut
-        fonts_dir = os.path.join(os.environ["WINDIR"], "Fonts")
-        
-        # Vérifier les polices du mapping système
-        for font_name, (normal_file, bold_file) in self.font_file_mapping.items():
-            ttf_path = os.path.join(fonts_dir, normal_file)
-            if os.path.exists(ttf_path) and font_name not in fonts:
-                fonts.append(font_name)
-        
-        # Ajouter les polices personnalisées du dossier fonts/
-        custom_fonts_dir = get_resource_path("fonts")
-        if os.path.exists(custom_fonts_dir):
-            for file in os.listdir(custom_fonts_dir):
-                if file.lower().endswith('.ttf'):
-                    font_name = os.path.splitext(file)[0]
-                    # Retirer " Bold" du nom si présent
-                    if font_name.endswith(" Bold"):
-                        font_name = font_name[:-5]
-                    if font_name not in fonts:
-                        fonts.append(font_name)
-        
-        return sorted(fonts)
-    
-    def get_font_path(self, font_name: str, is_bold: bool = False) -> str:
-        """Obtient le chemin vers le fichier de police.
-        
-        Args:
-            font_name: Nom de la police (ex: "Arial", "Juice ITC")
-            is_bold: Si True, cherche la version Bold
-            
-        Returns:
-            Chemin complet vers le fichier .ttf
-        """
-        fonts_dir = os.path.join(os.environ["WINDIR"], "Fonts")
-        
-        # Vérifier si c'est une police avec un fichier mappé
-        if font_name in self.font_file_mapping:
-            normal_file, bold_file = self.font_file_mapping[font_name]
-            
-            # Si Bold demandé et fichier Bold disponible
-            if is_bold and bold_file:
-                bold_path = os.path.join(fonts_dir, bold_file)
-                if os.path.exists(bold_path):
-                    return bold_path
-            
-            # Sinon retourner la version normale
-            return os.path.join(fonts_dir, normal_file)
-        
-        # Police standard ou personnalisée
-        font_filename = font_name
-        if is_bold:
-            font_filename += " Bold"
-        font_filename += ".ttf"
-        
-        # Chercher d'abord dans les polices personnalisées
-        custom_font_path = get_resource_path(os.path.join("fonts", font_filename))
-        if os.path.exists(custom_font_path):
-            return custom_font_path
-        
-        # Sinon chercher dans les polices système
-        system_path = os.path.join(fonts_dir, font_filename)
-        if os.path.exists(system_path):
-            return system_path
-        
-        # Fallback sur Arial (ou Arial Bold)
-        if is_bold:
-            return os.path.join(fonts_dir, "arialbd.ttf")
-        return os.path.join(fonts_dir, "arial.ttf")
-    
     def create_widgets(self):
         # Frame principal
         main_frame = ttk.Frame(self.scrollable_frame, padding="10")
@@ -271,6 +202,16 @@ class WatermarkApp:
         ttk.Entry(source_grid, textvariable=self.output_basename, width=30).grid(row=2, column=1, sticky="w", padx=5, pady=(10, 2))
         ttk.Label(source_grid, text="(ex: image → image_001.jpg)").grid(row=2, column=2, sticky="w", padx=5, pady=(10, 2))
         
+        # Format et compression des fichiers de sortie
+        ttk.Label(source_grid, text="Format de sortie:").grid(row=3, column=0, sticky="w", padx=5, pady=2)
+        output_options = ttk.Frame(source_grid)
+        output_options.grid(row=3, column=1, columnspan=2, sticky="w", padx=5, pady=2)
+        ttk.Combobox(output_options, textvariable=self.output_format, values=list(OUTPUT_FORMAT_LABELS),
+                    state="readonly", width=18).pack(side="left")
+        ttk.Label(output_options, text="Compression:").pack(side="left", padx=(15, 5))
+        ttk.Combobox(output_options, textvariable=self.output_preset, values=list(OUTPUT_PRESET_LABELS),
+                    state="readonly", width=12).pack(side="left")
+        
         source_grid.columnconfigure(1, weight=1)
         
         # Section Copyright
@@ -287,12 +228,12 @@ class WatermarkApp:
         symbol_combo = ttk.Combobox(copyright_grid, textvariable=self.copyright_symbol, 
                     values=self.copyright_symbols, width=10)
         symbol_combo.grid(row=0, column=1, sticky="w", padx=5)
-        symbol_combo.bind("<<ComboboxSelected>>", lambda e: self.update_preview())
+        symbol_combo.bind("<<ComboboxSelected>>", self.schedule_preview)
         
         ttk.Label(copyright_grid, text="Texte:").grid(row=0, column=2, sticky="w", padx=5)
         copyright_entry = ttk.Entry(copyright_grid, textvariable=self.copyright_text, width=40)
         copyright_entry.grid(row=0, column=3, sticky="ew", padx=5)
-        copyright_entry.bind("<KeyRelease>", lambda e: self.update_preview())
+        copyright_entry.bind("<KeyRelease>", self.schedule_preview)
 
         # Deuxième ligne - Auteur (métadonnées uniquement)
         ttk.Label(copyright_grid, text="Auteur:").grid(row=1, column=0, columnspan=2, sticky="w", padx=5, pady=(10,0))
@@ -382,12 +323,12 @@ class WatermarkApp:
         font_combo = ttk.Combobox(text_style_grid, textvariable=self.selected_font,
                                 values=self.available_fonts, width=30, state="readonly")
         font_combo.grid(row=0, column=1, sticky="ew", padx=5)
-        font_combo.bind("<<ComboboxSelected>>", lambda e: self.update_preview())
+        font_combo.bind("<<ComboboxSelected>>", self.schedule_preview)
         
         # Option Gras
         ttk.Checkbutton(text_style_grid, text="Texte en gras",
                        variable=self.is_bold,
-                       command=self.update_preview).grid(row=0, column=2, sticky="w", padx=20)
+                       command=self.schedule_preview).grid(row=0, column=2, sticky="w", padx=20)
         
         # Section Apparence
         appearance_frame = ttk.LabelFrame(main_frame, text="Apparence", 
@@ -406,7 +347,7 @@ class WatermarkApp:
         self.position_combo = ttk.Combobox(appearance_grid, textvariable=self.position, 
                     values=self.positions_fr, state="readonly")
         self.position_combo.grid(row=0, column=2, sticky="ew", padx=5)
-        self.position_combo.bind("<<ComboboxSelected>>", lambda e: self.update_preview())
+        self.position_combo.bind("<<ComboboxSelected>>", self.schedule_preview)
         
         # Deuxième ligne - Transparence
         ttk.Label(appearance_grid, text="Transparence:").grid(row=1, column=0, 
@@ -454,11 +395,11 @@ class WatermarkApp:
         button_frame.pack(fill="x", pady=10)
         
         # Bouton d'application avec style amélioré
-        apply_button = ttk.Button(button_frame, 
+        self.apply_button = ttk.Button(button_frame, 
                                 text="Appliquer le copyright",
                                 command=self.apply_watermark,
                                 style="Apply.TButton")
-        apply_button.pack(pady=10, padx=20, ipadx=10, ipady=5)
+        self.apply_button.pack(pady=10, padx=20, ipadx=10, ipady=5)
         
         # Configuration du style du bouton
         style = ttk.Style()
@@ -478,7 +419,7 @@ class WatermarkApp:
             self.folder_btn.state(['disabled'])
             self.image_entry.state(['!disabled'])
             self.image_btn.state(['!disabled'])
-        self.update_preview()
+        self.schedule_preview()
     
     def browse_image(self):
         """Sélectionne une image unique et met à jour la prévisualisation"""
@@ -494,36 +435,76 @@ class WatermarkApp:
             # Proposer le nom du fichier comme nom de base
             basename = os.path.splitext(os.path.basename(image_path))[0]
             self.output_basename.set(basename)
-            self.update_preview()
+            self.schedule_preview()
     
     def browse_folder(self):
         """Sélectionne un dossier et met à jour la prévisualisation"""
         folder = filedialog.askdirectory()
         if folder:
             self.folder_path.set(folder)
-            self.update_preview()  # Mettre à jour la prévisualisation
+            self.schedule_preview()  # Mettre à jour la prévisualisation
     
     def choose_color(self):
         """Choisit une couleur et met à jour la prévisualisation"""
         color = colorchooser.askcolor(title="Choisir la couleur du copyright")
         if color[1]:
             self.color = color[1]
-            self.update_preview()  # Mettre à jour la prévisualisation
+            self.schedule_preview()  # Mettre à jour la prévisualisation
+    
+    def _build_job(self) -> WatermarkJob:
+        """Construit la configuration du watermark à partir des variables Tkinter."""
+        job = WatermarkJob(
+            text=f"{self.copyright_symbol.get()} {self.copyright_text.get()}",
+            font_name=self.selected_font.get(),
+            is_bold=self.is_bold.get(),
+            color=self.color,
+            opacity=self.opacity.get() / 100,
+            position=self.get_position_internal(),
+            num_watermarks=self.num_watermarks.get(),
+            is_mosaic=self.mosaic_mode.get(),
+            font_size_percent=self.font_size_percent.get() / 100,
+            mosaic_spacing_h=self.mosaic_spacing_h.get(),
+            mosaic_spacing_v=self.mosaic_spacing_v.get(),
+        )
+        # Variables du texte ({filename}, {date}...) : erreur affichée avant le lot
+        parse_template(job.text)
+        return job
+    
+    def _build_metadata(self) -> ImageMetadata:
+        """Construit les métadonnées EXIF à partir des champs saisis."""
+        return ImageMetadata(
+            author=self.signature_text.get().strip(),
+            title=self.meta_title.get().strip(),
+            subject=self.meta_subject.get().strip(),
+            comment=self.meta_comment.get().strip(),
+        )
+    
+    def _build_encoding(self) -> OutputEncoding:
+        """Construit le format de sortie à partir des listes déroulantes."""
+        return OutputEncoding(format=OUTPUT_FORMAT_LABELS[self.output_format.get()],
+                              preset=OUTPUT_PRESET_LABELS[self.output_preset.get()])
     
     def apply_watermark(self):
+        # Un seul lot à la fois
+        if self.batch_thread is not None:
+            return
+        
         # Déterminer le mode de sélection et les fichiers à traiter
         selection_mode = self.selection_mode.get()
         
+        # Nom de base pour les fichiers de sortie
+        output_basename = self.output_basename.get().strip()
+        if not output_basename:
+            output_basename = "image"
+        
         if selection_mode == "folder":
             folder = self.folder_path.get()
             if not folder:
                 messagebox.showerror("Erreur", "Veuillez sélectionner un dossier")
                 return
             output_folder = folder
-            # Liste des fichiers à traiter
-            image_files = [os.path.join(folder, f) for f in os.listdir(folder) 
-                         if f.lower().endswith(('.png', '.jpg', '.jpeg', '.bmp', '.gif'))
-                         and not f.startswith(self.output_basename.get())]
+            # Liste des fichiers à traiter (instantané partagé avec la prévisualisation)
+            image_files = self.directory_index.snapshot(folder, output_basename)
         else:
             image_path = self.single_image_path.get()
             if not image_path or not os.path.exists(image_path):
@@ -540,366 +521,158 @@ class WatermarkApp:
             return
             
         try:
-            # Obtenir le chemin de la police sélectionnée
-            font_name = self.selected_font.get()
-            is_bold = self.is_bold.get()
-            font_path = self.get_font_path(font_name, is_bold)
-            
-            text = f"{self.copyright_symbol.get()} {self.copyright_text.get()}"
-            opacity = self.opacity.get() / 100
-            position = self.get_position_internal()
-            num_watermarks = self.num_watermarks.get()
-            is_mosaic = self.mosaic_mode.get()
-            font_size_percent = self.font_size_percent.get() / 100
-            
-            # Nom de base pour les fichiers de sortie
-            output_basename = self.output_basename.get().strip()
-            if not output_basename:
-                output_basename = "image"
-            
-            # Préparer les métadonnées détaillées
-            watermark_info = {
-                "text": text,
-                "author": self.signature_text.get().strip(),
-                "title": self.meta_title.get().strip(),
-                "subject": self.meta_subject.get().strip(),
-                "comment": self.meta_comment.get().strip(),
-                "date_applied": datetime.now().isoformat(),
-                "opacity": opacity,
-                "position": position,
-                "is_mosaic": is_mosaic,
-                "num_watermarks": num_watermarks,
-                "font": font_name,
-                "is_bold": is_bold,
-                "font_size_percent": font_size_percent,
-                "application": "Certification de propriété et de droits",
-                "version": "1.0"
-            }
-            
-            # Convertir en bytes pour EXIF
-            watermark_bytes = json.dumps(watermark_info).encode('utf-8')
-            
-            if total_images == 0:
-                messagebox.showwarning("Attention", 
-                                     "Aucune image trouvée à traiter")
-                return
-            
-            progress_window = tk.Toplevel(self.root)
-            progress_window.title("Progression")
-            progress_window.geometry("300x150")
-            progress_window.transient(self.root)
-            
-            progress_label = ttk.Label(progress_window, 
-                                     text="Traitement des images en cours...")
-            progress_label.pack(pady=10)
-            
-            progress_bar = ttk.Progressbar(progress_window, length=200, 
-                                         mode='determinate')
-            progress_bar.pack(pady=10)
-            
-            try:
-                for index, image_path in enumerate(image_files):
-                    try:
-                        filename = os.path.basename(image_path)
-                        progress_bar['value'] = (index + 1) / total_images * 100
-                        progress_label['text'] = f"Traitement de {filename}..."
-                        progress_window.update()
-                        img = Image.open(image_path)
-                        
-                        # Créer un calque pour le watermark
-                        watermark = Image.new('RGBA', img.size, (0, 0, 0, 0))
-                        draw = ImageDraw.Draw(watermark)
-                        
-                        # Calculer la taille du texte
-                        font_size = int(img.size[0] * font_size_percent)
-                        try:
-                            font = ImageFont.truetype(font_path, font_size)
-                        except:
-                            font = ImageFont.load_default()
-                        
-                        # Obtenir les dimensions du texte
-                        text_bbox = draw.textbbox((0, 0), text, font=font)
-                        text_width = text_bbox[2] - text_bbox[0]
-                        text_height = text_bbox[3] - text_bbox[1]
-                        
-                        if is_mosaic:
-                            # Calculer la taille après rotation (-15°)
-                            angle_rad = math.radians(15)
-                            rotated_width = abs(text_width * math.cos(angle_rad)) + abs(text_height * math.sin(angle_rad))
-                            rotated_height = abs(text_width * math.sin(angle_rad)) + abs(text_height * math.cos(angle_rad))
-                            
-                            # Espacement directement basé sur les sliders utilisateur
-                            spacing_factor_h = self.mosaic_spacing_h.get()
-                            spacing_factor_v = self.mosaic_spacing_v.get()
-                            spacing_x = rotated_width * spacing_factor_h
-                            spacing_y = rotated_height * spacing_factor_v
-                            
-                            # Calculer le nombre de watermarks nécessaires pour couvrir l'image
-                            num_horizontal = max(1, int(img.size[0] / spacing_x) + 2)
-                            num_vertical = max(1, int(img.size[1] / spacing_y) + 2)
-                            
-                            # Créer le motif de mosaïque
-                            for i in range(num_horizontal):
-                                for j in range(num_vertical):
-                                    # Calculer la position avec décalage pour les lignes impaires
-                                    x = i * spacing_x
-                                    y = j * spacing_y
-                                    
-                                    # Décalage alterné pour les lignes impaires
-                                    if j % 2 == 1:
-                                        x += spacing_x / 2
-                                    
-                                    # Créer une image temporaire pour la rotation
-                                    temp_size = int(max(text_width, text_height) * 1.5)
-                                    txt_img = Image.new('RGBA', (temp_size, temp_size), (0, 0, 0, 0))
-                                    txt_draw = ImageDraw.Draw(txt_img)
-                                    
-                                    # Dessiner le texte au centre (avec faux gras si nécessaire)
-                                    text_pos = (temp_size/2 - text_width/2, temp_size/2 - text_height/2)
-                                    text_fill = (*self.hex_to_rgb(self.color), int(255 * opacity))
-                                    if is_bold and self.needs_fake_bold(font_name):
-                                        self.draw_text_with_fake_bold(txt_draw, text_pos, text, font, text_fill)
-                                    else:
-                                        txt_draw.text(text_pos, text, font=font, fill=text_fill)
-                                    
-                                    # Rotation
-                                    txt_img = txt_img.rotate(-15, expand=True, resample=Image.BICUBIC)
-                                    
-                                    # Calculer la position de collage
-                                    paste_x = int(x - txt_img.size[0]/2)
-                                    paste_y = int(y - txt_img.size[1]/2)
-                                    
-                                    # Coller le watermark
-                                    if (paste_x + txt_img.size[0] > 0 and 
-                                        paste_x < img.size[0] and 
-                                        paste_y + txt_img.size[1] > 0 and 
-                                        paste_y < img.size[1]):
-                                        watermark.paste(txt_img, (paste_x, paste_y), txt_img)
-                        else:
-                            # Mode normal avec plusieurs watermarks
-                            for i in range(num_watermarks):
-                                # Calculer la position pour chaque watermark
-                                if position == "top-left":
-                                    pos = (10, 10 + i * (text_height + 10))
-                                elif position == "top-right":
-                                    pos = (img.size[0] - text_width - 10, 10 + i * (text_height + 10))
-                                elif position == "bottom-left":
-                                    pos = (10, img.size[1] - (num_watermarks - i) * (text_height + 10))
-                                elif position == "bottom-right":
-                                    pos = (img.size[0] - text_width - 10, 
-                                         img.size[1] - (num_watermarks - i) * (text_height + 10))
-                                else:  # center
-                                    pos = ((img.size[0] - text_width) // 2, 
-                                         ((img.size[1] - (num_watermarks * text_height)) // 2) + 
-                                         i * (text_height + 10))
-                                
-                                text_fill = (*self.hex_to_rgb(self.color), int(255 * opacity))
-                                if is_bold and self.needs_fake_bold(font_name):
-                                    self.draw_text_with_fake_bold(draw, pos, text, font, text_fill)
-                                else:
-                                    draw.text(pos, text, font=font, fill=text_fill)
-                            
-                        # Fusionner les images
-                        try:
-                            if img.mode != 'RGBA':
-                                img = img.convert('RGBA')
-                            img = Image.alpha_composite(img, watermark)
-                            
-                            # Préparation des métadonnées EXIF
-                            exif_dict = {"0th":{}, "Exif":{}, "GPS":{}, "1st":{}}
-                            
-                            # Préparer les informations de watermark et signature
-                            watermark_info = {
-                                "text": text,
-                                "signature": self.signature_text.get().strip(),
-                                "date_applied": datetime.now().isoformat(),
-                                "opacity": opacity,
-                                "position": position,
-                                "is_mosaic": is_mosaic,
-                                "num_watermarks": num_watermarks,
-                                "font": font_name,
-                                "is_bold": is_bold,
-                                "font_size_percent": font_size_percent,
-                                "application": "CestMonImage",
-                                "version": "1.0"
-                            }
-                            
-                            # Convertir en bytes pour EXIF
-                            watermark_bytes = json.dumps(watermark_info).encode('utf-8')
-                            
-                            # Sauvegarder l'image avec le nouveau nom
-                            output_path = self.get_unique_filename(output_folder, output_basename, index + 1, ".jpg")
-                            img = img.convert('RGB')  # Convertir en RGB pour le JPEG
-                            
-                            # Vérifier si le format d'origine est JPEG
-                            if filename.lower().endswith(('.jpg', '.jpeg')):
-                                # Copier les métadonnées EXIF existantes si possible
-                                try:
-                                    exif_data = piexif.load(image_path)
-                                    for ifd in ("0th", "Exif", "GPS", "1st"):
-                                        if ifd in exif_data:
-                                            exif_dict[ifd].update(exif_data[ifd])
-                                except Exception:
-                                    # Ignorer silencieusement les erreurs de lecture EXIF
-                                    pass
-
-                                # Ajouter nos métadonnées personnalisées (JSON complet)
-                                exif_dict["Exif"][piexif.ExifIFD.UserComment] = watermark_bytes
-                                
-                                # Ajouter le copyright dans le champ standard
-                                copyright_text = text
-                                if self.signature_text.get().strip():
-                                    copyright_text += " - " + self.signature_text.get().strip()
-                                exif_dict["0th"][piexif.ImageIFD.Copyright] = copyright_text.encode('utf-8')
-                                
-                                # Ajouter l'auteur
-                                author = self.signature_text.get().strip() or "CestMonImage User"
-                                exif_dict["0th"][piexif.ImageIFD.Artist] = author.encode('utf-8')
-                                
-                                # Ajouter le titre (ImageDescription pour EXIF, XPTitle pour Windows)
-                                meta_title = self.meta_title.get().strip()
-                                if meta_title:
-                                    exif_dict["0th"][piexif.ImageIFD.ImageDescription] = meta_title.encode('utf-8')
-                                    exif_dict["0th"][piexif.ImageIFD.XPTitle] = meta_title.encode('utf-16le')
-                                
-                                # Ajouter l'objet/sujet (XPSubject pour Windows)
-                                meta_subject = self.meta_subject.get().strip()
-                                if meta_subject:
-                                    exif_dict["0th"][piexif.ImageIFD.XPSubject] = meta_subject.encode('utf-16le')
-                                
-                                # Ajouter les commentaires (XPComment pour Windows)
-                                meta_comment = self.meta_comment.get().strip()
-                                if meta_comment:
-                                    exif_dict["0th"][piexif.ImageIFD.XPComment] = meta_comment.encode('utf-16le')
-                                
-                                # Ajouter la date et le logiciel
-                                exif_dict["0th"][piexif.ImageIFD.Software] = "CestMonImage".encode('utf-8')
-                                exif_dict["Exif"][piexif.ExifIFD.DateTimeOriginal] = \
-                                    datetime.now().strftime("%Y:%m:%d %H:%M:%S").encode('utf-8')
-                                
-                                # Nom du document
-                                exif_dict["0th"][piexif.ImageIFD.DocumentName] = \
-                                    os.path.basename(output_path).encode('utf-8')
-                                
-                                # Convertir le dictionnaire EXIF en bytes
-                                exif_bytes = piexif.dump(exif_dict)
-                                
-                                # Sauvegarder avec les métadonnées EXIF
-                                img.save(output_path, 'JPEG', quality=95, exif=exif_bytes)
-                                print(f"✓ Image {filename}: Sauvegardée avec métadonnées EXIF (copyright, signature, date)")
-                            else:
-                                # Pour les autres formats, convertir en JPEG sans métadonnées EXIF
-                                output_path = os.path.splitext(output_path)[0] + '.jpg'
-                                img.save(output_path, 'JPEG', quality=95)
-                                print(f"ℹ Image {filename}: Convertie en JPEG (sans métadonnées EXIF)")
-                            
-                        except Exception as e:
-                            print(f"⚠ Erreur lors du traitement de l'image {filename}: {str(e)}")
-                            try:
-                                # Tentative de sauvegarde sans métadonnées
-                                output_path = self.get_unique_filename(output_folder, output_basename, index + 1, ".jpg")
-                                img = img.convert('RGB')
-                                img.save(output_path, quality=95)
-                                print(f"⚠ Image {filename}: Sauvegardée sans métadonnées (mode de secours)")
-                            except Exception as save_error:
-                                print(f"❌ Erreur lors de la sauvegarde de secours de {filename}: {str(save_error)}")
-                                raise
-                    except Exception as e:
-                        print(f"❌ Erreur lors du traitement de {filename}: {str(e)}")
-                        continue
-                
-                progress_window.destroy()
-                
-                # Afficher un résumé des opérations
-                summary = f"Traitement terminé :\n"
-                summary += f"- {total_images} images traitées\n"
-                if any(f.lower().endswith(('.jpg', '.jpeg')) for f in image_files):
-                    summary += "- Métadonnées EXIF ajoutées aux fichiers JPEG\n"
-                if any(not f.lower().endswith(('.jpg', '.jpeg')) for f in image_files):
-                    summary += "- Les images non-JPEG ont été converties en JPEG\n"
-                
-                messagebox.showinfo("Succès", summary)
-                
-            except Exception as e:
-                # S'assurer que la fenêtre de progression est fermée en cas d'erreur
-                try:
-                    progress_window.destroy()
-                except:
-                    pass
-                    
-                error_msg = f"Une erreur s'est produite lors du traitement:\n{str(e)}"
-                if not isinstance(e, (OSError, IOError)):
-                    error_msg += f"\n\nDétails techniques:\n{traceback.format_exc()}"
-                messagebox.showerror("Erreur", error_msg)
-            
+            job = self._build_job()
+            metadata = self._build_metadata()
+            encoding = self._build_encoding()
         except Exception as e:
             error_msg = f"Une erreur s'est produite lors du traitement:\n{str(e)}"
-            if not isinstance(e, (OSError, IOError)):
-                error_msg += f"\n\nDétails techniques:\n{traceback.format_exc()}"
+            error_msg += f"\n\nDétails techniques:\n{traceback.format_exc()}"
             messagebox.showerror("Erreur", error_msg)
+            return
+        
+        # Le lot tourne dans un thread : la fenêtre principale reste utilisable
+        self.batch_queue = queue.Queue()
+        self.batch_cancel = threading.Event()
+        self.batch_files = image_files
+        self.batch_encoding = encoding
+        self.batch_start_time = time.perf_counter()
+        self._open_progress_window()
+        self.apply_button.state(['disabled'])
+        
+        self.batch_thread = threading.Thread(
+            target=self._batch_worker,
+            args=(image_files, output_folder, output_basename, job, metadata, encoding),
+            daemon=True)
+        self.batch_thread.start()
+        self.root.after(BATCH_POLL_MS, self._poll_batch_queue)
     
-    def hex_to_rgb(self, hex_color):
-        hex_color = hex_color.lstrip('#')
-        return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
+    def _batch_worker(self, image_files, output_folder, output_basename, job, metadata, encoding):
+        """Exécute le lot hors du thread Tk ; communique uniquement via la file."""
+        def on_progress(done, total, filename):
+            self.batch_queue.put(("progress", done, total, filename))
+        
+        try:
+            result = run_batch(image_files, output_folder, output_basename, job, metadata,
+                               progress_callback=on_progress, workers=default_workers(),
+                               cancel_event=self.batch_cancel, encoding=encoding)
+            self.batch_queue.put(("done", result))
+        except Exception as e:
+            self.batch_queue.put(("error", e, traceback.format_exc()))
+    
+    def _open_progress_window(self):
+        """Crée la fenêtre de progression avec son bouton Annuler"""
+        self.progress_window = tk.Toplevel(self.root)
+        self.progress_window.title("Progression")
+        self.progress_window.geometry("360x200")
+        self.progress_window.transient(self.root)
+        self.progress_window.protocol("WM_DELETE_WINDOW", self._cancel_batch)
+        
+        self.progress_label = ttk.Label(self.progress_window, 
+                                        text="Traitement des images en cours...")
+        self.progress_label.pack(pady=10)
+        
+        self.progress_bar = ttk.Progressbar(self.progress_window, length=300, 
+                                            mode='determinate')
+        self.progress_bar.pack(pady=5)
+        
+        self.progress_stats = ttk.Label(self.progress_window, text="")
+        self.progress_stats.pack(pady=5)
+        
+        self.cancel_button = ttk.Button(self.progress_window, text="Annuler",
+                                        command=self._cancel_batch)
+        self.cancel_button.pack(pady=10)
+    
+    def _cancel_batch(self):
+        """Demande l'arrêt du lot ; les images en cours sont terminées proprement"""
+        self.batch_cancel.set()
+        self.cancel_button.state(['disabled'])
+        self.progress_label['text'] = "Annulation en cours..."
+    
+    def _poll_batch_queue(self):
+        """Relève les messages du thread de traitement (appelé via root.after)"""
+        try:
+            while True:
+                message = self.batch_queue.get_nowait()
+                if message[0] == "progress":
+                    self._update_batch_progress(*message[1:])
+                elif message[0] == "done":
+                    self._finish_batch(message[1])
+                    return
+                else:
+                    self._fail_batch(*message[1:])
+                    return
+        except queue.Empty:
+            pass
+        self.root.after(BATCH_POLL_MS, self._poll_batch_queue)
+    
+    def _update_batch_progress(self, done, total, filename):
+        """Met à jour la barre, le débit et le temps restant estimé"""
+        elapsed = time.perf_counter() - self.batch_start_time
+        rate = done / elapsed if elapsed > 0 else 0.0
+        remaining = (total - done) / rate if rate > 0 else 0.0
+        
+        self.progress_bar['value'] = done / total * 100
+        if not self.batch_cancel.is_set():
+            self.progress_label['text'] = f"{done}/{total} - {filename}"
+        self.progress_stats['text'] = (
+            f"{rate:.2f} images/s ({elapsed / done:.1f} s/image) - "
+            f"reste {format_duration(remaining)}")
+    
+    def _close_batch(self):
+        """Ferme la fenêtre de progression et réactive le bouton d'application"""
+        try:
+            self.progress_window.destroy()
+        except tk.TclError:
+            pass
+        self.apply_button.state(['!disabled'])
+        self.batch_thread = None
+    
+    def _finish_batch(self, result):
+        """Affiche le résumé du lot terminé (ou annulé)"""
+        self._close_batch()
+        image_files = self.batch_files
+        elapsed = time.perf_counter() - self.batch_start_time
+        
+        # Afficher un résumé des opérations
+        if result.cancelled:
+            summary = f"Traitement annulé :\n"
+        else:
+            summary = f"Traitement terminé :\n"
+        summary += f"- {len(result.outputs)}/{len(image_files)} images traitées en {format_duration(elapsed)}\n"
+        if result.skipped:
+            summary += f"- {result.skipped} images déjà traitées lors d'un lancement précédent (reprises)\n"
+        if result.errors:
+            summary += f"- {len(result.errors)} images en erreur\n"
+        # Seulement si l'encodeur a réellement embarqué l'EXIF (pas en GIF/BMP)
+        failed = {path for path, _ in result.errors}
+        if any(embeds_exif(f, self.batch_encoding) for f in image_files if f not in failed):
+            summary += "- Métadonnées EXIF ajoutées aux images issues de JPEG\n"
+        if (self.batch_encoding.format == "jpeg"
+                and any(not f.lower().endswith(('.jpg', '.jpeg')) for f in image_files)):
+            summary += "- Les images non-JPEG ont été converties en JPEG\n"
+        
+        if result.cancelled:
+            messagebox.showwarning("Annulé", summary)
+        else:
+            messagebox.showinfo("Succès", summary)
+    
+    def _fail_batch(self, error, details):
+        """Affiche l'erreur qui a interrompu le lot"""
+        self._close_batch()
+        error_msg = f"Une erreur s'est produite lors du traitement:\n{str(error)}"
+        if not isinstance(error, (OSError, IOError)):
+            error_msg += f"\n\nDétails techniques:\n{details}"
+        messagebox.showerror("Erreur", error_msg)
     
     def get_position_internal(self) -> str:
         """Convertit la position française en valeur interne anglaise."""
         pos_fr = self.position.get()
         return self.positions_mapping.get(pos_fr, "bottom-right")
-    
-    def draw_text_with_fake_bold(self, draw, pos, text, font, fill, bold_offset=1):
-        """Dessine du texte avec un effet de faux gras (pour polices sans version Bold).
-        
-        Args:
-            draw: Objet ImageDraw
-            pos: Position (x, y)
-            text: Texte à dessiner
-            font: Police à utiliser
-            fill: Couleur de remplissage (r, g, b, a)
-            bold_offset: Décalage en pixels pour l'effet gras
-        """
-        x, y = pos
-        # Dessiner le texte plusieurs fois avec de légers décalages
-        for dx in range(bold_offset + 1):
-            for dy in range(bold_offset + 1):
-                draw.text((x + dx, y + dy), text, font=font, fill=fill)
-    
-    def needs_fake_bold(self, font_name: str) -> bool:
-        """Vérifie si une police nécessite un faux gras (pas de fichier Bold)."""
-        if font_name in self.font_file_mapping:
-            _, bold_file = self.font_file_mapping[font_name]
-            return bold_file is None
-        return False
-    
-    def get_unique_filename(self, folder: str, basename: str, index: int, extension: str = ".jpg") -> str:
-        """Génère un nom de fichier unique avec numéro incrémenté.
-        
-        Args:
-            folder: Dossier de destination
-            basename: Nom de base (ex: "image")
-            index: Numéro de l'image (1, 2, 3...)
-            extension: Extension du fichier
-            
-        Returns:
-            Chemin complet vers un fichier qui n'existe pas encore
-        """
-        # Format: basename_001.jpg
-        filename = f"{basename}_{index:03d}{extension}"
-        filepath = os.path.join(folder, filename)
-        
-        # Si le fichier existe, ajouter un suffixe
-        suffix = 1
-        while os.path.exists(filepath):
-            filename = f"{basename}_{index:03d}_{suffix}{extension}"
-            filepath = os.path.join(folder, filename)
-            suffix += 1
-        
-        return filepath
 
     def update_num_label(self):
         """Met à jour le label du nombre de watermarks et la prévisualisation"""
         self.num_label.config(text=str(self.num_watermarks.get()))
-        self.update_preview()
+        self.schedule_preview()
     
     def toggle_mosaic_mode(self):
         """Active/désactive les contrôles selon le mode mosaïque"""
@@ -929,24 +702,38 @@ class WatermarkApp:
             self.spacing_v_label_title.config(foreground='gray')
         
         # Mettre à jour la prévisualisation
-        self.update_preview()
+        self.schedule_preview()
     
     def update_spacing_labels(self):
         """Met à jour les labels d'espacement et la prévisualisation"""
         self.spacing_h_label.config(text=f"{self.mosaic_spacing_h.get():.1f}x")
         self.spacing_v_label.config(text=f"{self.mosaic_spacing_v.get():.1f}x")
-        self.update_preview()
+        self.schedule_preview()
     
     def update_opacity_label(self):
         """Met à jour le label de l'opacité et la prévisualisation"""
         self.opacity_label.config(text=f"{self.opacity.get()}%")
-        self.update_preview()
+        self.schedule_preview()
     
     def update_font_size_label(self):
         """Met à jour le label de la taille de la police et la prévisualisation"""
         self.font_size_label.config(text=f"{self.font_size_percent.get():.1f}%")
-        self.update_preview()
+        self.schedule_preview()
 
+    def schedule_preview(self, event=None):
+        """Planifie un rafraîchissement de la prévisualisation.
+        
+        Les demandes rapprochées (frappe au clavier, glissement d'un curseur)
+        sont regroupées en un seul rendu, fait avec les derniers paramètres.
+        """
+        if self._preview_pending is None:
+            self._preview_pending = self.root.after(PREVIEW_DELAY_MS, self._run_scheduled_preview)
+    
+    def _run_scheduled_preview(self):
+        """Exécute le rafraîchissement planifié par schedule_preview"""
+        self._preview_pending = None
+        self.update_preview()
+    
     def update_preview(self):
         """Met à jour la prévisualisation du watermark"""
         try:
@@ -962,7 +749,6 @@ class WatermarkApp:
                 if not image_path or not os.path.exists(image_path):
                     self.preview_label.config(text="Sélectionnez une image pour voir la prévisualisation")
                     return
-                preview_filename = os.path.basename(image_path)
             else:
                 # Mode dossier
                 folder = self.folder_path.get()
@@ -970,137 +756,25 @@ class WatermarkApp:
                     self.preview_label.config(text="Sélectionnez un dossier pour voir la prévisualisation")
                     return
                 
-                # Chercher la première image dans le dossier
+                # Chercher la première image dans le dossier (listage en cache)
                 output_basename = self.output_basename.get().strip() or "image"
-                image_files = [f for f in os.listdir(folder) 
-                             if f.lower().endswith(('.png', '.jpg', '.jpeg', '.bmp', '.gif'))
-                             and not f.startswith(output_basename)]
+                image_files = self.directory_index.snapshot(folder, output_basename)
                 
                 if not image_files:
                     self.preview_label.config(text="Aucune image trouvée dans le dossier")
                     return
                 
-                image_path = os.path.join(folder, image_files[0])
-                preview_filename = image_files[0]
-            
-            img = Image.open(image_path)
-            
-            # Redimensionner l'image pour la prévisualisation
-            canvas_width = 400
-            canvas_height = 300
-            img.thumbnail((canvas_width, canvas_height), Image.Resampling.LANCZOS)
-            
-            # Créer un calque pour le watermark
-            watermark = Image.new('RGBA', img.size, (0, 0, 0, 0))
-            draw = ImageDraw.Draw(watermark)
-            
-            # Obtenir les paramètres actuels
-            text = f"{self.copyright_symbol.get()} {self.copyright_text.get()}"
-            opacity = self.opacity.get() / 100
-            position = self.get_position_internal()
-            is_mosaic = self.mosaic_mode.get()
-            font_size_percent = self.font_size_percent.get() / 100
-            
-            # Calculer la taille de la police
-            font_size = int(img.size[0] * font_size_percent)
-            font_name = self.selected_font.get()
-            is_bold = self.is_bold.get()
-            try:
-                font_path = self.get_font_path(font_name, is_bold)
-                font = ImageFont.truetype(font_path, font_size)
-            except:
-                font = ImageFont.load_default()
-            
-            # Obtenir les dimensions du texte
-            text_bbox = draw.textbbox((0, 0), text, font=font)
-            text_width = text_bbox[2] - text_bbox[0]
-            text_height = text_bbox[3] - text_bbox[1]
-            
-            if is_mosaic:
-                # Calculer la taille après rotation (-15°)
-                angle_rad = math.radians(15)
-                rotated_width = abs(text_width * math.cos(angle_rad)) + abs(text_height * math.sin(angle_rad))
-                rotated_height = abs(text_width * math.sin(angle_rad)) + abs(text_height * math.cos(angle_rad))
-                
-                # Espacement directement basé sur les sliders utilisateur
-                spacing_factor_h = self.mosaic_spacing_h.get()
-                spacing_factor_v = self.mosaic_spacing_v.get()
-                spacing_x = rotated_width * spacing_factor_h
-                spacing_y = rotated_height * spacing_factor_v
-                
-                # Calculer le nombre de watermarks nécessaires pour couvrir l'image
-                num_horizontal = max(1, int(img.size[0] / spacing_x) + 2)
-                num_vertical = max(1, int(img.size[1] / spacing_y) + 2)
-                
-                for i in range(num_horizontal):
-                    for j in range(num_vertical):
-                        x = i * spacing_x
-                        y = j * spacing_y
-                        
-                        # Décalage alterné pour les lignes impaires
-                        if j % 2 == 1:
-                            x += spacing_x / 2
-                        
-                        # Créer une image temporaire pour la rotation
-                        temp_size = int(max(text_width, text_height) * 1.5)
-                        txt_img = Image.new('RGBA', (temp_size, temp_size), (0, 0, 0, 0))
-                        txt_draw = ImageDraw.Draw(txt_img)
-                        
-                        text_pos = (temp_size/2 - text_width/2, temp_size/2 - text_height/2)
-                        text_fill = (*self.hex_to_rgb(self.color), int(255 * opacity))
-                        if is_bold and self.needs_fake_bold(font_name):
-                            self.draw_text_with_fake_bold(txt_draw, text_pos, text, font, text_fill)
-                        else:
-                            txt_draw.text(text_pos, text, font=font, fill=text_fill)
-                        
-                        # Rotation de -15 degrés
-                        txt_img = txt_img.rotate(-15, expand=True, resample=Image.BICUBIC)
-                        
-                        paste_x = int(x - txt_img.size[0]/2)
-                        paste_y = int(y - txt_img.size[1]/2)
-                        
-                        if (paste_x + txt_img.size[0] > 0 and 
-                            paste_x < img.size[0] and 
-                            paste_y + txt_img.size[1] > 0 and 
-                            paste_y < img.size[1]):
-                            watermark.paste(txt_img, (paste_x, paste_y), txt_img)
-            else:
-                # Mode normal : plusieurs watermarks selon le slider Nombre
-                num_watermarks = self.num_watermarks.get()
-                
-                for i in range(num_watermarks):
-                    # Calculer la position pour chaque watermark
-                    if position == "top-left":
-                        pos = (10, 10 + i * (text_height + 10))
-                    elif position == "top-right":
-                        pos = (img.size[0] - text_width - 10, 10 + i * (text_height + 10))
-                    elif position == "bottom-left":
-                        pos = (10, img.size[1] - (num_watermarks - i) * (text_height + 10))
-                    elif position == "bottom-right":
-                        pos = (img.size[0] - text_width - 10, 
-                             img.size[1] - (num_watermarks - i) * (text_height + 10))
-                    else:  # center
-                        pos = ((img.size[0] - text_width) // 2, 
-                             ((img.size[1] - (num_watermarks * text_height)) // 2) + 
-                             i * (text_height + 10))
-                    
-                    # Dessiner le watermark (avec faux gras si nécessaire)
-                    text_fill = (*self.hex_to_rgb(self.color), int(255 * opacity))
-                    if is_bold and self.needs_fake_bold(font_name):
-                        self.draw_text_with_fake_bold(draw, pos, text, font, text_fill)
-                    else:
-                        draw.text(pos, text, font=font, fill=text_fill)
+                image_path = image_files[0]
+            preview_filename = os.path.basename(image_path)
             
-            # Fusionner les images
-            if img.mode != 'RGBA':
-                img = img.convert('RGBA')
-            img = Image.alpha_composite(img, watermark)
-            img = img.convert('RGB')
+            # Image réduite en cache : seul le watermark est redessiné
+            img = self.preview_renderer.render(image_path, self._build_job())
             
             # Convertir en PhotoImage pour l'affichage
             self.preview_image = ImageTk.PhotoImage(img)
             
             # Afficher l'image
+            canvas_width, canvas_height = PREVIEW_SIZE
             self.preview_canvas.create_image(
                 canvas_width//2, canvas_height//2,
                 image=self.preview_image,
@@ -1122,13 +796,9 @@ class WatermarkApp:
         self.main_canvas.yview_scroll(int(-1*(event.delta/120)), "units")
 
 if __name__ == "__main__":
+    # Nécessaire pour le pool de processus dans l'exécutable PyInstaller
+    multiprocessing.freeze_support()
     try:
-        # Vérifier la version de Windows
-        if sys.platform != 'win32':
-            show_error_and_exit("Erreur système", 
-                              "Cette application nécessite Windows")
-            sys.exit(1)
-        
         # Créer la fenêtre principale avec gestion d'erreur
         try:
             root = tk.Tk()